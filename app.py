@@ -9,8 +9,14 @@ from utils.extesions import db, jwt
 from flask_cors import CORS
 from config import Config
 from sqlalchemy import event, text
-from sqlalchemy.engine import Engine
 from utils.historial_tracker import set_current_user_for_triggers
+from utils.cache_tablas import registrar_invalidacion
+from utils.logs import configurar_logs, HEADER_REQUEST_ID
+from utils.instrumentacion import registrar_instrumentacion
+from utils.consultas_lentas import registrar_consultas_lentas
+from utils.metricas import registrar_metricas
+from utils.perfilador import registrar_perfilador
+from utils.deteccion_n1 import registrar_deteccion_n1
 import os
 
 
@@ -24,11 +30,33 @@ def create_app(config_class=Config):
     CORS(app, resources={
         r"/*": {
             "origins": os.getenv('ORIGINS', '').split(','),
-            "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-            "allow_headers": ["Content-Type", "Authorization"],
+            "methods": ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
+            "allow_headers": ["Content-Type", "Authorization", HEADER_REQUEST_ID],
+            "expose_headers": [HEADER_REQUEST_ID],
         }
     })
 
+    # Logs en cola (JSON) con X-Request-ID; va antes que los demás hooks
+    # para que sus registros ya lleven el id de la petición
+    configurar_logs(app)
+
+    # Conteo de consultas y Server-Timing (INSTRUMENTACION_SQL); va justo
+    # después de los logs (que no consultan la BD) para medir también las
+    # consultas de los before_request que se registran a continuación
+    registrar_instrumentacion(app)
+
+    # Consultas que superan CONSULTAS_LENTAS_UMBRAL_MS, con su plan EXPLAIN
+    registrar_consultas_lentas(app)
+
+    # Latencias, códigos de estado y pool para Prometheus (METRICAS_HABILITADAS)
+    registrar_metricas(app)
+
+    # Perfil de muestreo de una petición a pedido de un administrador
+    registrar_perfilador(app)
+
+    # Warning por petición con SELECT repetidos (DETECCION_N1, activo en debug)
+    registrar_deteccion_n1(app)
+
     @app.before_request
     def handle_options():
         if request.method == 'OPTIONS':
@@ -55,6 +83,18 @@ def create_app(config_class=Config):
     app.register_blueprint(concurrency_bp, url_prefix='/api/concurrency')
     app.register_blueprint(health_bp,      url_prefix='/api/health')
 
+    # Lecturas async (opcional): mismos GET de vistas, historial y catálogos
+    # con asyncpg, al lado de los síncronos. Servir con asgi.py (uvicorn).
+    from utils.async_db import init_async_db
+    if init_async_db(app):
+        from routes.vistas_routes import vistas_async_bp
+        from routes.historial_routes import historial_async_bp
+        from routes.catalogos_routes import catalogos_async_bp
+
+        app.register_blueprint(vistas_async_bp,     url_prefix='/api/async/vistas')
+        app.register_blueprint(historial_async_bp,  url_prefix='/api/async/historial')
+        app.register_blueprint(catalogos_async_bp,  url_prefix='/api/async/catalogos')
+
     # Manejadores de errores globales
     from utils.error_handlers import register_error_handlers
     register_error_handlers(app)
@@ -63,15 +103,30 @@ def create_app(config_class=Config):
     def before_request():
         set_current_user_for_triggers()
 
+    # Cachés en memoria (conteos) invalidadas por commits que escriben tablas
+    registrar_invalidacion()
+
+    # Comandos de mantenimiento: flask --app app historial ...
+    from utils.particiones import historial_cli
+    app.cli.add_command(historial_cli)
+
     # Zona horaria leída de config para ser portable entre entornos
     db_timezone = app.config.get('DB_TIMEZONE', 'America/Mexico_City')
 
-    @event.listens_for(Engine, "connect")
     def set_timezone(dbapi_connection, connection_record):
         cursor = dbapi_connection.cursor()
         cursor.execute(f"SET TIME ZONE '{db_timezone}'")
         cursor.close()
 
+    # Solo en los engines de esta app (síncrono y asyncpg), no en la clase
+    # Engine: otros engines del proceso (pruebas, scripts) no son PostgreSQL
+    with app.app_context():
+        engines = list(db.engines.values())
+    if 'async_db' in app.extensions:
+        engines.append(app.extensions['async_db'].engine.sync_engine)
+    for engine in engines:
+        event.listen(engine, 'connect', set_timezone)
+
     return app
 
 
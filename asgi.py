@@ -0,0 +1,18 @@
+"""
+Punto de entrada ASGI
+Sistema de Inventario IUCA
+
+    ASYNC_LECTURAS=True uvicorn asgi:app --workers 4
+
+La app Flask (WSGI) se adapta con asgiref: cada petición, síncrona o
+async, ocupa un hilo del adaptador hasta terminar; Flask no libera el
+hilo mientras una vista async espera. Lo que ahorran las vistas de
+/api/async/... es la conexión psycopg2: esperan a la BD con asyncpg y
+la sesión síncrona se cierra antes de ejecutar la vista, así una consulta
+lenta no agota el pool síncrono que usan las escrituras.
+"""
+
+from asgiref.wsgi import WsgiToAsgi
+from app import create_app
+
+app = WsgiToAsgi(create_app())
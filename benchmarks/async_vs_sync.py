@@ -0,0 +1,87 @@
+"""
+Benchmark: lecturas síncronas vs async bajo carga concurrente
+Sistema de Inventario IUCA
+
+Lanza la misma carga HTTP contra una ruta síncrona y su par async
+(/api/vistas/... y /api/async/vistas/...) de un servidor ya levantado
+con ASYNC_LECTURAS=True (uvicorn asgi:app). Así se mide la app completa:
+JWT, permisos, pool síncrono, asyncpg y serialización.
+
+Las dos rutas comparten proceso, hilos del adaptador y BD; la diferencia
+que se busca es el pool psycopg2: con una consulta lenta y más clientes
+que conexiones, la ruta síncrona espera pool_timeout (o falla con 500)
+mientras la async solo retiene conexiones asyncpg. Por eso se reportan
+también los códigos de estado.
+
+Uso:
+    python -m benchmarks.async_vs_sync --base-url http://localhost:8000/api \\
+        --token $JWT --ruta /vistas/equipos-completo/ --parametros search=Dell
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _reporte(nombre: str, latencias: list[float], estados: Counter, duracion: float) -> None:
+    latencias = sorted(latencias)
+    p95 = latencias[max(int(len(latencias) * 0.95) - 1, 0)]
+    print(
+        f'{nombre:<6} {len(latencias) / duracion:8.1f} req/s   '
+        f'p50 {statistics.median(latencias) * 1000:7.1f} ms   '
+        f'p95 {p95 * 1000:7.1f} ms   total {duracion:6.2f} s   {dict(estados)}'
+    )
+
+
+def _medir(nombre: str, url: str, args) -> None:
+    def peticion(_):
+        solicitud = urllib.request.Request(url, headers={'Authorization': f'Bearer {args.token}'})
+        inicio = time.perf_counter()
+        try:
+            with urllib.request.urlopen(solicitud, timeout=args.timeout) as respuesta:
+                respuesta.read()
+                estado = respuesta.status
+        except urllib.error.HTTPError as e:
+            estado = e.code
+        except OSError:
+            estado = 'sin_respuesta'
+        return time.perf_counter() - inicio, estado
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrencia) as ejecutor:
+        resultados = list(ejecutor.map(peticion, range(args.peticiones)))
+    duracion = time.perf_counter() - inicio
+
+    _reporte(nombre, [r[0] for r in resultados], Counter(r[1] for r in resultados), duracion)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--base-url', default='http://localhost:8000/api')
+    parser.add_argument('--ruta', default='/vistas/equipos-completo/')
+    parser.add_argument('--parametros', default='', help='query string, ej. search=Dell&per_page=50')
+    parser.add_argument('--token', default=os.getenv('BENCH_TOKEN', ''))
+    parser.add_argument('--peticiones', type=int, default=200)
+    parser.add_argument('--concurrencia', type=int, default=50, help='clientes simultáneos')
+    parser.add_argument('--timeout', type=float, default=60)
+    args = parser.parse_args(argv)
+
+    if not args.token:
+        print('Indica --token o BENCH_TOKEN (JWT con lectura en el módulo)', file=sys.stderr)
+        return 1
+
+    consulta = f'?{args.parametros}' if args.parametros else ''
+    print(f'{args.peticiones} peticiones, {args.concurrencia} clientes simultáneos')
+    _medir('sync', f'{args.base_url}{args.ruta}{consulta}', args)
+    _medir('async', f'{args.base_url}/async{args.ruta}{consulta}', args)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
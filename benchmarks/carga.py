@@ -0,0 +1,286 @@
+"""
+Prueba de carga concurrente: listados, edición con bloqueo y eliminación
+Sistema de Inventario IUCA
+
+Varios hilos (uno por sesión simulada, repartidos entre los accesos con
+todos los permisos de benchmarks/generador.py --editores) repiten durante
+--segundos una mezcla de acciones contra la app en proceso (un test client
+por hilo, el pool real de SQLAlchemy) y una BD PostgreSQL local:
+
+    listar     GET  /api/vistas/equipos-completo/?page=N
+    editar     GET  /api/equipos/<id>          (versión que ve el usuario)
+               POST /api/concurrency/lock      (edición)
+               PUT  /api/equipos/<id>          (con la versión leída)
+               POST /api/concurrency/unlock    (solo si el PUT falló)
+    eliminar   POST /api/equipos/              (activo propio)
+               POST /api/concurrency/lock      (eliminación)
+               DELETE /api/equipos/<id>        (lock_required)
+
+Las ediciones se concentran en --calientes equipos para provocar
+contención. Con --sin-bloqueo > 0 esa fracción de ediciones hace el PUT
+sin pedir bloqueo (como un cliente que lo omite) y compite solo por versión.
+
+Reporta throughput, p50/p95/p99 por paso, tasa de 409 por tipo
+(locked_by_other / conflict) y los errores de BD vistos por el engine
+(deadlocks, serialización, IntegrityError) mediante el evento handle_error.
+
+Uso:
+    python -m benchmarks.carga --hilos 32 --segundos 60 --calientes 10
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# SQLSTATE → nombre en el reporte
+_ERRORES_BD = {
+    '40P01': 'deadlock',
+    '40001': 'serializacion',
+    '23505': 'unicidad',
+    '23503': 'llave_foranea',
+    '55P03': 'lock_no_disponible',
+    '57014': 'cancelada_por_timeout',
+}
+
+
+class Registro:
+    """Latencias y estados por paso, compartidos entre hilos."""
+
+    def __init__(self):
+        self._candado = threading.Lock()
+        self.latencias = defaultdict(list)
+        self.estados = defaultdict(Counter)
+        self.conflictos = defaultdict(Counter)
+        self.errores_bd = Counter()
+
+    def anotar(self, paso: str, duracion: float, respuesta) -> None:
+        tipo = None
+        if respuesta.status_code == 409:
+            tipo = (respuesta.get_json(silent=True) or {}).get('error', 'otro')
+        with self._candado:
+            self.latencias[paso].append(duracion)
+            self.estados[paso][respuesta.status_code] += 1
+            if tipo:
+                self.conflictos[paso][tipo] += 1
+
+    def error_bd(self, contexto) -> None:
+        codigo = getattr(contexto.original_exception, 'pgcode', None)
+        nombre = _ERRORES_BD.get(codigo) or type(contexto.sqlalchemy_exception).__name__
+        with self._candado:
+            self.errores_bd[nombre] += 1
+
+
+class Sesion(threading.Thread):
+    """Un usuario repitiendo acciones hasta `fin`."""
+
+    def __init__(self, app, token: str, datos: dict, registro: Registro, args, semilla: int):
+        super().__init__(daemon=True)
+        self.cliente = app.test_client()
+        self.headers = {'Authorization': f'Bearer {token}', 'User-Agent': f'iuca-carga-{semilla}'}
+        self.datos = datos
+        self.registro = registro
+        self.args = args
+        self.azar = random.Random(semilla)
+
+    def _peticion(self, paso: str, metodo: str, ruta: str, cuerpo=None):
+        inicio = time.perf_counter()
+        respuesta = self.cliente.open(ruta, method=metodo, json=cuerpo, headers=self.headers)
+        self.registro.anotar(paso, time.perf_counter() - inicio, respuesta)
+        return respuesta
+
+    def listar(self):
+        pagina = self.azar.randint(1, self.datos['paginas'])
+        self._peticion('listar', 'GET', f'/api/vistas/equipos-completo/?page={pagina}&per_page=20')
+
+    def editar(self):
+        equipo_id = self.azar.choice(self.datos['calientes'])
+        respuesta = self._peticion('leer', 'GET', f'/api/equipos/{equipo_id}')
+        if respuesta.status_code != 200:
+            return
+        version = respuesta.get_json()['version']
+        bloqueo = {'tabla': 'equipos_computo', 'registro_id': equipo_id}
+
+        con_bloqueo = self.azar.random() >= self.args.sin_bloqueo
+        if con_bloqueo and self._peticion('bloquear', 'POST', '/api/concurrency/lock', bloqueo).status_code != 200:
+            return
+
+        responsables = self.datos['responsables']
+        respuesta = self._peticion('actualizar', 'PUT', f'/api/equipos/{equipo_id}', {
+            'version': version,
+            'observaciones': f'carga {self.name} {time.time():.3f}',
+            'responsables_ids': self.azar.sample(responsables, k=min(2, len(responsables))),
+        })
+        # El PUT exitoso libera el bloqueo; si falló hay que soltarlo a mano
+        if con_bloqueo and respuesta.status_code != 200:
+            self._peticion('liberar', 'POST', '/api/concurrency/unlock', bloqueo)
+
+    def eliminar(self):
+        respuesta = self._peticion('crear', 'POST', '/api/equipos/', {
+            'nombre_activo': f'CARGA-{self.name}',
+            'tipo_activo_id': self.datos['tipo_activo_id'],
+            'estado_id': self.datos['estado_id'],
+        })
+        if respuesta.status_code != 201:
+            return
+        equipo_id = respuesta.get_json()['equipo']['id_activo']
+        bloqueo = {'tabla': 'equipos_computo', 'registro_id': equipo_id, 'tipo_bloqueo': 'eliminacion'}
+        if self._peticion('bloquear_eliminacion', 'POST', '/api/concurrency/lock', bloqueo).status_code == 200:
+            self._peticion('eliminar', 'DELETE', f'/api/equipos/{equipo_id}')
+
+    def run(self):
+        acciones = (self.listar, self.editar, self.eliminar)
+        while time.monotonic() < self.args.fin:
+            self.azar.choices(acciones, weights=self.args.mezcla)[0]()
+            if self.args.pausa:
+                time.sleep(self.azar.uniform(0, self.args.pausa / 1000))
+
+
+# ── Preparación y reporte ────────────────────────────────────────────────────
+
+def _preparar(args) -> tuple[list[int], dict]:
+    """IDs de accesos editores y datos de la BD sembrada."""
+    from sqlalchemy import func, select
+    from models import CatEstado, CatTipoActivo, EquipoComputo, Permiso, Usuario
+    from utils.extesions import db
+
+    editores = db.session.scalars(
+        select(Permiso.acceso_id).where(
+            Permiso.modulo == 'computo',
+            Permiso.puede_crear, Permiso.puede_actualizar, Permiso.puede_eliminar,
+        ).order_by(Permiso.acceso_id)
+    ).all()
+    if not editores:
+        raise SystemExit('No hay accesos con todos los permisos de computo: ejecuta benchmarks.generador')
+
+    total = db.session.scalar(select(func.count()).select_from(EquipoComputo))
+    return editores, {
+        'calientes': db.session.scalars(
+            select(EquipoComputo.id_activo).order_by(EquipoComputo.id_activo).limit(args.calientes)
+        ).all(),
+        'responsables': db.session.scalars(select(Usuario.id_usuario).limit(50)).all(),
+        'paginas': max(min(total // 20, args.max_pagina), 1),
+        'tipo_activo_id': db.session.scalar(select(CatTipoActivo.id_tipo_activo).limit(1)),
+        'estado_id': db.session.scalar(select(CatEstado.id_estado).limit(1)),
+    }
+
+
+def _percentiles(latencias: list[float]) -> dict:
+    ordenadas = sorted(latencias)
+
+    def p(q):
+        return round(ordenadas[min(int(len(ordenadas) * q), len(ordenadas) - 1)] * 1000, 1)
+
+    return {'p50_ms': p(0.50), 'p95_ms': p(0.95), 'p99_ms': p(0.99), 'max_ms': round(ordenadas[-1] * 1000, 1)}
+
+
+def reporte(registro: Registro, duracion: float) -> dict:
+    total = sum(len(v) for v in registro.latencias.values())
+    pasos = {}
+    for paso, latencias in sorted(registro.latencias.items()):
+        n = len(latencias)
+        conflictos = sum(registro.conflictos[paso].values())
+        pasos[paso] = {
+            'peticiones': n,
+            **_percentiles(latencias),
+            'tasa_409': round(conflictos / n, 4),
+            'conflictos': dict(registro.conflictos[paso]),
+            'estados': {str(k): v for k, v in sorted(registro.estados[paso].items())},
+        }
+    return {
+        'duracion_s': round(duracion, 1),
+        'peticiones': total,
+        'throughput_rps': round(total / duracion, 1),
+        'pasos': pasos,
+        'errores_bd': dict(registro.errores_bd),
+    }
+
+
+def _imprimir(resultado: dict) -> None:
+    print(f"\n{resultado['peticiones']} peticiones en {resultado['duracion_s']} s "
+          f"→ {resultado['throughput_rps']} req/s\n")
+    print(f"{'paso':<22}{'n':>7}{'p50':>9}{'p95':>9}{'p99':>9}{'409':>8}  estados")
+    for paso, r in resultado['pasos'].items():
+        print(f"{paso:<22}{r['peticiones']:>7}{r['p50_ms']:>9}{r['p95_ms']:>9}{r['p99_ms']:>9}"
+              f"{r['tasa_409']:>8.1%}  {r['estados']} {r['conflictos'] or ''}")
+    print(f"\nerrores de BD: {resultado['errores_bd'] or 'ninguno'}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--url', default=None, help='default: BENCH_DATABASE_URL')
+    parser.add_argument('--hilos', type=int, default=16)
+    parser.add_argument('--segundos', type=float, default=30)
+    parser.add_argument('--calientes', type=int, default=10, help='equipos que reciben las ediciones')
+    parser.add_argument('--mezcla', type=float, nargs=3, default=(70, 25, 5),
+                        metavar=('LISTAR', 'EDITAR', 'ELIMINAR'), help='pesos de cada acción')
+    parser.add_argument('--sin-bloqueo', type=float, default=0.0,
+                        help='fracción de ediciones que hacen el PUT sin bloqueo')
+    parser.add_argument('--pausa', type=float, default=0, help='pausa máxima entre acciones (ms)')
+    parser.add_argument('--pool', type=int, default=10, help='pool_size del engine (max_overflow igual)')
+    parser.add_argument('--max-pagina', type=int, default=50)
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--salida', default=None, help='archivo JSON con el resultado')
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    url = args.url or os.getenv('BENCH_DATABASE_URL')
+    if not url:
+        print('Indica --url o BENCH_DATABASE_URL', file=sys.stderr)
+        return 1
+
+    # Config lee el entorno al importarse
+    os.environ['DATABASE_URL'] = url
+    os.environ.setdefault('JWT_SECRET_KEY', 'benchmark-' + 'x' * 32)
+    os.environ.setdefault('SECRET_KEY', 'benchmark')
+    from config import Config
+    from app import create_app
+    from flask_jwt_extended import create_access_token
+
+    class ConfigCarga(Config):
+        SQLALCHEMY_ENGINE_OPTIONS = {
+            **Config.SQLALCHEMY_ENGINE_OPTIONS,
+            'pool_size': args.pool,
+            'max_overflow': args.pool,
+        }
+        METRICAS_HABILITADAS = False
+
+    app = create_app(ConfigCarga)
+    with app.app_context():
+        editores, datos = _preparar(args)
+        tokens = [create_access_token(identity=str(a)) for a in editores]
+
+    registro = Registro()
+    event.listen(Engine, 'handle_error', registro.error_bd)
+
+    print(f'{args.hilos} hilos, {len(editores)} accesos, {len(datos["calientes"])} equipos calientes, '
+          f'{args.segundos:.0f} s, pool {args.pool}+{args.pool}')
+    args.fin = time.monotonic() + args.segundos
+    sesiones = [
+        Sesion(app, tokens[i % len(tokens)], datos, registro, args, args.semilla + i)
+        for i in range(args.hilos)
+    ]
+    inicio = time.monotonic()
+    for sesion in sesiones:
+        sesion.start()
+    for sesion in sesiones:
+        sesion.join()
+    event.remove(Engine, 'handle_error', registro.error_bd)
+
+    resultado = reporte(registro, time.monotonic() - inicio)
+    _imprimir(resultado)
+    if args.salida:
+        Path(args.salida).write_text(json.dumps(resultado, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,274 @@
+"""
+Generador de inventario sintético para benchmarks
+Sistema de Inventario IUCA
+
+Llena una BD PostgreSQL local (con el esquema, vistas y triggers ya
+creados) con volúmenes configurables. Con la misma --semilla los datos
+son idénticos, así que los resultados de benchmarks/runner.py se pueden
+comparar entre commits.
+
+    catálogos   áreas, estados, tipos de activo y de mobiliario
+    usuario     --usuarios responsables
+    acceso      --accesos cuentas con permisos; la primera es la del runner
+                (CORREO_BENCH / CONTRASENA_BENCH). Las primeras --editores
+                tienen todos los permisos (las usa benchmarks/carga.py)
+    equipos     --equipos con --specs especificaciones y 0..2 responsables
+    mobiliario  --muebles con 0..2 responsables
+    historial   --historial movimientos adicionales a los que generen los
+                triggers, repartidos en los últimos --meses meses
+
+La URL se toma de --url o BENCH_DATABASE_URL (nunca de DATABASE_URL, para
+no sembrar por error la BD de la app). --limpiar vacía antes las tablas.
+
+Uso:
+    python -m benchmarks.generador --equipos 5000 --muebles 3000 \\
+        --historial 200000 --limpiar
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+import bcrypt
+from dotenv import load_dotenv
+from sqlalchemy import column, create_engine, insert, table, text
+from sqlalchemy.dialects.postgresql import JSONB
+from models import (
+    Acceso, CatArea, CatEstado, CatTipoActivo, CatTipoMobiliario,
+    EquipoComputo, EquipoResponsable, EspecificacionEquipo, Mobiliario,
+    MobiliarioResponsable, Permiso, Usuario,
+)
+from utils.constants import MODULOS_DISPONIBLES
+
+CORREO_BENCH = 'bench@iuca.local'
+CONTRASENA_BENCH = 'bench-iuca'
+
+LOTE = 2000
+
+AREAS = ('Sistemas', 'Contabilidad', 'Recursos Humanos', 'Dirección', 'Compras',
+         'Almacén', 'Ventas', 'Jurídico', 'Mantenimiento', 'Calidad')
+ESTADOS = (('Activo', '#22c55e'), ('En reparación', '#f59e0b'), ('Baja', '#ef4444'),
+           ('Resguardo', '#3b82f6'), ('Préstamo', '#a855f7'))
+TIPOS_ACTIVO = ('Laptop', 'Escritorio', 'Monitor', 'Impresora', 'Servidor',
+                'Tablet', 'Switch', 'Proyector')
+TIPOS_MOBILIARIO = ('Escritorio', 'Silla', 'Archivero', 'Mesa', 'Librero',
+                    'Gabinete', 'Sofá', 'Pizarrón')
+MARCAS = ('Dell', 'HP', 'Lenovo', 'Apple', 'Asus', 'Acer', 'Samsung', 'Epson')
+COLORES = ('Negro', 'Gris', 'Blanco', 'Café', 'Azul')
+SUCURSALES = ('Tulancingo', 'Pachuca', 'Tizayuca', 'Huauchinango')
+ESPECIFICACIONES = (('Procesador', ('i5', 'i7', 'Ryzen 5', 'Ryzen 7', 'M2')),
+                    ('RAM', ('8 GB', '16 GB', '32 GB')),
+                    ('Almacenamiento', ('256 GB SSD', '512 GB SSD', '1 TB HDD')),
+                    ('Sistema operativo', ('Windows 11', 'Windows 10', 'macOS', 'Ubuntu')),
+                    ('Pantalla', ('14"', '15.6"', '24"', '27"')),
+                    ('Tarjeta de red', ('Gigabit', 'WiFi 6')))
+NOMBRES = ('Ana', 'Luis', 'María', 'José', 'Carmen', 'Jorge', 'Laura', 'Miguel',
+           'Sofía', 'Carlos', 'Elena', 'Pedro', 'Lucía', 'Diego', 'Paola')
+APELLIDOS = ('García', 'Hernández', 'López', 'Martínez', 'Pérez', 'Sánchez',
+             'Ramírez', 'Cruz', 'Flores', 'Gómez', 'Torres', 'Vargas')
+
+# No hay modelo para la tabla base (el ORM lee vista_historial_completa)
+HISTORIAL = table(
+    'historial',
+    column('tabla'), column('operacion'), column('registro_id'),
+    column('cambios', JSONB), column('fecha'), column('usuario_id'),
+)
+
+# Orden de TRUNCATE: CASCADE cubre las FK, RESTART IDENTITY deja los IDs
+# iguales entre corridas con la misma semilla
+TABLAS = (
+    'historial', 'bloqueos_activos', 'especificaciones_equipo',
+    'equipos_responsables', 'mobiliario_responsables', 'equipos_computo',
+    'mobiliario', 'permisos', 'usuario', 'acceso', 'cat_areas', 'cat_estados',
+    'cat_tipos_activo', 'cat_tipos_mobiliario',
+)
+
+
+def _insertar(conn, modelo, filas: list[dict], clave=None) -> list:
+    """INSERT por lotes; con `clave` devuelve los IDs en el orden de `filas`."""
+    tabla = modelo.__table__ if hasattr(modelo, '__table__') else modelo
+    ids = []
+    for i in range(0, len(filas), LOTE):
+        lote = filas[i:i + LOTE]
+        if clave is None:
+            conn.execute(insert(tabla), lote)
+        else:
+            sentencia = insert(tabla).returning(tabla.c[clave], sort_by_parameter_order=True)
+            ids += conn.execute(sentencia, lote).scalars().all()
+    return ids
+
+
+def _responsables(azar: random.Random, usuarios: list[int]) -> list[int]:
+    return azar.sample(usuarios, k=min(azar.choice((0, 1, 1, 2)), len(usuarios)))
+
+
+def generar(conn, args) -> dict:
+    """Inserta todos los volúmenes; devuelve las filas creadas por tabla."""
+    azar = random.Random(args.semilla)
+    ahora = datetime.now()
+
+    areas = _insertar(conn, CatArea, [
+        {'nombre_area': n, 'activo': True} for n in AREAS
+    ], 'id_area')
+    estados = _insertar(conn, CatEstado, [
+        {'nombre_estado': n, 'color_hex': c, 'activo': True} for n, c in ESTADOS
+    ], 'id_estado')
+    tipos_activo = _insertar(conn, CatTipoActivo, [
+        {'nombre_tipo': n, 'activo': True} for n in TIPOS_ACTIVO
+    ], 'id_tipo_activo')
+    tipos_mobiliario = _insertar(conn, CatTipoMobiliario, [
+        {'nombre_tipo': n, 'activo': True} for n in TIPOS_MOBILIARIO
+    ], 'id_tipo_mobiliario')
+
+    # Un solo hash: bcrypt con el costo por defecto tarda ~0.25 s por llamada
+    hash_bench = bcrypt.hashpw(CONTRASENA_BENCH.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    accesos = _insertar(conn, Acceso, [
+        {
+            'nombre_usuario': 'Benchmark' if i == 0 else f'Acceso {i}',
+            'correo_electronico': CORREO_BENCH if i == 0 else f'acceso{i}@iuca.local',
+            'contrasena_hash': hash_bench,
+            'area_id': azar.choice(areas),
+        }
+        for i in range(max(args.accesos, 1))
+    ], 'id_acceso')
+    _insertar(conn, Permiso, [
+        {
+            'acceso_id': acceso_id,
+            'modulo': modulo,
+            'puede_leer': True,
+            'puede_crear': i < args.editores or azar.random() < 0.5,
+            'puede_actualizar': i < args.editores or azar.random() < 0.5,
+            'puede_eliminar': i < args.editores or azar.random() < 0.2,
+        }
+        for i, acceso_id in enumerate(accesos)
+        for modulo in MODULOS_DISPONIBLES
+    ])
+
+    usuarios = _insertar(conn, Usuario, [
+        {
+            'numero_nomina': f'N{i:06d}',
+            'nombre_usuario': f'{azar.choice(NOMBRES)} {azar.choice(APELLIDOS)} {azar.choice(APELLIDOS)}',
+            'puesto': azar.choice(('Analista', 'Auxiliar', 'Coordinador', 'Gerente', 'Técnico')),
+            'area_id': azar.choice(areas),
+        }
+        for i in range(args.usuarios)
+    ], 'id_usuario')
+
+    equipos = _insertar(conn, EquipoComputo, [
+        {
+            'tipo_activo_id': azar.choice(tipos_activo),
+            'nombre_activo': f'EQ-{i:06d}',
+            'marca': azar.choice(MARCAS),
+            'modelo': f'M{azar.randint(100, 999)}',
+            'numero_serie': f'SN{args.semilla:03d}{i:08d}',
+            'estado_id': azar.choice(estados),
+            'sucursal_nombre': azar.choice(SUCURSALES),
+            'observaciones': azar.choice((None, 'Revisión anual', 'Garantía vigente')),
+        }
+        for i in range(args.equipos)
+    ], 'id_activo')
+    _insertar(conn, EspecificacionEquipo, [
+        {
+            'equipo_id': equipo_id,
+            'nombre_especificacion': nombre,
+            'valor_especificacion': azar.choice(valores),
+            'orden': orden,
+        }
+        for equipo_id in equipos
+        for orden, (nombre, valores) in enumerate(ESPECIFICACIONES[:args.specs], start=1)
+    ])
+    _insertar(conn, EquipoResponsable, [
+        {'equipo_id': equipo_id, 'usuario_id': usuario_id}
+        for equipo_id in equipos
+        for usuario_id in _responsables(azar, usuarios)
+    ])
+
+    muebles = _insertar(conn, Mobiliario, [
+        {
+            'tipo_mobiliario_id': azar.choice(tipos_mobiliario),
+            'marca': azar.choice(MARCAS),
+            'modelo': f'MB{azar.randint(100, 999)}',
+            'color': azar.choice(COLORES),
+            'estado_id': azar.choice(estados),
+            'sucursal_nombre': azar.choice(SUCURSALES),
+        }
+        for _ in range(args.muebles)
+    ], 'id_mueble')
+    _insertar(conn, MobiliarioResponsable, [
+        {'mueble_id': mueble_id, 'usuario_id': usuario_id}
+        for mueble_id in muebles
+        for usuario_id in _responsables(azar, usuarios)
+    ])
+
+    # Movimientos en orden cronológico, como los escriben los triggers
+    origen = ahora - timedelta(days=30 * args.meses)
+    paso = (ahora - origen) / max(args.historial, 1)
+    registros = {'equipos_computo': equipos, 'mobiliario': muebles, 'usuario': usuarios}
+    historial = []
+    for i in range(args.historial):
+        tabla = azar.choice(tuple(registros))
+        if not registros[tabla]:
+            continue
+        operacion = azar.choices(('INSERT', 'UPDATE', 'DELETE'), weights=(2, 7, 1))[0]
+        cambios = None
+        if operacion == 'UPDATE':
+            cambios = {'estado_id': {'old': azar.choice(estados), 'new': azar.choice(estados)}}
+        historial.append({
+            'tabla': tabla,
+            'operacion': operacion,
+            'registro_id': str(azar.choice(registros[tabla])),
+            'cambios': cambios,
+            'fecha': origen + paso * i,
+            'usuario_id': azar.choice(accesos),
+        })
+    _insertar(conn, HISTORIAL, historial)
+
+    return {
+        'cat_areas': len(areas), 'cat_estados': len(estados),
+        'cat_tipos_activo': len(tipos_activo), 'cat_tipos_mobiliario': len(tipos_mobiliario),
+        'acceso': len(accesos), 'usuario': len(usuarios), 'equipos_computo': len(equipos),
+        'mobiliario': len(muebles), 'historial': len(historial),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--url', default=None, help='default: BENCH_DATABASE_URL')
+    parser.add_argument('--equipos', type=int, default=5000)
+    parser.add_argument('--specs', type=int, default=4, help=f'especificaciones por equipo (máx. {len(ESPECIFICACIONES)})')
+    parser.add_argument('--muebles', type=int, default=3000)
+    parser.add_argument('--usuarios', type=int, default=300, help='responsables')
+    parser.add_argument('--accesos', type=int, default=20)
+    parser.add_argument('--editores', type=int, default=10, help='accesos con todos los permisos')
+    parser.add_argument('--historial', type=int, default=100000)
+    parser.add_argument('--meses', type=int, default=12, help='antigüedad del historial')
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--limpiar', action='store_true', help='TRUNCATE de las tablas antes de generar')
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    url = args.url or os.getenv('BENCH_DATABASE_URL')
+    if not url:
+        print('Indica --url o BENCH_DATABASE_URL', file=sys.stderr)
+        return 1
+
+    engine = create_engine(url)
+    inicio = time.perf_counter()
+    with engine.begin() as conn:
+        if args.limpiar:
+            conn.execute(text(f"TRUNCATE {', '.join(TABLAS)} RESTART IDENTITY CASCADE"))
+        volumenes = generar(conn, args)
+    with engine.connect() as conn:
+        conn.execution_options(isolation_level='AUTOCOMMIT').execute(text('ANALYZE'))
+    engine.dispose()
+
+    for tabla, filas in volumenes.items():
+        print(f'{tabla:<22} {filas:>9}')
+    print(f'listo en {time.perf_counter() - inicio:.1f} s')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,376 @@
+"""
+Pruebas de regresión de planes de consulta
+Sistema de Inventario IUCA
+
+Arma con los constructores de la app (_query_equipos, _query_mobiliario,
+_query_accesos, _query_historial_filtrada, filtrar_por_cursor) las
+consultas de los listados críticos, tal como las ejecutaría la petición,
+y obtiene su plan con EXPLAIN (FORMAT JSON) —sin ANALYZE, no se ejecutan—
+contra la BD sembrada por benchmarks/generador.py. En cada plan comprueba:
+
+    índices     aparece al menos uno de los índices esperados por el caso
+                (el índice de una partición cuenta como el de su tabla padre)
+    seq scan    ninguna tabla de más de --max-filas-seq-scan filas (sumando
+                sus particiones) se recorre con Seq Scan, salvo las que el
+                caso permite (búsquedas ILIKE '%...%', que no usan índice)
+    costo       el costo total estimado no supera el techo del caso
+                multiplicado por --factor-costo
+
+Los techos se calibraron con PostgreSQL 16 sobre una BD sembrada con los
+valores por defecto de benchmarks/generador.py (VOLUMENES_CALIBRACION) y
+las migraciones 001-004 aplicadas: cada techo es unas 3 veces el costo
+medido (mínimo 15) y queda por debajo del costo del plan sin el índice
+que el caso vigila (ej. vistas_equipos: 546 medido, 9187 sin
+idx_especificaciones_equipo; historial_cursor: 8 y 4709 sin
+idx_historial_fecha_id). El DDL de las vistas no está en el
+repositorio: se usaron vistas armadas con las columnas de los modelos
+(catálogos con LEFT JOIN, especificaciones y responsables en subconsultas
+por fila); recalibrar si la vista de producción difiere.
+Con una BD más grande, subir --factor-costo. Un índice que se borra, una
+migración sin aplicar o un cambio de filtro que deja de usar el índice
+hacen fallar el caso. Sale con código 1 si alguno falla:
+
+    python -m benchmarks.planes
+    python -m benchmarks.planes --solo historial --mostrar
+
+Los mismos casos corren con pytest (tests/test_planes.py) si está
+definida BENCH_DATABASE_URL.
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta
+from urllib.parse import urlencode
+from dotenv import load_dotenv
+
+_POR_PAGINA = 20
+_NODOS_INDICE = {'Index Scan', 'Index Only Scan', 'Bitmap Index Scan'}
+
+# Filas con las que se midieron los techos de costo_max (generador por
+# defecto; los triggers no estaban instalados, historial es solo el sembrado)
+VOLUMENES_CALIBRACION = {
+    'equipos_computo': 5000, 'especificaciones_equipo': 20000,
+    'equipos_responsables': 5000, 'mobiliario': 3000, 'usuario': 300,
+    'acceso': 20, 'historial': 100000,
+}
+
+NOMBRES_CASOS = (
+    'vistas_equipos', 'vistas_equipos_filtros', 'vistas_equipos_busqueda',
+    'vistas_equipos_responsables', 'vistas_mobiliario_responsables',
+    'vistas_accesos_permisos', 'historial_pagina', 'historial_cursor',
+    'historial_cursor_fechas', 'historial_cursor_tipo_registro',
+    'historial_por_tabla_cursor', 'historial_busqueda',
+)
+
+
+# ── Casos ────────────────────────────────────────────────────────────────────
+
+def _datos_casos() -> dict:
+    """IDs y nombres reales de la BD sembrada para armar los filtros."""
+    from sqlalchemy import func, select
+    from models import CatEstado, CatTipoActivo, EquipoResponsable
+    from utils.extesions import db
+
+    responsables = db.session.scalars(
+        select(EquipoResponsable.usuario_id)
+        .group_by(EquipoResponsable.usuario_id)
+        .order_by(func.count().desc())
+        .limit(2)
+    ).all()
+    if len(responsables) < 2:
+        raise SystemExit('La BD no tiene responsables: ejecuta antes benchmarks.generador')
+
+    hasta = datetime.now().date()
+    return {
+        'responsables': ','.join(map(str, responsables)),
+        'estado': db.session.scalar(select(CatEstado.nombre_estado).limit(1)),
+        'tipo_activo': db.session.scalar(select(CatTipoActivo.nombre_tipo).limit(1)),
+        'fecha_desde': (hasta - timedelta(days=30)).isoformat(),
+        'fecha_hasta': hasta.isoformat(),
+    }
+
+
+def casos(datos: dict) -> dict[str, dict]:
+    """
+    { caso: { args, consulta, indices, seq_scan_permitido, costo_max } },
+    en el orden de NOMBRES_CASOS. `consulta` se llama dentro de un request
+    context con `args` como query string y devuelve el Query ya paginado,
+    sin ejecutar.
+    """
+    from models import VistaHistorialCompleta
+    from routes.historial_routes import (
+        _CLAVE_CURSOR, _ordenar_historial, _query_historial_filtrada,
+    )
+    from routes.vistas_routes import _query_accesos, _query_equipos, _query_mobiliario
+    from utils.paginacion import filtrar_por_cursor
+
+    def pagina(construir):
+        # Primera página de paginar(): per_page + 1 filas
+        return lambda: construir().limit(_POR_PAGINA + 1).offset(0)
+
+    def cursor(construir):
+        return lambda: filtrar_por_cursor(construir(), _CLAVE_CURSOR, '', _POR_PAGINA)
+
+    def historial():
+        return _ordenar_historial(_query_historial_filtrada())
+
+    def historial_tabla():
+        return VistaHistorialCompleta.query.filter_by(tabla='equipos_computo')
+
+    fechas = {'fecha_desde': datos['fecha_desde'], 'fecha_hasta': datos['fecha_hasta']}
+
+    return {
+        # ── Vistas ──────────────────────────────────────────────────────
+        'vistas_equipos': {
+            'args': {},
+            'consulta': pagina(_query_equipos),
+            # Subconsulta de especificaciones de la vista, una por fila
+            'indices': ['idx_especificaciones_equipo'],
+            'costo_max': 1500,
+        },
+        'vistas_equipos_filtros': {
+            'args': {'estado_id': datos['estado'], 'tipo_activo_id': datos['tipo_activo'],
+                     'sort_by': 'nombre_activo', 'sort_dir': 'desc'},
+            'consulta': pagina(_query_equipos),
+            'costo_max': 2000,
+        },
+        'vistas_equipos_busqueda': {
+            'args': {'search': 'Dell'},
+            'consulta': pagina(_query_equipos),
+            'seq_scan_permitido': {'equipos_computo'},
+            'costo_max': 1500,
+        },
+        'vistas_equipos_responsables': {
+            'args': {'usuario_id': datos['responsables']},
+            'consulta': pagina(_query_equipos),
+            'indices': ['idx_equipos_responsables_usuario'],
+            'costo_max': 150,
+        },
+        'vistas_mobiliario_responsables': {
+            'args': {'usuario_id': datos['responsables']},
+            'consulta': pagina(_query_mobiliario),
+            'indices': ['idx_mobiliario_responsables_usuario'],
+            'costo_max': 100,
+        },
+        'vistas_accesos_permisos': {
+            'args': {'permisos': '{"computo": ["puede_leer", "puede_eliminar"], "historial": ["puede_leer"]}'},
+            'consulta': pagina(_query_accesos),
+            'costo_max': 900,
+        },
+
+        # ── Historial ───────────────────────────────────────────────────
+        'historial_pagina': {
+            'args': {},
+            'consulta': pagina(historial),
+            'costo_max': 30,
+        },
+        'historial_cursor': {
+            'args': {},
+            'consulta': cursor(_query_historial_filtrada),
+            'indices': ['idx_historial_fecha_id'],
+            'costo_max': 30,
+        },
+        'historial_cursor_fechas': {
+            'args': fechas,
+            'consulta': cursor(_query_historial_filtrada),
+            'indices': ['idx_historial_fecha_id', 'idx_historial_fecha_brin'],
+            'costo_max': 15,
+        },
+        'historial_cursor_tipo_registro': {
+            'args': {'tipo_registro': 'equipos_computo'},
+            'consulta': cursor(_query_historial_filtrada),
+            'indices': ['idx_historial_tabla_fecha_id', 'idx_historial_fecha_id'],
+            'costo_max': 40,
+        },
+        'historial_por_tabla_cursor': {
+            'args': {},
+            'consulta': cursor(historial_tabla),
+            # Con un tercio de las filas en la tabla, el planificador alterna
+            # entre ambos según la partición; los dos evitan el Sort
+            'indices': ['idx_historial_tabla_fecha_id', 'idx_historial_fecha_id'],
+            'costo_max': 40,
+        },
+        'historial_busqueda': {
+            'args': {'search': 'equipo'},
+            'consulta': pagina(historial),
+            'seq_scan_permitido': {'historial'},
+            'costo_max': 50,
+        },
+    }
+
+
+# ── Planes ───────────────────────────────────────────────────────────────────
+
+def explicar(query) -> dict:
+    """Nodo raíz del plan de EXPLAIN (FORMAT JSON) de un Query, sin ejecutarlo."""
+    from utils.extesions import db
+
+    compilado = query.statement.compile(
+        dialect=db.session.get_bind().dialect,
+        compile_kwargs={'render_postcompile': True},
+    )
+    plan = db.session.connection().exec_driver_sql(
+        'EXPLAIN (FORMAT JSON) ' + compilado.string,
+        compilado.params,
+    ).scalar()
+    return plan[0]['Plan']
+
+
+def _nodos(plan: dict):
+    yield plan
+    for hijo in plan.get('Plans', ()):
+        yield from _nodos(hijo)
+
+
+def _filas_por_tabla(relaciones: set[str]) -> dict[str, tuple[str, float]]:
+    """{ relación: (tabla raíz, filas estimadas) }; una partición cuenta para su tabla padre."""
+    from sqlalchemy import text
+    from utils.extesions import db
+
+    if not relaciones:
+        return {}
+    filas = db.session.execute(text("""
+        SELECT c.relname, COALESCE(p.relname, c.relname), GREATEST(c.reltuples, 0)
+        FROM pg_class c
+        LEFT JOIN pg_inherits i ON i.inhrelid = c.oid
+        LEFT JOIN pg_class p ON p.oid = i.inhparent
+        WHERE c.relname = ANY(:relaciones) AND c.relnamespace = 'public'::regnamespace
+    """), {'relaciones': list(relaciones)}).all()
+    return {relacion: (tabla, total) for relacion, tabla, total in filas}
+
+
+def _indices_raiz(indices: set[str]) -> set[str]:
+    """
+    Nombres de los índices del plan con cada índice de partición
+    (historial_p2026_01_fecha_id_historial_idx) cambiado por el índice de
+    la tabla padre del que se creó (idx_historial_fecha_id).
+    """
+    from sqlalchemy import text
+    from utils.extesions import db
+
+    if not indices:
+        return set()
+    return set(db.session.scalars(text("""
+        SELECT COALESCE(p.relname, c.relname)
+        FROM pg_class c
+        LEFT JOIN pg_inherits i ON i.inhrelid = c.oid
+        LEFT JOIN pg_class p ON p.oid = i.inhparent
+        WHERE c.relname = ANY(:indices) AND c.relnamespace = 'public'::regnamespace
+    """), {'indices': list(indices)}))
+
+
+def comprobar(plan: dict, caso: dict, max_filas_seq_scan: int, factor_costo: float) -> list[str]:
+    """Lista de incumplimientos del plan; vacía si el caso pasa."""
+    nodos = list(_nodos(plan))
+    fallas = []
+
+    indices_esperados = caso.get('indices')
+    if indices_esperados:
+        usados = _indices_raiz({n['Index Name'] for n in nodos if n['Node Type'] in _NODOS_INDICE})
+        if not usados.intersection(indices_esperados):
+            fallas.append(
+                f"no usa {' ni '.join(indices_esperados)} "
+                f"(índices en el plan: {', '.join(sorted(usados)) or 'ninguno'})"
+            )
+
+    secuenciales = {n['Relation Name'] for n in nodos if n['Node Type'] == 'Seq Scan'}
+    recorridas = {}
+    for relacion, (tabla, total) in _filas_por_tabla(secuenciales).items():
+        recorridas[tabla] = recorridas.get(tabla, 0) + total
+    permitidas = caso.get('seq_scan_permitido', set())
+    for tabla, total in sorted(recorridas.items()):
+        if total > max_filas_seq_scan and tabla not in permitidas:
+            fallas.append(f'Seq Scan sobre {tabla} (~{int(total)} filas)')
+
+    techo = caso['costo_max'] * factor_costo
+    if plan['Total Cost'] > techo:
+        fallas.append(f"costo {plan['Total Cost']:.0f} > techo {techo:.0f}")
+
+    return fallas
+
+
+def _arbol(plan: dict, nivel: int = 0) -> list[str]:
+    detalle = plan.get('Index Name') or plan.get('Relation Name') or ''
+    lineas = [
+        f"{'  ' * nivel}-> {plan['Node Type']} {detalle}".rstrip()
+        + f"  (costo {plan['Total Cost']:.0f}, filas {plan['Plan Rows']})"
+    ]
+    for hijo in plan.get('Plans', ()):
+        lineas += _arbol(hijo, nivel + 1)
+    return lineas
+
+
+# ── Ejecución ────────────────────────────────────────────────────────────────
+
+def crear_app(url: str):
+    """App apuntando a la BD sembrada, sin métricas ni perfilador."""
+    # Config lee el entorno al importarse
+    os.environ['DATABASE_URL'] = url
+    os.environ.setdefault('JWT_SECRET_KEY', 'benchmark-' + 'x' * 32)
+    os.environ.setdefault('SECRET_KEY', 'benchmark')
+    from config import Config
+    from app import create_app
+
+    class ConfigPlanes(Config):
+        METRICAS_HABILITADAS = False
+        PERFILADOR_HABILITADO = False
+
+    return create_app(ConfigPlanes)
+
+
+def evaluar(app, caso: dict, max_filas_seq_scan: int = 10000,
+            factor_costo: float = 1.0) -> tuple[dict, list[str]]:
+    """(plan, incumplimientos) de un caso de casos()."""
+    with app.test_request_context(query_string=urlencode(caso['args'])):
+        plan = explicar(caso['consulta']())
+        return plan, comprobar(plan, caso, max_filas_seq_scan, factor_costo)
+
+
+def ejecutar(args) -> int:
+    url = args.url or os.getenv('BENCH_DATABASE_URL')
+    if not url:
+        print('Indica --url o BENCH_DATABASE_URL', file=sys.stderr)
+        return 1
+
+    app = crear_app(url)
+    with app.app_context():
+        datos = _datos_casos()
+
+    fallidos = 0
+    for nombre, caso in casos(datos).items():
+        if args.solo and not any(nombre.startswith(s) for s in args.solo):
+            continue
+        plan, fallas = evaluar(app, caso, args.max_filas_seq_scan, args.factor_costo)
+
+        techo = caso['costo_max'] * args.factor_costo
+        print(f"{nombre:<32} costo {plan['Total Cost']:9.0f} / {techo:<7.0f} "
+              f"{'FALLA' if fallas else 'ok'}")
+        for falla in fallas:
+            print(f'    {falla}')
+        if fallas:
+            fallidos += 1
+            if args.mostrar:
+                print('\n'.join('      ' + linea for linea in _arbol(plan)))
+
+    print(f'{fallidos} caso(s) con regresión de plan' if fallidos else 'todos los planes ok')
+    return 1 if fallidos else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--url', default=None, help='default: BENCH_DATABASE_URL')
+    parser.add_argument('--solo', nargs='*', help='prefijos de casos a comprobar')
+    parser.add_argument('--max-filas-seq-scan', type=int, default=10000,
+                        help='tablas más grandes no deben recorrerse con Seq Scan')
+    parser.add_argument('--factor-costo', type=float, default=1.0,
+                        help='multiplica los techos de costo (BD más grande que la del generador)')
+    parser.add_argument('--mostrar', action='store_true', help='imprimir el plan de los casos que fallan')
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    return ejecutar(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
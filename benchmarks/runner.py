@@ -0,0 +1,282 @@
+"""
+Runner de benchmarks de endpoints
+Sistema de Inventario IUCA
+
+Mide los endpoints más usados con el test client de Flask contra la BD
+sembrada por benchmarks/generador.py (sin red ni servidor de por medio):
+
+    vistas      listados de equipos / mobiliario / responsables, con
+                búsqueda, filtros y orden
+    historial   primera página, página profunda, cursor y búsqueda
+    catálogos   listado paginado y completo
+    bloqueos    adquirir + liberar sobre un equipo
+    login       force-login del acceso de benchmark (incluye bcrypt)
+
+Cada paso se repite --iteraciones veces tras --calentamiento llamadas sin
+medir. Con INSTRUMENTACION_SQL activa se toman también el número de
+sentencias y el tiempo en BD del header Server-Timing. El resultado se
+escribe en JSON (por defecto benchmarks/resultados/<commit>.json).
+
+Uso:
+    python -m benchmarks.runner --iteraciones 50
+    python -m benchmarks.runner --comparar base.json nuevo.json --umbral 15
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from dotenv import load_dotenv
+
+_SERVER_TIMING = re.compile(r'db;dur=([\d.]+), db-count;desc="(\d+)"')
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'desconocido'
+
+
+def _percentil(valores: list[float], p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(int(len(ordenados) * p), len(ordenados) - 1)]
+
+
+# ── Escenarios ───────────────────────────────────────────────────────────────
+
+def _datos_escenarios() -> dict:
+    """IDs y nombres reales de la BD sembrada para armar los filtros."""
+    from sqlalchemy import func, select
+    from models import Acceso, CatEstado, CatTipoActivo, EquipoComputo, EquipoResponsable
+    from utils.extesions import db
+    from benchmarks.generador import CORREO_BENCH
+
+    acceso = Acceso.query.filter_by(correo_electronico=CORREO_BENCH).first()
+    if acceso is None:
+        raise SystemExit(f'No existe {CORREO_BENCH}: ejecuta antes benchmarks.generador')
+
+    # El responsable con más equipos hace que el filtro por usuario devuelva filas
+    responsable = db.session.execute(
+        select(EquipoResponsable.usuario_id)
+        .group_by(EquipoResponsable.usuario_id)
+        .order_by(func.count().desc())
+        .limit(1)
+    ).scalar()
+
+    return {
+        'acceso_id': acceso.id_acceso,
+        'equipo_id': db.session.scalar(select(func.min(EquipoComputo.id_activo))),
+        'responsable_id': responsable,
+        'estado': db.session.scalar(select(CatEstado.nombre_estado).limit(1)),
+        'tipo_activo': db.session.scalar(select(CatTipoActivo.nombre_tipo).limit(1)),
+    }
+
+
+def escenarios(datos: dict) -> dict[str, list[tuple]]:
+    """
+    { escenario: [(paso, método, ruta, cuerpo), ...] }; los pasos de un
+    escenario se ejecutan en orden en cada iteración y se miden por separado.
+    """
+    from benchmarks.generador import CONTRASENA_BENCH, CORREO_BENCH
+
+    vistas = '/api/vistas'
+    bloqueo = {'tabla': 'equipos_computo', 'registro_id': datos['equipo_id']}
+    filtros = (
+        f"estado_id={datos['estado']}&tipo_activo_id={datos['tipo_activo']}"
+        f"&usuario_id={datos['responsable_id']}&sort_by=nombre_activo&sort_dir=desc"
+    )
+    return {
+        'vistas_equipos': [
+            ('vistas_equipos', 'GET', f'{vistas}/equipos-completo/?per_page=20', None)],
+        'vistas_equipos_busqueda': [
+            ('vistas_equipos_busqueda', 'GET', f'{vistas}/equipos-completo/?search=Dell', None)],
+        'vistas_equipos_filtros': [
+            ('vistas_equipos_filtros', 'GET', f'{vistas}/equipos-completo/?{filtros}', None)],
+        'vistas_mobiliario_busqueda': [
+            ('vistas_mobiliario_busqueda', 'GET', f'{vistas}/mobiliarios-completo/?search=Negro', None)],
+        'vistas_responsables': [
+            ('vistas_responsables', 'GET', f'{vistas}/responsables-completo/?search=Garc', None)],
+        'historial_pagina': [
+            ('historial_pagina', 'GET', '/api/historial/?page=1&per_page=20', None)],
+        'historial_pagina_profunda': [
+            ('historial_pagina_profunda', 'GET', '/api/historial/?page=200&per_page=20', None)],
+        'historial_cursor': [
+            ('historial_cursor', 'GET', '/api/historial/?cursor=&per_page=20', None)],
+        'historial_busqueda': [
+            ('historial_busqueda', 'GET', '/api/historial/?search=equipo&per_page=20', None)],
+        'catalogos_paginado': [
+            ('catalogos_paginado', 'GET', '/api/catalogos/areas', None)],
+        'catalogos_completo': [
+            ('catalogos_completo', 'GET', '/api/catalogos/estados-completo', None)],
+        'bloqueo': [
+            ('bloqueo_adquirir', 'POST', '/api/concurrency/lock', bloqueo),
+            ('bloqueo_liberar', 'POST', '/api/concurrency/unlock', bloqueo)],
+        'login': [
+            ('login', 'POST', '/api/auth/force-login',
+             {'correo_electronico': CORREO_BENCH, 'password': CONTRASENA_BENCH})],
+    }
+
+
+# ── Medición ─────────────────────────────────────────────────────────────────
+
+def _medir(cliente, headers, pasos, iteraciones: int, calentamiento: int) -> dict:
+    muestras = {paso: {'ms': [], 'consultas': [], 'db_ms': [], 'estados': {}} for paso, *_ in pasos}
+
+    for i in range(calentamiento + iteraciones):
+        for paso, metodo, ruta, cuerpo in pasos:
+            inicio = time.perf_counter()
+            respuesta = cliente.open(ruta, method=metodo, json=cuerpo, headers=headers)
+            duracion = (time.perf_counter() - inicio) * 1000
+            if i < calentamiento:
+                continue
+
+            m = muestras[paso]
+            m['ms'].append(duracion)
+            estado = str(respuesta.status_code)
+            m['estados'][estado] = m['estados'].get(estado, 0) + 1
+            timing = _SERVER_TIMING.search(respuesta.headers.get('Server-Timing', ''))
+            if timing:
+                m['db_ms'].append(float(timing.group(1)))
+                m['consultas'].append(int(timing.group(2)))
+
+    return {
+        paso: {
+            'iteraciones': len(m['ms']),
+            'estados': m['estados'],
+            'min_ms': round(min(m['ms']), 2),
+            'p50_ms': round(statistics.median(m['ms']), 2),
+            'p95_ms': round(_percentil(m['ms'], 0.95), 2),
+            'max_ms': round(max(m['ms']), 2),
+            'media_ms': round(statistics.fmean(m['ms']), 2),
+            'db_p50_ms': round(statistics.median(m['db_ms']), 2) if m['db_ms'] else None,
+            'consultas': max(m['consultas']) if m['consultas'] else None,
+        }
+        for paso, m in muestras.items()
+    }
+
+
+def _volumenes() -> dict:
+    from sqlalchemy import text
+    from utils.extesions import db
+    from benchmarks.generador import TABLAS
+
+    # Estimación del planner (COUNT(*) sobre historial tardaría más que el
+    # benchmark); en tablas particionadas se suman las particiones
+    filas = db.session.execute(text("""
+        SELECT c.relname,
+               (GREATEST(c.reltuples, 0) + COALESCE((
+                   SELECT sum(GREATEST(p.reltuples, 0))
+                   FROM pg_inherits i JOIN pg_class p ON p.oid = i.inhrelid
+                   WHERE i.inhparent = c.oid), 0))::bigint
+        FROM pg_class c
+        WHERE c.relname = ANY(:tablas) AND c.relnamespace = 'public'::regnamespace
+    """), {'tablas': list(TABLAS)}).all()
+    return dict(sorted(filas))
+
+
+def ejecutar(args) -> int:
+    url = args.url or os.getenv('BENCH_DATABASE_URL')
+    if not url:
+        print('Indica --url o BENCH_DATABASE_URL', file=sys.stderr)
+        return 1
+
+    # Config lee el entorno al importarse
+    os.environ['DATABASE_URL'] = url
+    os.environ.setdefault('JWT_SECRET_KEY', 'benchmark-' + 'x' * 32)
+    os.environ.setdefault('SECRET_KEY', 'benchmark')
+    from config import Config
+    from app import create_app
+    from flask_jwt_extended import create_access_token
+
+    class ConfigBenchmark(Config):
+        INSTRUMENTACION_SQL = True
+        METRICAS_HABILITADAS = False
+
+    app = create_app(ConfigBenchmark)
+    with app.app_context():
+        datos = _datos_escenarios()
+        token = create_access_token(identity=str(datos['acceso_id']))
+        volumenes = _volumenes()
+
+    headers = {'Authorization': f'Bearer {token}', 'User-Agent': 'iuca-benchmark'}
+    cliente = app.test_client()
+    resultados = {}
+    for nombre, pasos in escenarios(datos).items():
+        if args.solo and not any(nombre.startswith(s) for s in args.solo):
+            continue
+        iteraciones = args.iteraciones_login if nombre == 'login' else args.iteraciones
+        for paso, r in _medir(cliente, headers, pasos, iteraciones, args.calentamiento).items():
+            resultados[paso] = r
+            print(f"{paso:<28} p50 {r['p50_ms']:8.2f} ms   p95 {r['p95_ms']:8.2f} ms   "
+                  f"consultas {r['consultas'] if r['consultas'] is not None else '-':>3}   {r['estados']}")
+
+    commit = _commit()
+    salida = Path(args.salida or f'benchmarks/resultados/{commit}.json')
+    salida.parent.mkdir(parents=True, exist_ok=True)
+    salida.write_text(json.dumps({
+        'commit': commit,
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'iteraciones': args.iteraciones,
+        'volumenes': volumenes,
+        'resultados': resultados,
+    }, indent=2, ensure_ascii=False))
+    print(f'resultados en {salida}')
+    return 0
+
+
+def comparar(ruta_base: str, ruta_nuevo: str, umbral: float) -> int:
+    """Diferencia de p50 por paso; devuelve 1 si alguno empeora más que `umbral` %."""
+    base = json.loads(Path(ruta_base).read_text())
+    nuevo = json.loads(Path(ruta_nuevo).read_text())
+    print(f"{'paso':<28} {base['commit']:>10} {nuevo['commit']:>10}   cambio")
+
+    regresiones = 0
+    for paso, r in nuevo['resultados'].items():
+        anterior = base['resultados'].get(paso)
+        if anterior is None:
+            continue
+        cambio = (r['p50_ms'] - anterior['p50_ms']) / anterior['p50_ms'] * 100
+        marca = ''
+        if cambio > umbral:
+            regresiones += 1
+            marca = '  <-- regresión'
+        if r['consultas'] is not None and anterior['consultas'] is not None \
+                and r['consultas'] > anterior['consultas']:
+            marca += f"  consultas {anterior['consultas']} -> {r['consultas']}"
+        print(f"{paso:<28} {anterior['p50_ms']:10.2f} {r['p50_ms']:10.2f}   {cambio:+6.1f}%{marca}")
+
+    return 1 if regresiones else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--url', default=None, help='default: BENCH_DATABASE_URL')
+    parser.add_argument('--iteraciones', type=int, default=30)
+    parser.add_argument('--iteraciones-login', type=int, default=10, help='bcrypt tarda ~0.25 s por login')
+    parser.add_argument('--calentamiento', type=int, default=3)
+    parser.add_argument('--solo', nargs='*', help='prefijos de escenarios a ejecutar')
+    parser.add_argument('--salida', default=None)
+    parser.add_argument('--comparar', nargs=2, metavar=('BASE', 'NUEVO'),
+                        help='comparar dos archivos de resultados en lugar de medir')
+    parser.add_argument('--umbral', type=float, default=10.0, help='%% de aumento del p50 tolerado')
+    args = parser.parse_args(argv)
+
+    if args.comparar:
+        return comparar(*args.comparar, args.umbral)
+    load_dotenv()
+    return ejecutar(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -42,5 +42,66 @@ class Config:
     # Zona horaria de la BD — configurable por entorno
     DB_TIMEZONE = os.getenv('TIMEZ', 'America/Mexico_City')
 
+    # Conteos de listados paginados (utils/conteo.py)
+    CONTEO_CACHE_TTL = int(os.getenv('CONTEO_CACHE_TTL', '30'))                  # segundos
+    CONTEO_UMBRAL_ESTIMADO = int(os.getenv('CONTEO_UMBRAL_ESTIMADO', '100000'))  # filas
+
+    # Particiones de historial (utils/particiones.py)
+    HISTORIAL_MESES_ADELANTE = int(os.getenv('HISTORIAL_MESES_ADELANTE', '3'))
+    HISTORIAL_RETENCION_MESES = int(os.getenv('HISTORIAL_RETENCION_MESES', '24'))
+    HISTORIAL_ESQUEMA_ARCHIVO = os.getenv('HISTORIAL_ESQUEMA_ARCHIVO', 'historial_archivo')
+    HISTORIAL_EXPORT_LOTE = int(os.getenv('HISTORIAL_EXPORT_LOTE', '2000'))  # filas por lote
+
+    # Importación masiva de activos (utils/importacion.py)
+    IMPORTACION_MAX_FILAS = int(os.getenv('IMPORTACION_MAX_FILAS', '5000'))
+    IMPORTACION_CACHE_CATALOGOS_TTL = int(os.getenv('IMPORTACION_CACHE_CATALOGOS_TTL', '300'))  # segundos
+
+    # Actualización masiva (PATCH /bulk)
+    ACTUALIZACION_MASIVA_MAX = int(os.getenv('ACTUALIZACION_MASIVA_MAX', '1000'))  # registros por petición
+
+    # Inventario físico (POST /api/equipos/lookup)
+    LOOKUP_MAX_SERIES = int(os.getenv('LOOKUP_MAX_SERIES', '10000'))  # números de serie por petición
+
+    # Resumen del tablero (GET /api/vistas/resumen)
+    RESUMEN_CACHE_TTL = int(os.getenv('RESUMEN_CACHE_TTL', '60'))  # segundos
+
+    # Lecturas async bajo /api/async/... (utils/async_db.py, requirements-async.txt)
+    ASYNC_LECTURAS = os.getenv('ASYNC_LECTURAS', 'False') == 'True'
+    ASYNC_DATABASE_URL = os.getenv('ASYNC_DATABASE_URL')  # por defecto DATABASE_URL con asyncpg
+    ASYNC_POOL_SIZE = int(os.getenv('ASYNC_POOL_SIZE', '20'))
+
+    # Logging estructurado en cola con id de petición (utils/logs.py)
+    LOGS_FORMATO = os.getenv('LOGS_FORMATO', 'texto' if os.getenv('FLASK_DEBUG') == 'True' else 'json')
+    LOGS_NIVEL = os.getenv('LOGS_NIVEL', 'INFO')
+    LOGS_NIVELES = os.getenv('LOGS_NIVELES', '')  # ej. utils.concurrency=DEBUG,sqlalchemy.engine=INFO
+
+    # Instrumentación por petición: Server-Timing + log (utils/instrumentacion.py)
+    INSTRUMENTACION_SQL = os.getenv('INSTRUMENTACION_SQL', 'False') == 'True'
+
+    # Registro de consultas lentas con EXPLAIN (utils/consultas_lentas.py); 0 = desactivado
+    CONSULTAS_LENTAS_UMBRAL_MS = int(os.getenv('CONSULTAS_LENTAS_UMBRAL_MS', '0'))
+    CONSULTAS_LENTAS_MAX = int(os.getenv('CONSULTAS_LENTAS_MAX', '100'))  # registros por proceso
+    CONSULTAS_LENTAS_EXPLAIN = os.getenv('CONSULTAS_LENTAS_EXPLAIN', 'True') == 'True'
+
+    # Métricas Prometheus en /api/health/metrics (utils/metricas.py)
+    METRICAS_HABILITADAS = os.getenv('METRICAS_HABILITADAS', 'False') == 'True'
+    METRICAS_TOKEN = os.getenv('METRICAS_TOKEN')  # Bearer del scraper; obligatorio si están habilitadas
+
+    # Aviso de consultas N+1 por petición (utils/deteccion_n1.py); por defecto en modo debug
+    DETECCION_N1 = os.getenv('DETECCION_N1', os.getenv('FLASK_DEBUG', 'False')) == 'True'
+    DETECCION_N1_UMBRAL = int(os.getenv('DETECCION_N1_UMBRAL', '3'))  # repeticiones del mismo SELECT
+
+    # Perfilado bajo demanda con ?perfilar=1 / X-Perfilar (utils/perfilador.py); desactivado por defecto
+    PERFILADOR_HABILITADO = os.getenv('PERFILADOR_HABILITADO', 'False') == 'True'
+    PERFILADOR_INTERVALO_MS = float(os.getenv('PERFILADOR_INTERVALO_MS', '5'))
+    PERFILADOR_MAX = int(os.getenv('PERFILADOR_MAX', '20'))  # perfiles guardados por proceso
+
+    # Readiness en /api/health/ready (utils/salud.py); al superar un umbral responde 503
+    SALUD_TIMEOUT_MS = int(os.getenv('SALUD_TIMEOUT_MS', '1000'))  # connect_timeout y statement_timeout de las sondas
+    SALUD_POOL_MAX_USO = float(os.getenv('SALUD_POOL_MAX_USO', '0.9'))  # fracción de pool_size + max_overflow
+    SALUD_REPLICA_URL = os.getenv('SALUD_REPLICA_URL')  # sin réplica no se mide retraso
+    SALUD_REPLICA_MAX_RETRASO = int(os.getenv('SALUD_REPLICA_MAX_RETRASO', '30'))  # segundos
+    SALUD_BLOQUEO_MAX_SEGUNDOS = int(os.getenv('SALUD_BLOQUEO_MAX_SEGUNDOS', '0'))  # 0 = solo se reporta
+
     # Otros
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16 MB
\ No newline at end of file
@@ -0,0 +1,30 @@
+"""
+Configuración de gunicorn
+Sistema de Inventario IUCA
+
+    PROMETHEUS_MULTIPROC_DIR=/tmp/iuca-metricas gunicorn -c gunicorn.conf.py "app:create_app()"
+
+Con PROMETHEUS_MULTIPROC_DIR cada worker escribe sus métricas en ese
+directorio y /api/health/metrics las suma (utils/metricas.py). Aquí se
+vacía al arrancar el master y se marca cada worker que termina, para que
+sus gauges dejen de contar.
+"""
+
+import os
+import shutil
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.getenv('GUNICORN_WORKERS', '4'))
+
+
+def on_starting(server):
+    directorio = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+    if directorio:
+        shutil.rmtree(directorio, ignore_errors=True)
+        os.makedirs(directorio)
+
+
+def child_exit(server, worker):
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
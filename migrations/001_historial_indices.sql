@@ -0,0 +1,28 @@
+-- ============================================
+-- 001 — Índices de historial para paginación por cursor
+-- Sistema de Inventario IUCA
+--
+-- CREATE INDEX CONCURRENTLY no puede ir dentro de una transacción:
+--   psql "$DATABASE_URL" -f migrations/001_historial_indices.sql
+-- ============================================
+
+-- Filtros por rango de fechas (fecha_desde / fecha_hasta). El historial
+-- se inserta en orden cronológico, así que un BRIN ocupa unos pocos KB
+-- y descarta bloques completos fuera del rango.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_historial_fecha_brin
+    ON historial USING brin (fecha) WITH (pages_per_range = 32);
+
+-- Orden de la paginación por cursor: (fecha, id_historial) descendente.
+-- Un BRIN no sirve para ORDER BY ... LIMIT, por eso el B-tree.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_historial_fecha_id
+    ON historial (fecha DESC, id_historial DESC);
+
+-- Historial de un registro (/registro/<tabla>/<id>) ordenado por fecha.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_historial_tabla_registro_fecha
+    ON historial (tabla, registro_id, fecha);
+
+-- Historial de una tabla (/tabla/<tabla>) paginado por cursor.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_historial_tabla_fecha_id
+    ON historial (tabla, fecha DESC, id_historial DESC);
+
+ANALYZE historial;
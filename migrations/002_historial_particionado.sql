@@ -0,0 +1,115 @@
+-- ============================================
+-- 002 — Particionado mensual de historial
+-- Sistema de Inventario IUCA
+--
+-- Convierte historial en una tabla particionada por RANGE (fecha) con una
+-- partición por mes y una partición DEFAULT de respaldo. La tabla original
+-- se conserva como historial_archivo.historial_legacy.
+--
+--   psql "$DATABASE_URL" -v ON_ERROR_STOP=1 -f migrations/002_historial_particionado.sql
+--
+-- Después, programar (cron) la creación de particiones futuras y el
+-- archivado de las antiguas:
+--   flask --app app historial crear-particiones
+--   flask --app app historial archivar
+--
+-- historial_legacy es una copia completa del historial previo: tras
+-- verificar la app sobre la tabla particionada, borrarla con
+--   flask --app app historial borrar-legacy
+-- (comprueba antes que cada fila esté en historial o en una partición
+-- archivada). Mientras exista, el historial ocupa el doble.
+-- ============================================
+
+BEGIN;
+
+-- fecha es la clave de partición y pasa a NOT NULL: una fila sin fecha
+-- haría fallar el INSERT de abajo a mitad de la migración. Se detiene
+-- antes de tocar nada; asignarles una fecha a mano (no hay una correcta
+-- que se pueda deducir aquí) y volver a ejecutar.
+DO $$
+DECLARE
+    sin_fecha bigint := (SELECT count(*) FROM historial WHERE fecha IS NULL);
+BEGIN
+    IF sin_fecha > 0 THEN
+        RAISE EXCEPTION 'historial tiene % fila(s) con fecha NULL; asignarles fecha antes de particionar', sin_fecha
+            USING HINT = 'SELECT id_historial FROM historial WHERE fecha IS NULL';
+    END IF;
+END $$;
+
+CREATE SCHEMA IF NOT EXISTS historial_archivo;
+
+-- La tabla original (con sus índices y PK) pasa al esquema de archivo
+-- para liberar los nombres en public
+ALTER TABLE historial SET SCHEMA historial_archivo;
+ALTER TABLE historial_archivo.historial RENAME TO historial_legacy;
+
+-- Mismas columnas y defaults (incluido el nextval de id_historial)
+CREATE TABLE historial (
+    LIKE historial_archivo.historial_legacy INCLUDING DEFAULTS INCLUDING CONSTRAINTS
+) PARTITION BY RANGE (fecha);
+
+ALTER TABLE historial ALTER COLUMN fecha SET DEFAULT now();
+ALTER TABLE historial ALTER COLUMN fecha SET NOT NULL;
+
+-- La clave de partición debe formar parte de la PK
+ALTER TABLE historial ADD PRIMARY KEY (id_historial, fecha);
+
+CREATE TABLE historial_default PARTITION OF historial DEFAULT;
+
+-- Particiones mensuales desde el registro más antiguo hasta 3 meses adelante
+DO $$
+DECLARE
+    mes   date := date_trunc('month', coalesce((SELECT min(fecha) FROM historial_archivo.historial_legacy), now()));
+    hasta date := date_trunc('month', now()) + interval '4 months';
+BEGIN
+    WHILE mes < hasta LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF historial FOR VALUES FROM (%L) TO (%L)',
+            'historial_p' || to_char(mes, 'YYYY_MM'), mes, mes + interval '1 month'
+        );
+        mes := mes + interval '1 month';
+    END LOOP;
+END $$;
+
+INSERT INTO historial SELECT * FROM historial_archivo.historial_legacy;
+
+-- La secuencia (movida junto con la tabla) vuelve a public y pasa a
+-- pertenecer a la nueva tabla. En ese orden: OWNED BY exige que secuencia
+-- y tabla estén en el mismo esquema, y SET SCHEMA sobre una secuencia con
+-- dueño la movería otra vez junto con historial_legacy
+DO $$
+DECLARE
+    secuencia text := pg_get_serial_sequence('historial_archivo.historial_legacy', 'id_historial');
+BEGIN
+    IF secuencia IS NOT NULL THEN
+        EXECUTE format('ALTER SEQUENCE %s OWNED BY NONE', secuencia);
+        EXECUTE format('ALTER SEQUENCE %s SET SCHEMA public', secuencia);
+        EXECUTE format('ALTER SEQUENCE public.%I OWNED BY historial.id_historial',
+                       split_part(secuencia, '.', 2));
+    END IF;
+END $$;
+
+-- La vista quedó ligada a historial_legacy (por OID); se recrea con la
+-- misma definición apuntando a la tabla particionada
+DO $$
+BEGIN
+    EXECUTE 'CREATE OR REPLACE VIEW vista_historial_completa AS '
+         || replace(
+                replace(pg_get_viewdef('vista_historial_completa'::regclass),
+                        'historial_archivo.historial_legacy', 'historial'),
+                'historial_legacy', 'historial');
+END $$;
+
+-- Índices de 001 sobre la tabla particionada (se propagan a cada partición)
+CREATE INDEX IF NOT EXISTS idx_historial_fecha_brin
+    ON historial USING brin (fecha) WITH (pages_per_range = 32);
+CREATE INDEX IF NOT EXISTS idx_historial_fecha_id
+    ON historial (fecha DESC, id_historial DESC);
+CREATE INDEX IF NOT EXISTS idx_historial_tabla_registro_fecha
+    ON historial (tabla, registro_id, fecha);
+CREATE INDEX IF NOT EXISTS idx_historial_tabla_fecha_id
+    ON historial (tabla, fecha DESC, id_historial DESC);
+
+COMMIT;
+
+ANALYZE historial;
@@ -0,0 +1,20 @@
+-- ============================================
+-- 003 — Índices de responsables por usuario
+-- Sistema de Inventario IUCA
+--
+-- CREATE INDEX CONCURRENTLY no puede ir dentro de una transacción:
+--   psql "$DATABASE_URL" -f migrations/003_responsables_indices.sql
+-- ============================================
+
+-- Filtro AND de /api/vistas (?usuario_id=1,2): la subconsulta filtra por
+-- usuario_id y agrupa por activo. Los UNIQUE (equipo_id, usuario_id) no
+-- sirven porque empiezan por el activo; con estos la subconsulta se
+-- resuelve solo con el índice (Index Only Scan).
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_equipos_responsables_usuario
+    ON equipos_responsables (usuario_id, equipo_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_mobiliario_responsables_usuario
+    ON mobiliario_responsables (usuario_id, mueble_id);
+
+ANALYZE equipos_responsables;
+ANALYZE mobiliario_responsables;
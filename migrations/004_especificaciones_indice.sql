@@ -0,0 +1,19 @@
+-- ============================================
+-- 004 — Índice de especificaciones por equipo
+-- Sistema de Inventario IUCA
+--
+-- CREATE INDEX CONCURRENTLY no puede ir dentro de una transacción:
+--   psql "$DATABASE_URL" -f migrations/004_especificaciones_indice.sql
+-- ============================================
+
+-- vista_equipos_completa arma `especificaciones` con una subconsulta por
+-- equipo (WHERE equipo_id = ... ORDER BY orden). Sin índice en la FK cada
+-- fila del listado recorre la tabla completa: con los volúmenes por
+-- defecto de benchmarks/generador.py la primera página de
+-- /api/vistas/equipos-completo/ pasa de costo ~550 a ~9200
+-- (python -m benchmarks.planes --solo vistas_equipos).
+-- También lo usan el ON DELETE CASCADE y la relación EquipoComputo.especificaciones.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_especificaciones_equipo
+    ON especificaciones_equipo (equipo_id, orden);
+
+ANALYZE especificaciones_equipo;
@@ -260,6 +260,10 @@ class EspecificacionEquipo(db.Model):
     orden = db.Column(db.Integer, default=1)
     fecha_creacion = db.Column(db.DateTime, default=datetime.now)
 
+    __table_args__ = (
+        db.Index('idx_especificaciones_equipo', 'equipo_id', 'orden'),
+    )
+
     def to_dict(self):
         return {
             'id_especificacion': self.id_especificacion,
@@ -280,6 +284,7 @@ class EquipoResponsable(db.Model):
 
     __table_args__ = (
         db.UniqueConstraint('equipo_id', 'usuario_id', name='uq_equipo_usuario'),
+        db.Index('idx_equipos_responsables_usuario', 'usuario_id', 'equipo_id'),
     )
 
     usuario = db.relationship('Usuario')
@@ -348,6 +353,7 @@ class MobiliarioResponsable(db.Model):
 
     __table_args__ = (
         db.UniqueConstraint('mueble_id', 'usuario_id', name='uq_mueble_usuario'),
+        db.Index('idx_mobiliario_responsables_usuario', 'usuario_id', 'mueble_id'),
     )
 
     usuario = db.relationship('Usuario')
@@ -7,6 +7,7 @@ import bcrypt
 from app import db
 from models import Acceso
 from utils.concurrency import get_client_ip
+from utils.metricas import BCRYPT_SEGUNDOS, LOGINS
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -28,6 +29,11 @@ def _es_mismo_dispositivo(usuario, client_ip, client_ua):
     mismo_ua = usuario.user_agent_sesion == client_ua
     return misma_ip and mismo_ua
 
+def _contrasena_valida(usuario, password):
+    """Compara la contraseña con el hash guardado, midiendo el costo de bcrypt."""
+    with BCRYPT_SEGUNDOS.labels('verificar').time():
+        return bcrypt.checkpw(password.encode('utf-8'), usuario.contrasena_hash.encode('utf-8'))
+
 def _crear_sesion(usuario, client_ip, client_ua):
     """Crea un nuevo token de sesión y actualiza el usuario."""
     access_token = create_access_token(identity=str(usuario.id_acceso))
@@ -79,9 +85,11 @@ def login():
 
     usuario = Acceso.query.filter_by(correo_electronico=correo).first()
     if not usuario:
+        LOGINS.labels('login', 'correo_desconocido').inc()
         return jsonify({'error': 'Correo electrónico no encontrado'}), 401
 
-    if not bcrypt.checkpw(password.encode('utf-8'), usuario.contrasena_hash.encode('utf-8')):
+    if not _contrasena_valida(usuario, password):
+        LOGINS.labels('login', 'contrasena_incorrecta').inc()
         return jsonify({'error': 'Contraseña incorrecta'}), 401
 
     client_ip, client_ua = get_client_fingerprint()
@@ -91,6 +99,7 @@ def login():
     # ────────────────────────────────────────────────────────────────────
 
     if usuario.token_sesion_activa:
+        LOGINS.labels('login', 'sesion_activa').inc()
         mismo_dispositivo = _es_mismo_dispositivo(usuario, client_ip, client_ua)
 
         if mismo_dispositivo:
@@ -113,6 +122,7 @@ def login():
             }), 409
 
     access_token = _crear_sesion(usuario, client_ip, client_ua)
+    LOGINS.labels('login', 'exito').inc()
 
     return jsonify({
         'token': access_token,
@@ -139,9 +149,11 @@ def force_login():
 
     usuario = Acceso.query.filter_by(correo_electronico=correo).first()
     if not usuario:
+        LOGINS.labels('force_login', 'correo_desconocido').inc()
         return jsonify({'error': 'Correo electrónico no encontrado'}), 401
 
-    if not bcrypt.checkpw(password.encode('utf-8'), usuario.contrasena_hash.encode('utf-8')):
+    if not _contrasena_valida(usuario, password):
+        LOGINS.labels('force_login', 'contrasena_incorrecta').inc()
         return jsonify({'error': 'Contraseña incorrecta'}), 401
 
     client_ip, client_ua = get_client_fingerprint()
@@ -153,6 +165,7 @@ def force_login():
     if usuario.token_sesion_activa:
         mismo_dispositivo = _es_mismo_dispositivo(usuario, client_ip, client_ua)
         if not mismo_dispositivo:
+            LOGINS.labels('force_login', 'sesion_activa').inc()
             return jsonify({
                 'error': 'session_active_different_ip',
                 'mensaje': 'La sesión activa es de otro dispositivo. No puedes forzar el cierre desde aquí.',
@@ -163,6 +176,7 @@ def force_login():
             }), 409
 
     access_token = _crear_sesion(usuario, client_ip, client_ua)
+    LOGINS.labels('force_login', 'exito').inc()
 
     return jsonify({
         'token': access_token,
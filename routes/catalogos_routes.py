@@ -1,7 +1,8 @@
 from flask import Blueprint
 from flask_jwt_extended import jwt_required
 from models import CatArea, CatTipoActivo, CatEstado, CatTipoMobiliario
-from utils.crud_catalogo import crud_catalogo
+from utils.crud_catalogo import crud_catalogo, get_completo_async
+from utils.async_db import liberar_sesion_sincrona
 from utils.lock_required import lock_required
 from utils.decorators import require_permission
 from utils.validators import (
@@ -26,11 +27,11 @@ _t_activo = crud_catalogo(CatTipoActivo,   validate_tipo,     'Tipo de activo',
 _t_mob  = crud_catalogo(CatTipoMobiliario, validate_tipo, 'Tipo de mobiliario', 'cat_tipos_mobiliario',
                         campo_busqueda='nombre_tipo',   clave_respuesta='tipos_mobiliario', campo_id='id_tipo_mobiliario', campo_orden=CatTipoMobiliario.id_tipo_mobiliario)
 
-# Desempaquetar — ahora son 6 funciones
-(get_areas_completo_fn,   get_areas_fn,    get_area_fn,  create_area_fn,    update_area_fn,    delete_area_fn)    = _area
-(get_estados_completo_fn, get_estados_fn,  get_estado_fn, create_estado_fn, update_estado_fn,  delete_estado_fn)  = _estado
-(get_t_activo_completo_fn,get_t_activo_fn, get_activo_fn, create_t_activo_fn,update_t_activo_fn,delete_t_activo_fn)= _t_activo
-(get_t_mob_completo_fn,   get_t_mob_fn,   get_mob_fn,   create_t_mob_fn,   update_t_mob_fn,   delete_t_mob_fn)   = _t_mob
+# Desempaquetar — ahora son 7 funciones
+(get_areas_completo_fn,   get_areas_fn,    get_area_fn,  create_area_fn,    update_area_fn,    delete_area_fn,     dependencias_area_fn)     = _area
+(get_estados_completo_fn, get_estados_fn,  get_estado_fn, create_estado_fn, update_estado_fn,  delete_estado_fn,   dependencias_estado_fn)   = _estado
+(get_t_activo_completo_fn,get_t_activo_fn, get_activo_fn, create_t_activo_fn,update_t_activo_fn,delete_t_activo_fn, dependencias_t_activo_fn) = _t_activo
+(get_t_mob_completo_fn,   get_t_mob_fn,   get_mob_fn,   create_t_mob_fn,   update_t_mob_fn,   delete_t_mob_fn,    dependencias_t_mob_fn)    = _t_mob
 
 # ── ÁREAS ─────────────────────────────────────────────────────────────────────
 
@@ -63,6 +64,12 @@ def create_area():
 def update_area(id):
     return update_area_fn(id)
 
+@catalogos_bp.route('/areas/<int:id>/dependencias', methods=['GET'])
+@jwt_required()
+@require_permission('catalogos', 'puede_leer')
+def dependencias_area(id):
+    return dependencias_area_fn(id)
+
 @catalogos_bp.route('/areas/<int:id>', methods=['DELETE'])
 @jwt_required()
 @require_permission('catalogos', 'puede_eliminar')
@@ -105,6 +112,12 @@ def update_estado(id):
     return update_estado_fn(id)
 
 
+@catalogos_bp.route('/estados/<int:id>/dependencias', methods=['GET'])
+@jwt_required()
+@require_permission('catalogos', 'puede_leer')
+def dependencias_estado(id):
+    return dependencias_estado_fn(id)
+
 @catalogos_bp.route('/estados/<int:id>', methods=['DELETE'])
 @jwt_required()
 @require_permission('catalogos', 'puede_eliminar')
@@ -144,6 +157,12 @@ def create_tipo_activo():
 def update_tipo_activo(id):
     return update_t_activo_fn(id)
 
+@catalogos_bp.route('/tipos-activo/<int:id>/dependencias', methods=['GET'])
+@jwt_required()
+@require_permission('catalogos', 'puede_leer')
+def dependencias_tipo_activo(id):
+    return dependencias_t_activo_fn(id)
+
 @catalogos_bp.route('/tipos-activo/<int:id>', methods=['DELETE'])
 @jwt_required()
 @require_permission('catalogos', 'puede_eliminar')
@@ -186,9 +205,41 @@ def update_tipo_mobiliario(id):
     return update_t_mob_fn(id)
 
 
+@catalogos_bp.route('/tipos-mobiliario/<int:id>/dependencias', methods=['GET'])
+@jwt_required()
+@require_permission('catalogos', 'puede_leer')
+def dependencias_tipo_mobiliario(id):
+    return dependencias_t_mob_fn(id)
+
 @catalogos_bp.route('/tipos-mobiliario/<int:id>', methods=['DELETE'])
 @jwt_required()
 @require_permission('catalogos', 'puede_eliminar')
 @lock_required('cat_tipos_mobiliario')
 def delete_tipo_mobiliario(id, bloqueo):
-    return delete_t_mob_fn(id, bloqueo)
\ No newline at end of file
+    return delete_t_mob_fn(id, bloqueo)
+
+
+# ── LECTURAS ASYNC (/api/async/catalogos, con ASYNC_LECTURAS) ─────────────────
+
+catalogos_async_bp = Blueprint('catalogos_async', __name__)
+catalogos_async_bp.before_request(liberar_sesion_sincrona)
+
+@catalogos_async_bp.route('/areas-completo', methods=['GET'])
+@jwt_required()
+async def get_areas_completo_async():
+    return await get_completo_async(CatArea, 'nombre_area')
+
+@catalogos_async_bp.route('/estados-completo', methods=['GET'])
+@jwt_required()
+async def get_estados_completo_async():
+    return await get_completo_async(CatEstado, 'nombre_estado')
+
+@catalogos_async_bp.route('/tipos-activo-completo', methods=['GET'])
+@jwt_required()
+async def get_tipos_activos_completo_async():
+    return await get_completo_async(CatTipoActivo, 'nombre_tipo')
+
+@catalogos_async_bp.route('/tipo-completo', methods=['GET'])
+@jwt_required()
+async def get_mobiliario_completo_async():
+    return await get_completo_async(CatTipoMobiliario, 'nombre_tipo')
@@ -1,12 +1,23 @@
-from flask import Blueprint, request, jsonify
+from collections import Counter
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import String, all_, any_, bindparam, or_
+from sqlalchemy.dialects.postgresql import ARRAY
 from app import db
-from models import EquipoComputo, EspecificacionEquipo, EquipoResponsable, Usuario
+from models import CatEstado, CatTipoActivo, EquipoComputo, EspecificacionEquipo, EquipoResponsable, VistaEquiposCompleta
 from utils.decorators import require_permission
-from utils.validators import validate_equipo, ValidationError, handle_db_error
-from utils.concurrency import verificar_version, liberar_bloqueo
+from utils.validators import (
+    validate_equipo, validate_actualizacion_masiva, validate_lookup, ValidationError, handle_db_error,
+)
+from utils.concurrency import actualizar_con_version, liberar_bloqueo, respuesta_conflicto
 from utils.lock_required import lock_required
+from utils.dependencias import respuesta_dependencias, verificar_dependencias
 from utils.responsables import sync_responsables
+from utils.importacion import EsquemaImportacion, importar, leer_filas
+from utils.actualizacion_masiva import ACTUALIZADO, actualizar_en_lote
+from utils.constants import FILTROS_ACTUALIZACION_MASIVA, MENSAJE_FK_GENERICO, MENSAJES_FK
+from utils.serializador_vistas import plan_de
+from utils.colecciones import sincronizar_coleccion
 
 equipos_bp = Blueprint('equipos', __name__)
 
@@ -73,12 +84,13 @@ def create_equipo():
             ))
 
         # Agregar responsables iniciales
-        for usuario_id in data.get('responsables_ids') or []:
-            if Usuario.query.get(usuario_id):
-                db.session.add(EquipoResponsable(
-                    equipo_id=equipo.id_activo,
-                    usuario_id=usuario_id
-                ))
+        if data.get('responsables_ids'):
+            sync_responsables(
+                modelo_asignacion=EquipoResponsable,
+                entidad_id=equipo.id_activo,
+                nuevos_ids=data['responsables_ids'],
+                campo_entidad='equipo_id',
+            )
 
         db.session.commit()
 
@@ -93,17 +105,111 @@ def create_equipo():
         return jsonify({'error': message}), code
 
 
+@equipos_bp.route('/import', methods=['POST'])
+@jwt_required()
+@require_permission('computo', 'puede_crear')
+def import_equipos():
+    """
+    Importar equipos en lote desde CSV o JSON lines.
+    Se aceptan nombres de catálogo (tipo_activo, estado) en lugar de IDs.
+    Si alguna fila tiene errores no se crea ningún equipo.
+    Con ?dry_run=true solo se devuelve el reporte de validación.
+    """
+    dry_run = request.args.get('dry_run', 'false').lower() == 'true'
+
+    try:
+        filas = leer_filas()
+    except ValidationError as e:
+        return jsonify({'error': e.message, 'campos': e.fields}), 400
+
+    try:
+        reporte = importar(_IMPORTACION_EQUIPOS, filas, dry_run=dry_run)
+
+        if reporte['errores']:
+            db.session.rollback()
+            return jsonify({'error': 'El archivo tiene filas con errores', **reporte}), 422
+
+        if dry_run:
+            db.session.rollback()
+            return jsonify({'mensaje': 'El archivo es válido', **reporte}), 200
+
+        db.session.commit()
+        return jsonify({'mensaje': f"{reporte['creados']} equipos importados exitosamente", **reporte}), 201
+
+    except Exception as e:
+        db.session.rollback()
+        message, code = handle_db_error(e)
+        return jsonify({'error': message}), code
+
+
+@equipos_bp.route('/lookup', methods=['POST'])
+@jwt_required()
+@require_permission('computo', 'puede_leer')
+def lookup_equipos():
+    """
+    Resolver una lista de números de serie escaneados (inventario físico).
+
+    Body: { "numeros_serie": [...], "sucursal_nombre": "..." (opcional) }
+
+    Devuelve los equipos encontrados, los números de serie desconocidos y,
+    si se indica sucursal, los equipos de esa sucursal que no se escanearon.
+    """
+    data = request.get_json()
+
+    if not data:
+        return jsonify({'error': 'No se recibieron datos'}), 400
+
+    try:
+        validate_lookup(data, current_app.config['LOOKUP_MAX_SERIES'])
+    except ValidationError as e:
+        return jsonify({'error': e.message, 'campos': e.fields}), 422
+
+    series = data['numeros_serie']
+    parametro = bindparam('series', series, type_=ARRAY(String))
+
+    try:
+        plan = plan_de(VistaEquiposCompleta)
+        encontrados = plan.serializar_todas(db.session.execute(
+            plan.consulta(VistaEquiposCompleta.query)
+            .filter(VistaEquiposCompleta.numero_serie == any_(parametro))
+            .statement
+        ))
+        conocidos = {e['numero_serie'] for e in encontrados}
+
+        respuesta = {
+            'encontrados': encontrados,
+            'desconocidos': [s for s in series if s not in conocidos],
+        }
+
+        sucursal = data['sucursal_nombre']
+        if sucursal:
+            respuesta['sucursal'] = sucursal
+            respuesta['no_escaneados'] = plan.serializar_todas(db.session.execute(
+                plan.consulta(VistaEquiposCompleta.query)
+                .filter(
+                    VistaEquiposCompleta.sucursal == sucursal,
+                    or_(
+                        VistaEquiposCompleta.numero_serie.is_(None),
+                        VistaEquiposCompleta.numero_serie != all_(parametro),
+                    )
+                )
+                .order_by(VistaEquiposCompleta.id_activo)
+                .statement
+            ))
+
+        return jsonify(respuesta), 200
+
+    except Exception as e:
+        message, code = handle_db_error(e)
+        return jsonify({'error': message}), code
+
+
 @equipos_bp.route('/<int:id>', methods=['PUT'])
 @jwt_required()
 @require_permission('computo', 'puede_actualizar')
 def update_equipo(id):
     """Actualizar equipo de cómputo con control de versiones y diff de responsables"""
     user_id = get_jwt_identity()
-    equipo = EquipoComputo.query.get(id)
-
-    if not equipo:
-        return jsonify({'error': 'Equipo no encontrado'}), 404
-
     data = request.get_json()
 
     if not data:
@@ -114,19 +220,11 @@ def update_equipo(id):
     except ValidationError as e:
         return jsonify({'error': e.message, 'campos': e.fields}), 422
 
-    version_cliente = data.get('version')
-    if version_cliente is not None:
-        es_valida, version_actual = verificar_version(EquipoComputo, id, version_cliente)
-        if not es_valida:
-            return jsonify({
-                'error': 'conflict',
-                'mensaje': 'El registro fue modificado por otro usuario',
-                'version_actual': version_actual,
-                'datos_actuales': equipo.to_dict(include_specs=True, include_responsables=True, include_version=True)
-            }), 409
-
-    if data.get('numero_serie') and data['numero_serie'] != equipo.numero_serie:
-        existe = EquipoComputo.query.filter_by(numero_serie=data['numero_serie']).first()
+    if data.get('numero_serie'):
+        existe = EquipoComputo.query.filter(
+            EquipoComputo.numero_serie == data['numero_serie'],
+            EquipoComputo.id_activo != id
+        ).first()
         if existe:
             return jsonify({
                 'error': 'El número de serie ya está registrado',
@@ -135,50 +233,40 @@ def update_equipo(id):
 
     try:
         campo_map = {
-            'tipo_activo_id':    lambda v: setattr(equipo, 'tipo_activo_id', v),
-            'nombre_activo':     lambda v: setattr(equipo, 'nombre_activo', v.strip()),
-            'marca':             lambda v: setattr(equipo, 'marca', v.strip() or None),
-            'modelo':            lambda v: setattr(equipo, 'modelo', v.strip() or None),
-            'numero_serie':      lambda v: setattr(equipo, 'numero_serie', v.strip() or None),
-            'estado_id':         lambda v: setattr(equipo, 'estado_id', v),
-            'observaciones':     lambda v: setattr(equipo, 'observaciones', v.strip() or None),
-            'sucursal_nombre':   lambda v: setattr(equipo, 'sucursal_nombre', v.strip()),
+            'tipo_activo_id':    lambda v: v,
+            'nombre_activo':     lambda v: v.strip(),
+            'marca':             lambda v: v.strip() or None,
+            'modelo':            lambda v: v.strip() or None,
+            'numero_serie':      lambda v: v.strip() or None,
+            'estado_id':         lambda v: v,
+            'observaciones':     lambda v: v.strip() or None,
+            'sucursal_nombre':   lambda v: v.strip(),
         }
+        cambios = {campo: limpiar(data[campo]) for campo, limpiar in campo_map.items() if campo in data}
+
+        # Compare-and-swap sobre la versión que vio el cliente
+        equipo = actualizar_con_version(EquipoComputo, id, data.get('version'), cambios)
+        if equipo is None:
+            return respuesta_conflicto(
+                EquipoComputo, id,
+                lambda e: e.to_dict(include_specs=True, include_responsables=True, include_version=True),
+                'Equipo no encontrado'
+            )
 
-        for campo, setter in campo_map.items():
-            if campo in data:
-                setter(data[campo])
-
-        # Actualizar especificaciones
+        # Actualizar especificaciones (diff por nombre + valor, conservando el orden)
         if 'especificaciones' in data:
-            specs_existentes = EspecificacionEquipo.query.filter_by(equipo_id=id).all()
-
-            specs_nuevas = {
-                (spec['nombre_especificacion'].strip(), spec['valor_especificacion'].strip()): spec
-                for spec in data['especificaciones']
-            }
-            specs_actuales = {
-                (spec.nombre_especificacion, spec.valor_especificacion): spec
-                for spec in specs_existentes
-            }
-
-            for key, spec in specs_actuales.items():
-                if key not in specs_nuevas:
-                    db.session.delete(spec)
-
-            for orden, spec_data in enumerate(data['especificaciones'], start=1):
-                key = (spec_data['nombre_especificacion'].strip(), spec_data['valor_especificacion'].strip())
-                if key in specs_actuales:
-                    spec_existente = specs_actuales[key]
-                    if spec_existente.orden != orden:
-                        spec_existente.orden = orden
-                else:
-                    db.session.add(EspecificacionEquipo(
-                        equipo_id=id,
-                        nombre_especificacion=spec_data['nombre_especificacion'].strip(),
-                        valor_especificacion=spec_data['valor_especificacion'].strip(),
-                        orden=orden
-                    ))
+            sincronizar_coleccion(
+                EspecificacionEquipo, 'equipo_id', id,
+                [
+                    {
+                        'nombre_especificacion': spec['nombre_especificacion'].strip(),
+                        'valor_especificacion': spec['valor_especificacion'].strip(),
+                    }
+                    for spec in data['especificaciones'] or []
+                ],
+                clave=('nombre_especificacion', 'valor_especificacion'),
+                campo_orden='orden',
+            )
 
         # Sincronizar responsables usando la utilidad compartida
         if 'responsables_ids' in data:
@@ -203,6 +291,59 @@ def update_equipo(id):
         return jsonify({'error': message}), code
 
 
+@equipos_bp.route('/bulk', methods=['PATCH'])
+@jwt_required()
+@require_permission('computo', 'puede_actualizar')
+def bulk_update_equipos():
+    """
+    Actualizar estado, sucursal y/o responsables de varios equipos a la vez.
+    Respeta la versión enviada por registro y los bloqueos de otros usuarios;
+    devuelve el resultado de cada ID.
+    """
+    user_id = int(get_jwt_identity())
+    data = request.get_json()
+
+    if not data:
+        return jsonify({'error': 'No se recibieron datos'}), 400
+
+    try:
+        validate_actualizacion_masiva(data, FILTROS_ACTUALIZACION_MASIVA['equipos_computo'])
+        resultados = actualizar_en_lote(
+            EquipoComputo, data, user_id,
+            responsables=(EquipoResponsable, 'equipo_id'),
+        )
+    except ValidationError as e:
+        db.session.rollback()
+        return jsonify({'error': e.message, 'campos': e.fields}), 422
+    except Exception as e:
+        # FK de estado_id inexistente, etc.
+        db.session.rollback()
+        message, code = handle_db_error(e, tabla='equipos_computo')
+        return jsonify({'error': message}), code
+
+    try:
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        message, code = handle_db_error(e, tabla='equipos_computo')
+        return jsonify({'error': message}), code
+
+    resumen = Counter(r['resultado'] for r in resultados)
+    return jsonify({
+        'mensaje': f"{resumen.get(ACTUALIZADO, 0)} de {len(resultados)} equipos actualizados",
+        'resumen': resumen,
+        'resultados': resultados
+    }), 200
+
+
+@equipos_bp.route('/<int:id>/dependencias', methods=['GET'])
+@jwt_required()
+@require_permission('computo', 'puede_leer')
+def dependencias_equipo(id):
+    """Registros que impiden eliminar el equipo."""
+    return respuesta_dependencias(EquipoComputo, id, 'Equipo no encontrado')
+
+
 @equipos_bp.route('/<int:id>', methods=['DELETE'])
 @jwt_required()
 @require_permission('computo', 'puede_eliminar')
@@ -214,6 +355,9 @@ def delete_equipo(id, bloqueo):
     if not equipo:
         return jsonify({'error': 'Equipo no encontrado'}), 404
 
+    if verificar_dependencias(EquipoComputo, id):
+        return jsonify({'error': MENSAJES_FK.get('equipos_computo', MENSAJE_FK_GENERICO)}), 409
+
     try:
         db.session.delete(equipo)
         db.session.delete(bloqueo)
@@ -224,3 +368,39 @@ def delete_equipo(id, bloqueo):
         db.session.rollback()
         message, code = handle_db_error(e, tabla='equipos_computo')
         return jsonify({'error': message}), code
+
+
+# ============================================
+# HELPERS
+# ============================================
+
+def _columnas_equipo(data: dict) -> dict:
+    """Columnas de un equipo nuevo, con la misma limpieza que create_equipo."""
+    def texto(campo, default=''):
+        return str(data.get(campo) or default).strip() or None
+
+    return {
+        'tipo_activo_id': int(data['tipo_activo_id']),
+        'nombre_activo': texto('nombre_activo'),
+        'marca': texto('marca'),
+        'modelo': texto('modelo'),
+        'numero_serie': texto('numero_serie'),
+        'estado_id': int(data['estado_id']),
+        'observaciones': texto('observaciones'),
+        'sucursal_nombre': texto('sucursal_nombre', 'Tulancingo'),
+        'version': 1,
+    }
+
+
+_IMPORTACION_EQUIPOS = EsquemaImportacion(
+    modelo=EquipoComputo,
+    validador=validate_equipo,
+    construir=_columnas_equipo,
+    catalogos={
+        'tipo_activo': ('tipo_activo_id', CatTipoActivo.id_tipo_activo, CatTipoActivo.nombre_tipo),
+        'estado':      ('estado_id', CatEstado.id_estado, CatEstado.nombre_estado),
+    },
+    clave_unica='numero_serie',
+    responsables=(EquipoResponsable, 'equipo_id'),
+    especificaciones=(EspecificacionEquipo, 'equipo_id'),
+)
@@ -1,7 +1,94 @@
-from flask import Blueprint
+import hmac
+from flask import Blueprint, current_app, jsonify, request
+from flask_jwt_extended import jwt_required
+from utils.consultas_lentas import consultas_lentas, limpiar_consultas_lentas
+from utils.metricas import exposicion
+from utils.perfilador import limpiar_perfiles, perfil, perfiles
+from utils.salud import comprobar
+from utils.decorators import require_permission
 
 health_bp = Blueprint("check", __name__)
 
 @health_bp.get("/")
 def health():
+    """Prueba de vida: no consulta la BD"""
     return {"status": "ok"}, 200
+
+
+@health_bp.get("/ready")
+def ready():
+    """Readiness: BD, pool, réplica y bloqueos; 503 si algún umbral se supera"""
+    lista, comprobaciones = comprobar(current_app)
+    return jsonify({
+        'status': 'ok' if lista else 'no_disponible',
+        'comprobaciones': comprobaciones,
+    }), 200 if lista else 503
+
+
+@health_bp.get("/metrics")
+def metrics():
+    """Métricas en formato de texto de Prometheus (agregadas entre workers)"""
+    if not current_app.config['METRICAS_HABILITADAS']:
+        return jsonify({'error': 'Métricas desactivadas'}), 404
+
+    token = current_app.config['METRICAS_TOKEN'] or ''
+    if not token or not hmac.compare_digest(
+        request.headers.get('Authorization', ''), f'Bearer {token}'
+    ):
+        return jsonify({'error': 'Token de métricas inválido'}), 401
+
+    cuerpo, content_type = exposicion()
+    return cuerpo, 200, {'Content-Type': content_type}
+
+
+# ============================================
+# DIAGNÓSTICO (solo administradores de accesos)
+# ============================================
+
+@health_bp.get("/consultas-lentas")
+@jwt_required()
+@require_permission('acceso', 'puede_leer')
+def get_consultas_lentas():
+    """Últimas consultas que superaron CONSULTAS_LENTAS_UMBRAL_MS en este proceso"""
+    limite = request.args.get('limite', type=int)
+    registros = consultas_lentas(limite)
+    return jsonify({'consultas': registros, 'total': len(registros)}), 200
+
+
+@health_bp.delete("/consultas-lentas")
+@jwt_required()
+@require_permission('acceso', 'puede_eliminar')
+def delete_consultas_lentas():
+    """Vaciar el registro de consultas lentas de este proceso"""
+    return jsonify({'eliminadas': limpiar_consultas_lentas()}), 200
+
+
+@health_bp.get("/perfiles")
+@jwt_required()
+@require_permission('acceso', 'puede_leer')
+def get_perfiles():
+    """Perfiles de peticiones (?perfilar=1) guardados en este proceso, sin el árbol"""
+    registros = perfiles()
+    return jsonify({'perfiles': registros, 'total': len(registros)}), 200
+
+
+@health_bp.get("/perfiles/<int:id>")
+@jwt_required()
+@require_permission('acceso', 'puede_leer')
+def get_perfil(id):
+    """Perfil en formato speedscope, como archivo adjunto"""
+    registro = perfil(id)
+    if registro is None:
+        return jsonify({'error': 'Perfil no encontrado'}), 404
+
+    respuesta = jsonify(registro['speedscope'])
+    respuesta.headers['Content-Disposition'] = f'attachment; filename=perfil-{id}.speedscope.json'
+    return respuesta, 200
+
+
+@health_bp.delete("/perfiles")
+@jwt_required()
+@require_permission('acceso', 'puede_eliminar')
+def delete_perfiles():
+    """Vaciar los perfiles guardados en este proceso"""
+    return jsonify({'eliminados': limpiar_perfiles()}), 200
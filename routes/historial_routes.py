@@ -1,9 +1,17 @@
-from flask import Blueprint, jsonify, request
+import asyncio
+import json
+import logging
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
 from flask_jwt_extended import jwt_required
 from models import VistaHistorialCompleta
 from utils.decorators import require_permission
+from utils.etiquetas_historial import ResolvedorEtiquetas
+from utils.extesions import db
+from utils.paginacion import filtrar_por_cursor, pagina_por_cursor, paginar, paginar_por_cursor
+from utils.async_db import filas, liberar_sesion_sincrona, paginar_async, primera
+from utils.serializador_vistas import plan_de
 from sqlalchemy import String, cast, or_
-from datetime import datetime
+from datetime import datetime, timedelta
 from utils.constants import (
     TABLAS_VISIBLES, CAMPOS_IGNORADOS,
     TABLA_ALIASES, OPERACION_ALIASES,
@@ -11,6 +19,11 @@ from utils.constants import (
 )
 
 historial_bp = Blueprint('historial', __name__)
+logger = logging.getLogger(__name__)
+
+# Clave de orden de la paginación por cursor; coincide con el índice
+# idx_historial_fecha_id (migrations/001_historial_indices.sql)
+_CLAVE_CURSOR = (VistaHistorialCompleta.fecha, VistaHistorialCompleta.id_historial)
 
 # ============================================
 # Historial de Movimiento
@@ -25,127 +38,32 @@ def get_historial():
         # Parámetros de paginación
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 20, type=int)
+        # Opt-in: con ?cursor= (vacío para la primera página) se pagina por
+        # (fecha, id_historial) descendente en lugar de OFFSET
+        cursor = request.args.get('cursor')
 
-        # Filtros
-        search        = request.args.get('search', '').strip()
-        tipo_registro  = request.args.get('tipo_registro', '').strip()
-        tipo_movimiento = request.args.get('tipo_movimiento', '').strip()
-        usuario_id    = request.args.get('usuario_id')
-        fecha_desde   = request.args.get('fecha_desde', '').strip()
-        fecha_hasta   = request.args.get('fecha_hasta', '').strip()
-        sort_by = request.args.get('sort_by')
-        sort_dir = request.args.get('sort_dir', 'asc')
-
-        # Query base — solo tablas visibles
-        query = VistaHistorialCompleta.query.filter(
-            VistaHistorialCompleta.tabla.in_(TABLAS_VISIBLES)
-        )
-
-        # Excluir UPDATEs cuyo único cambio sea un campo ignorado
-        # (se hace en Python tras paginación para no complicar el ORM,
-        #  pero primero excluimos los casos más comunes a nivel SQL)
-        # Nota: si cambios es un JSON como {"ultimo_acceso": {...}},
-        # podemos filtrar en SQL con cast + operador JSON
-        # Se hace la exclusión post-fetch más abajo.
-
-        # ── Filtros ─────────────────────────────────────────────────────
-        if search:
-            search_lower = search.lower()
-
-            print(search_lower)
-
-            # Resolver si el término coincide con algún alias
-            tabla_buscada     = None
-            operacion_buscada = None
-            es_catalogo       = False
-
-            for alias, tabla_real in TABLA_ALIASES.items():
-                if alias in search_lower:
-                    if tabla_real is None:
-                        es_catalogo = True
-                    else:
-                        tabla_buscada = tabla_real
-                    break
-
-            for alias, op_real in OPERACION_ALIASES.items():
-                if alias in search_lower:
-                    operacion_buscada = op_real
-                    break
-
-            # Construir condiciones OR
-            condiciones = [
-                VistaHistorialCompleta.realizado_por.ilike(f'%{search}%'),
-                VistaHistorialCompleta.registro_id.ilike(f'%{search}%'),
-                VistaHistorialCompleta.tabla.ilike(f'%{search}%'),
-                VistaHistorialCompleta.operacion.ilike(f'%{search}%'),
-                cast(VistaHistorialCompleta.id_historial, String).ilike(f'%{search}%')
-            ]
-
-            if tabla_buscada:
-                condiciones.append(VistaHistorialCompleta.tabla == tabla_buscada)
-
-            if es_catalogo:
-                condiciones.append(VistaHistorialCompleta.tabla.like('cat_%'))
-
-            if operacion_buscada:
-                condiciones.append(VistaHistorialCompleta.operacion == operacion_buscada)
-
-            query = query.filter(or_(*condiciones))
-
-        if usuario_id:
-            query = query.filter(VistaHistorialCompleta.usuario_id == usuario_id)
-
-        if tipo_registro:
-            tabla_nombre = TIPO_DE_REGISTRO.get(tipo_registro.lower(), tipo_registro)
-            query = query.filter(VistaHistorialCompleta.tabla == tabla_nombre)
-
-        if tipo_movimiento:
-            operacion_nombre = OPERACION_MOVIMIENTO.get(tipo_movimiento.lower(), tipo_movimiento.upper())
-            query = query.filter(VistaHistorialCompleta.operacion == operacion_nombre)
-
-        if fecha_desde:
-            try:
-                fecha_desde_dt = datetime.strptime(fecha_desde, '%Y-%m-%d')
-                query = query.filter(VistaHistorialCompleta.fecha >= fecha_desde_dt)
-            except ValueError:
-                pass
+        query = _query_historial_filtrada()
 
-        if fecha_hasta:
+        # ── Paginación por cursor ───────────────────────────────────────
+        if cursor is not None:
             try:
-                fecha_hasta_dt = datetime.strptime(fecha_hasta, '%Y-%m-%d')
-                fecha_hasta_dt = fecha_hasta_dt.replace(hour=23, minute=59, second=59)
-                query = query.filter(VistaHistorialCompleta.fecha <= fecha_hasta_dt)
-            except ValueError:
-                pass
-
-        if sort_by:
-            column = getattr(VistaHistorialCompleta, sort_by, None)
-            if column:
-                if sort_dir == 'desc':
-                    query = query.order_by(column.desc())
-                else:
-                    query = query.order_by(column.asc())
+                pagina = paginar_por_cursor(query, _CLAVE_CURSOR, cursor, per_page)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
 
-        # Ordenar por fecha descendente
-        query = query.order_by(VistaHistorialCompleta.id_historial.asc())
+            return jsonify({
+                'movimientos': [i.to_dict_detallado() for i in pagina.items if _es_visible(i)],
+                'per_page':    pagina.per_page,
+                'has_next':    pagina.has_next,
+                'next_cursor': pagina.next_cursor
+            }), 200
 
         # ── Paginación ──────────────────────────────────────────────────
-        paginated = query.paginate(page=page, per_page=per_page, error_out=False)
-
-        # ── Filtro post-fetch: descartar UPDATEs de solo campos ignorados
-        def es_visible(item):
-            """Devuelve False si el registro no aporta información útil."""
-            if item.operacion != 'UPDATE':
-                return True
-            if not item.cambios:
-                return False  # UPDATE sin cambios registrados → omitir
-            campos_cambiados = set(item.cambios.keys())
-            # Si todos los campos cambiados son ignorados, omitir
-            return not campos_cambiados.issubset(CAMPOS_IGNORADOS)
+        paginated = paginar(_ordenar_historial(query), page, per_page)
 
         # start = (paginated.page - 1) * paginated.per_page + 1
 
-        # items_visibles = [item for item in paginated.items if es_visible(item)]
+        # items_visibles = [item for item in paginated.items if _es_visible(item)]
 
         # movimientos_filtrados = [
         #     {
@@ -158,13 +76,14 @@ def get_historial():
         movimientos_filtrados = [
             item.to_dict_detallado()
             for item in paginated.items
-            if es_visible(item)
+            if _es_visible(item)
         ]
 
         return jsonify({
             'movimientos':   movimientos_filtrados,
             'total':         paginated.total,
             'pages':         paginated.pages,
+            'total_estimado': paginated.total_estimado,
             'current_page':  paginated.page,
             'per_page':      per_page,
             'has_next':      paginated.has_next,
@@ -174,6 +93,50 @@ def get_historial():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@historial_bp.route('/export', methods=['GET'])
+@jwt_required()
+@require_permission('historial', 'puede_leer')
+def exportar_historial():
+    """
+    Exporta el historial filtrado como NDJSON (un movimiento por línea).
+    Acepta los mismos filtros que GET /. Las filas se leen con un cursor
+    del servidor en lotes de HISTORIAL_EXPORT_LOTE y se envían lote a lote,
+    así la memoria no crece con el tamaño de la exportación.
+    """
+    plan = plan_de(VistaHistorialCompleta)
+    statement = (
+        plan.consulta(_query_historial_filtrada())
+        .order_by(VistaHistorialCompleta.fecha.asc(), VistaHistorialCompleta.id_historial.asc())
+        .statement
+        .execution_options(yield_per=current_app.config['HISTORIAL_EXPORT_LOTE'])
+    )
+
+    def generar():
+        resolvedor = ResolvedorEtiquetas()
+        resultado = db.session.execute(statement)
+
+        for lote in resultado.partitions():
+            visibles = [fila for fila in lote if _es_visible(fila)]
+            resolvedor.precargar(fila.cambios for fila in visibles)
+
+            lineas = []
+            for fila in visibles:
+                movimiento = plan.serializar(fila)
+                if fila.cambios:
+                    movimiento['cambios_detallados'] = resolvedor.formatear(fila.cambios)
+                lineas.append(json.dumps(movimiento, ensure_ascii=False, default=str))
+
+            if lineas:
+                yield '\n'.join(lineas) + '\n'
+
+    nombre = f"historial_{datetime.now():%Y%m%d_%H%M%S}.ndjson"
+    return Response(
+        stream_with_context(generar()),
+        mimetype='application/x-ndjson',
+        headers={'Content-Disposition': f'attachment; filename="{nombre}"'}
+    )
+
+
 @historial_bp.route('/<int:id>', methods=['GET'])
 @jwt_required()
 @require_permission('historial', 'puede_leer')
@@ -199,17 +162,32 @@ def get_historial_por_tabla(tabla):
     try:
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 20, type=int)
+        cursor = request.args.get('cursor')
+
+        query = VistaHistorialCompleta.query.filter_by(tabla=tabla)
+
+        if cursor is not None:
+            try:
+                pagina = paginar_por_cursor(query, _CLAVE_CURSOR, cursor, per_page)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+
+            return jsonify({
+                'movimientos': [item.to_dict_detallado() for item in pagina.items],
+                'per_page': pagina.per_page,
+                'has_next': pagina.has_next,
+                'next_cursor': pagina.next_cursor
+            }), 200
 
-        query = VistaHistorialCompleta.query.filter_by(tabla=tabla).order_by(
-            VistaHistorialCompleta.fecha.desc()
-        )
+        query = query.order_by(VistaHistorialCompleta.fecha.desc())
 
-        paginated = query.paginate(page=page, per_page=per_page, error_out=False)
+        paginated = paginar(query, page, per_page)
 
         return jsonify({
             'movimientos': [item.to_dict_detallado() for item in paginated.items],
             'total': paginated.total,
             'pages': paginated.pages,
+            'total_estimado': paginated.total_estimado,
             'current_page': paginated.page
         }), 200
 
@@ -235,3 +213,224 @@ def get_historial_por_registro(tabla, registro_id):
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+
+
+# ============================================
+# LECTURAS ASYNC (/api/async/historial, con ASYNC_LECTURAS)
+# ============================================
+
+historial_async_bp = Blueprint('historial_async', __name__)
+historial_async_bp.before_request(liberar_sesion_sincrona)
+
+
+@historial_async_bp.route('/', methods=['GET'])
+@jwt_required()
+@require_permission('historial', 'puede_leer')
+async def get_historial_async():
+    """Mismo listado que GET /api/historial/, leído con asyncpg"""
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 20, type=int)
+    cursor = request.args.get('cursor')
+
+    plan = plan_de(VistaHistorialCompleta)
+    query = _query_historial_filtrada()
+
+    if cursor is not None:
+        try:
+            sentencia = plan.consulta(
+                filtrar_por_cursor(query, _CLAVE_CURSOR, cursor, per_page)
+            ).statement
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        pagina = pagina_por_cursor(await filas(sentencia), _CLAVE_CURSOR, per_page)
+        return jsonify({
+            'movimientos': await _detallar_async(plan, pagina.items),
+            'per_page':    pagina.per_page,
+            'has_next':    pagina.has_next,
+            'next_cursor': pagina.next_cursor
+        }), 200
+
+    paginated = await paginar_async(
+        plan.consulta(_ordenar_historial(query)).statement, page, per_page
+    )
+    return jsonify({
+        'movimientos':   await _detallar_async(plan, paginated.items),
+        'total':         paginated.total,
+        'pages':         paginated.pages,
+        'total_estimado': paginated.total_estimado,
+        'current_page':  paginated.page,
+        'per_page':      per_page,
+        'has_next':      paginated.has_next,
+        'has_prev':      paginated.has_prev
+    }), 200
+
+
+@historial_async_bp.route('/<int:id>', methods=['GET'])
+@jwt_required()
+@require_permission('historial', 'puede_leer')
+async def get_historial_detalle_async(id):
+    """Obtener un cambio específico con detalles completos"""
+    plan = plan_de(VistaHistorialCompleta)
+    fila = await primera(plan.sentencia_obtener(id))
+    if not fila:
+        return jsonify({'error': 'Registro no encontrado'}), 404
+
+    movimientos = await _detallar_async(plan, [fila], solo_visibles=False)
+    return jsonify(movimientos[0]), 200
+
+
+# ============================================
+# HELPERS
+# ============================================
+
+def _ordenar_historial(query):
+    """Orden del listado paginado por OFFSET (?sort_by, ?sort_dir)."""
+    sort_by = request.args.get('sort_by')
+    sort_dir = request.args.get('sort_dir', 'asc')
+
+    if sort_by:
+        column = getattr(VistaHistorialCompleta, sort_by, None)
+        if column:
+            if sort_dir == 'desc':
+                query = query.order_by(column.desc())
+            else:
+                query = query.order_by(column.asc())
+
+    return query.order_by(VistaHistorialCompleta.id_historial.asc())
+
+
+async def _detallar_async(plan, filas_vista, solo_visibles=True) -> list[dict]:
+    """
+    Equivalente a to_dict_detallado() para filas de la vista: las etiquetas
+    de todos los catálogos se piden en paralelo, una consulta por catálogo.
+    """
+    if solo_visibles:
+        filas_vista = [fila for fila in filas_vista if _es_visible(fila)]
+
+    resolvedor = ResolvedorEtiquetas()
+    pendientes = resolvedor.consultas_pendientes(fila.cambios for fila in filas_vista)
+    resultados = await asyncio.gather(*(filas(sentencia) for _, _, sentencia in pendientes))
+    for (columna_id, ids, _), encontrados in zip(pendientes, resultados):
+        resolvedor.registrar(columna_id, ids, encontrados)
+
+    movimientos = []
+    for fila in filas_vista:
+        movimiento = plan.serializar(fila)
+        if fila.cambios:
+            movimiento['cambios_detallados'] = resolvedor.formatear(fila.cambios)
+        movimientos.append(movimiento)
+    return movimientos
+
+
+def _query_historial_filtrada():
+    """
+    Query de vista_historial_completa con los filtros de la petición
+    (search, tipo_registro, tipo_movimiento, usuario_id, fecha_desde,
+    fecha_hasta). Compartida por el listado y la exportación.
+    """
+    search        = request.args.get('search', '').strip()
+    tipo_registro  = request.args.get('tipo_registro', '').strip()
+    tipo_movimiento = request.args.get('tipo_movimiento', '').strip()
+    usuario_id    = request.args.get('usuario_id')
+    fecha_desde   = request.args.get('fecha_desde', '').strip()
+    fecha_hasta   = request.args.get('fecha_hasta', '').strip()
+
+    # Query base — solo tablas visibles
+    query = VistaHistorialCompleta.query.filter(
+        VistaHistorialCompleta.tabla.in_(TABLAS_VISIBLES)
+    )
+
+    # Excluir UPDATEs cuyo único cambio sea un campo ignorado
+    # (se hace en Python tras paginación para no complicar el ORM,
+    #  pero primero excluimos los casos más comunes a nivel SQL)
+    # Nota: si cambios es un JSON como {"ultimo_acceso": {...}},
+    # podemos filtrar en SQL con cast + operador JSON
+    # Se hace la exclusión post-fetch con _es_visible().
+
+    # ── Filtros ─────────────────────────────────────────────────────
+    if search:
+        search_lower = search.lower()
+
+        logger.debug('Búsqueda en historial: %s', search_lower)
+
+        # Resolver si el término coincide con algún alias
+        tabla_buscada     = None
+        operacion_buscada = None
+        es_catalogo       = False
+
+        for alias, tabla_real in TABLA_ALIASES.items():
+            if alias in search_lower:
+                if tabla_real is None:
+                    es_catalogo = True
+                else:
+                    tabla_buscada = tabla_real
+                break
+
+        for alias, op_real in OPERACION_ALIASES.items():
+            if alias in search_lower:
+                operacion_buscada = op_real
+                break
+
+        # Construir condiciones OR
+        condiciones = [
+            VistaHistorialCompleta.realizado_por.ilike(f'%{search}%'),
+            VistaHistorialCompleta.registro_id.ilike(f'%{search}%'),
+            VistaHistorialCompleta.tabla.ilike(f'%{search}%'),
+            VistaHistorialCompleta.operacion.ilike(f'%{search}%'),
+            cast(VistaHistorialCompleta.id_historial, String).ilike(f'%{search}%')
+        ]
+
+        if tabla_buscada:
+            condiciones.append(VistaHistorialCompleta.tabla == tabla_buscada)
+
+        if es_catalogo:
+            condiciones.append(VistaHistorialCompleta.tabla.like('cat_%'))
+
+        if operacion_buscada:
+            condiciones.append(VistaHistorialCompleta.operacion == operacion_buscada)
+
+        query = query.filter(or_(*condiciones))
+
+    if usuario_id:
+        query = query.filter(VistaHistorialCompleta.usuario_id == usuario_id)
+
+    if tipo_registro:
+        tabla_nombre = TIPO_DE_REGISTRO.get(tipo_registro.lower(), tipo_registro)
+        query = query.filter(VistaHistorialCompleta.tabla == tabla_nombre)
+
+    if tipo_movimiento:
+        operacion_nombre = OPERACION_MOVIMIENTO.get(tipo_movimiento.lower(), tipo_movimiento.upper())
+        query = query.filter(VistaHistorialCompleta.operacion == operacion_nombre)
+
+    # Rango semiabierto [desde, hasta + 1 día) sobre la clave de partición:
+    # PostgreSQL solo recorre las particiones mensuales que lo cubren
+    if fecha_desde:
+        try:
+            fecha_desde_dt = datetime.strptime(fecha_desde, '%Y-%m-%d')
+            query = query.filter(VistaHistorialCompleta.fecha >= fecha_desde_dt)
+        except ValueError:
+            pass
+
+    if fecha_hasta:
+        try:
+            fecha_hasta_dt = datetime.strptime(fecha_hasta, '%Y-%m-%d') + timedelta(days=1)
+            query = query.filter(VistaHistorialCompleta.fecha < fecha_hasta_dt)
+        except ValueError:
+            pass
+
+    return query
+
+
+def _es_visible(item):
+    """
+    Filtro post-fetch: devuelve False si el registro no aporta información
+    útil (UPDATEs cuyos únicos cambios son campos ignorados).
+    """
+    if item.operacion != 'UPDATE':
+        return True
+    if not item.cambios:
+        return False  # UPDATE sin cambios registrados → omitir
+    campos_cambiados = set(item.cambios.keys())
+    # Si todos los campos cambiados son ignorados, omitir
+    return not campos_cambiados.issubset(CAMPOS_IGNORADOS)
@@ -1,12 +1,18 @@
+from collections import Counter
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
-from models import Mobiliario, MobiliarioResponsable, Usuario
-from utils.concurrency import liberar_bloqueo, verificar_version
+from models import CatEstado, CatTipoMobiliario, Mobiliario, MobiliarioResponsable
+from utils.concurrency import actualizar_con_version, liberar_bloqueo, respuesta_conflicto
 from utils.decorators import require_permission
-from utils.validators import validate_mobiliario, ValidationError, handle_db_error
+from utils.validators import validate_mobiliario, validate_actualizacion_masiva, ValidationError, handle_db_error
 from utils.lock_required import lock_required
+from utils.dependencias import respuesta_dependencias, verificar_dependencias
 from utils.responsables import sync_responsables
+from utils.paginacion import paginar
+from utils.importacion import EsquemaImportacion, importar, leer_filas
+from utils.actualizacion_masiva import ACTUALIZADO, actualizar_en_lote
+from utils.constants import FILTROS_ACTUALIZACION_MASIVA, MENSAJE_FK_GENERICO, MENSAJES_FK
 
 mobiliario_bp = Blueprint('mobiliario', __name__)
 
@@ -36,12 +42,13 @@ def get_mobiliario():
         )
 
     query = query.order_by(Mobiliario.id_mueble.desc())
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    pagination = paginar(query, page, per_page)
 
     return jsonify({
         'mobiliario': [m.to_dict(include_responsables=True) for m in pagination.items],
         'total': pagination.total,
         'pages': pagination.pages,
+        'total_estimado': pagination.total_estimado,
         'current_page': page
     }), 200
 
@@ -91,12 +98,13 @@ def create_mobiliario():
         db.session.flush()
 
         # Agregar responsables iniciales
-        for usuario_id in data.get('responsables_ids') or []:
-            if Usuario.query.get(usuario_id):
-                db.session.add(MobiliarioResponsable(
-                    mueble_id=mueble.id_mueble,
-                    usuario_id=usuario_id
-                ))
+        if data.get('responsables_ids'):
+            sync_responsables(
+                modelo_asignacion=MobiliarioResponsable,
+                entidad_id=mueble.id_mueble,
+                nuevos_ids=data['responsables_ids'],
+                campo_entidad='mueble_id',
+            )
 
         db.session.commit()
 
@@ -111,17 +119,49 @@ def create_mobiliario():
         return jsonify({'error': message}), code
 
 
+@mobiliario_bp.route('/import', methods=['POST'])
+@jwt_required()
+@require_permission('mobiliario', 'puede_crear')
+def import_mobiliario():
+    """
+    Importar mobiliario en lote desde CSV o JSON lines.
+    Se aceptan nombres de catálogo (tipo_mobiliario, estado) en lugar de IDs.
+    Si alguna fila tiene errores no se crea ningún mueble.
+    Con ?dry_run=true solo se devuelve el reporte de validación.
+    """
+    dry_run = request.args.get('dry_run', 'false').lower() == 'true'
+
+    try:
+        filas = leer_filas()
+    except ValidationError as e:
+        return jsonify({'error': e.message, 'campos': e.fields}), 400
+
+    try:
+        reporte = importar(_IMPORTACION_MOBILIARIO, filas, dry_run=dry_run)
+
+        if reporte['errores']:
+            db.session.rollback()
+            return jsonify({'error': 'El archivo tiene filas con errores', **reporte}), 422
+
+        if dry_run:
+            db.session.rollback()
+            return jsonify({'mensaje': 'El archivo es válido', **reporte}), 200
+
+        db.session.commit()
+        return jsonify({'mensaje': f"{reporte['creados']} muebles importados exitosamente", **reporte}), 201
+
+    except Exception as e:
+        db.session.rollback()
+        message, code = handle_db_error(e)
+        return jsonify({'error': message}), code
+
+
 @mobiliario_bp.route('/<int:id>', methods=['PUT'])
 @jwt_required()
 @require_permission('mobiliario', 'puede_actualizar')
 def update_mobiliario(id):
     """Actualizar mobiliario con control de versiones y diff de responsables"""
     user_id = get_jwt_identity()
-    mueble = Mobiliario.query.get(id)
-
-    if not mueble:
-        return jsonify({'error': 'Mueble no encontrado'}), 404
-
     data = request.get_json()
 
     if not data:
@@ -132,32 +172,27 @@ def update_mobiliario(id):
     except ValidationError as e:
         return jsonify({'error': e.message, 'campos': e.fields}), 422
 
-    version_cliente = data.get('version')
-    if version_cliente is not None:
-        es_valida, version_actual = verificar_version(Mobiliario, id, version_cliente)
-        if not es_valida:
-            return jsonify({
-                'error': 'conflict',
-                'mensaje': 'El registro fue modificado por otro usuario',
-                'version_actual': version_actual,
-                'datos_actuales': mueble.to_dict(include_version=True, include_responsables=True)
-            }), 409
-
     try:
         campo_map = {
-            'tipo_mobiliario_id':  lambda v: setattr(mueble, 'tipo_mobiliario_id', v),
-            'marca':               lambda v: setattr(mueble, 'marca', v.strip() or None),
-            'modelo':              lambda v: setattr(mueble, 'modelo', v.strip() or None),
-            'color':               lambda v: setattr(mueble, 'color', v.strip() or None),
-            'caracteristicas':     lambda v: setattr(mueble, 'caracteristicas', v.strip() or None),
-            'observaciones':       lambda v: setattr(mueble, 'observaciones', v.strip() or None),
-            'estado_id':           lambda v: setattr(mueble, 'estado_id', v),
-            'sucursal_nombre':     lambda v: setattr(mueble, 'sucursal_nombre', v.strip()),
+            'tipo_mobiliario_id':  lambda v: v,
+            'marca':               lambda v: v.strip() or None,
+            'modelo':              lambda v: v.strip() or None,
+            'color':               lambda v: v.strip() or None,
+            'caracteristicas':     lambda v: v.strip() or None,
+            'observaciones':       lambda v: v.strip() or None,
+            'estado_id':           lambda v: v,
+            'sucursal_nombre':     lambda v: v.strip(),
         }
-
-        for campo, setter in campo_map.items():
-            if campo in data:
-                setter(data[campo])
+        cambios = {campo: limpiar(data[campo]) for campo, limpiar in campo_map.items() if campo in data}
+
+        # Compare-and-swap sobre la versión que vio el cliente
+        mueble = actualizar_con_version(Mobiliario, id, data.get('version'), cambios)
+        if mueble is None:
+            return respuesta_conflicto(
+                Mobiliario, id,
+                lambda m: m.to_dict(include_version=True, include_responsables=True),
+                'Mueble no encontrado'
+            )
 
         # Sincronizar responsables usando la utilidad compartida
         if 'responsables_ids' in data:
@@ -182,6 +217,59 @@ def update_mobiliario(id):
         return jsonify({'error': message}), code
 
 
+@mobiliario_bp.route('/bulk', methods=['PATCH'])
+@jwt_required()
+@require_permission('mobiliario', 'puede_actualizar')
+def bulk_update_mobiliario():
+    """
+    Actualizar estado, sucursal y/o responsables de varios muebles a la vez.
+    Respeta la versión enviada por registro y los bloqueos de otros usuarios;
+    devuelve el resultado de cada ID.
+    """
+    user_id = int(get_jwt_identity())
+    data = request.get_json()
+
+    if not data:
+        return jsonify({'error': 'No se recibieron datos'}), 400
+
+    try:
+        validate_actualizacion_masiva(data, FILTROS_ACTUALIZACION_MASIVA['mobiliario'])
+        resultados = actualizar_en_lote(
+            Mobiliario, data, user_id,
+            responsables=(MobiliarioResponsable, 'mueble_id'),
+        )
+    except ValidationError as e:
+        db.session.rollback()
+        return jsonify({'error': e.message, 'campos': e.fields}), 422
+    except Exception as e:
+        # FK de estado_id inexistente, etc.
+        db.session.rollback()
+        message, code = handle_db_error(e, tabla='mobiliario')
+        return jsonify({'error': message}), code
+
+    try:
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        message, code = handle_db_error(e, tabla='mobiliario')
+        return jsonify({'error': message}), code
+
+    resumen = Counter(r['resultado'] for r in resultados)
+    return jsonify({
+        'mensaje': f"{resumen.get(ACTUALIZADO, 0)} de {len(resultados)} muebles actualizados",
+        'resumen': resumen,
+        'resultados': resultados
+    }), 200
+
+
+@mobiliario_bp.route('/<int:id>/dependencias', methods=['GET'])
+@jwt_required()
+@require_permission('mobiliario', 'puede_leer')
+def dependencias_mobiliario(id):
+    """Registros que impiden eliminar el mueble."""
+    return respuesta_dependencias(Mobiliario, id, 'Mueble no encontrado')
+
+
 @mobiliario_bp.route('/<int:id>', methods=['DELETE'])
 @jwt_required()
 @require_permission('mobiliario', 'puede_eliminar')
@@ -193,6 +281,9 @@ def delete_mobiliario(id, bloqueo):
     if not mueble:
         return jsonify({'error': 'Mueble no encontrado'}), 404
 
+    if verificar_dependencias(Mobiliario, id):
+        return jsonify({'error': MENSAJES_FK.get('mobiliario', MENSAJE_FK_GENERICO)}), 409
+
     try:
         db.session.delete(mueble)
         db.session.delete(bloqueo)
@@ -203,4 +294,38 @@ def delete_mobiliario(id, bloqueo):
     except Exception as e:
         db.session.rollback()
         message, code = handle_db_error(e, tabla='mobiliario')
-        return jsonify({'error': message}), code
\ No newline at end of file
+        return jsonify({'error': message}), code
+
+
+# ============================================
+# HELPERS
+# ============================================
+
+def _columnas_mueble(data: dict) -> dict:
+    """Columnas de un mueble nuevo, con la misma limpieza que create_mobiliario."""
+    def texto(campo, default=''):
+        return str(data.get(campo) or default).strip() or None
+
+    return {
+        'tipo_mobiliario_id': int(data['tipo_mobiliario_id']),
+        'marca': texto('marca'),
+        'modelo': texto('modelo'),
+        'color': texto('color'),
+        'caracteristicas': texto('caracteristicas'),
+        'observaciones': texto('observaciones'),
+        'estado_id': int(data['estado_id']),
+        'sucursal_nombre': texto('sucursal_nombre', 'Tulancingo'),
+        'version': 1,
+    }
+
+
+_IMPORTACION_MOBILIARIO = EsquemaImportacion(
+    modelo=Mobiliario,
+    validador=validate_mobiliario,
+    construir=_columnas_mueble,
+    catalogos={
+        'tipo_mobiliario': ('tipo_mobiliario_id', CatTipoMobiliario.id_tipo_mobiliario, CatTipoMobiliario.nombre_tipo),
+        'estado':          ('estado_id', CatEstado.id_estado, CatEstado.nombre_estado),
+    },
+    responsables=(MobiliarioResponsable, 'mueble_id'),
+)
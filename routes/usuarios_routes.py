@@ -1,13 +1,15 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
-from models import Usuario, Acceso, Permiso
-from utils.concurrency import liberar_bloqueo, verificar_version
+from models import Usuario, Acceso, Permiso, EquipoResponsable, MobiliarioResponsable
+from utils.concurrency import actualizar_con_version, liberar_bloqueo, respuesta_conflicto
 from utils.decorators import require_permission
 from utils.validators import validate_responsable, validate_acceso, ValidationError, handle_db_error
 import bcrypt
+from utils.metricas import BCRYPT_SEGUNDOS
 from utils.lock_required import lock_required
-from utils.constants import MODULOS_DISPONIBLES
+from utils.dependencias import respuesta_dependencias, verificar_dependencias
+from utils.constants import MODULOS_DISPONIBLES, MENSAJE_FK_GENERICO, MENSAJES_FK
 
 usuarios_bp = Blueprint('usuarios', __name__)
 
@@ -89,11 +91,6 @@ def create_responsable():
 def update_responsable(id):
     """Actualizar usuario responsable"""
     user_id = get_jwt_identity()
-    usuario = Usuario.query.get(id)
-
-    if not usuario:
-        return jsonify({'error': 'Usuario no encontrado'}), 404
-
     data = request.get_json()
 
     if not data:
@@ -104,20 +101,12 @@ def update_responsable(id):
     except ValidationError as e:
         return jsonify({'error': e.message, 'campos': e.fields}), 422
 
-    version_cliente = data.get('version')
-    if version_cliente is not None:
-        es_valida, version_actual = verificar_version(Usuario, id, version_cliente)
-        if not es_valida:
-            return jsonify({
-                'error': 'conflict',
-                'mensaje': 'El registro fue modificado por otro usuario',
-                'version_actual': version_actual,
-                'datos_actuales': usuario.to_dict(include_version=True)
-            }), 409
-
     # Verificar nómina única si cambió
-    if data.get('numero_nomina') and data['numero_nomina'] != usuario.numero_nomina:
-        existe = Usuario.query.filter_by(numero_nomina=data['numero_nomina']).first()
+    if data.get('numero_nomina'):
+        existe = Usuario.query.filter(
+            Usuario.numero_nomina == data['numero_nomina'],
+            Usuario.id_usuario != id
+        ).first()
         if existe:
             return jsonify({
                 'error': 'El número de nómina ya está registrado',
@@ -126,15 +115,19 @@ def update_responsable(id):
 
     try:
         campo_map = {
-            'nombre_usuario': lambda v: setattr(usuario, 'nombre_usuario', v.strip()),
-            'numero_nomina':  lambda v: setattr(usuario, 'numero_nomina', v or None),
-            'puesto':         lambda v: setattr(usuario, 'puesto', v.strip() or None),
-            'area_id':        lambda v: setattr(usuario, 'area_id', v or None),
+            'nombre_usuario': lambda v: v.strip(),
+            'numero_nomina':  lambda v: v or None,
+            'puesto':         lambda v: v.strip() or None,
+            'area_id':        lambda v: v or None,
         }
+        cambios = {campo: limpiar(data[campo]) for campo, limpiar in campo_map.items() if campo in data}
 
-        for campo, setter in campo_map.items():
-            if campo in data:
-                setter(data[campo])
+        # Compare-and-swap sobre la versión que vio el cliente
+        usuario = actualizar_con_version(Usuario, id, data.get('version'), cambios)
+        if usuario is None:
+            return respuesta_conflicto(
+                Usuario, id, lambda u: u.to_dict(include_version=True), 'Usuario no encontrado'
+            )
 
         db.session.commit()
 
@@ -152,32 +145,28 @@ def update_responsable(id):
         return jsonify({'error': message}), code
 
 
+@usuarios_bp.route('/responsables/<int:id>/dependencias', methods=['GET'])
+@jwt_required()
+@require_permission('responsable', 'puede_leer')
+def dependencias_responsable(id):
+    """Asignaciones y registros que impiden eliminar al responsable"""
+    return respuesta_dependencias(
+        Usuario, id, 'Usuario no encontrado', adicionales=_ASIGNACIONES_RESPONSABLE
+    )
+
+
 @usuarios_bp.route('/responsables/<int:id>', methods=['DELETE'])
 @jwt_required()
 @require_permission('responsable', 'puede_eliminar')
 @lock_required('usuario')
 def delete_responsable(id, bloqueo):
     """Eliminar el usuario responsable"""
-    from models import EquipoResponsable, MobiliarioResponsable
-
     usuario = Usuario.query.get(id)
     if not usuario:
         return jsonify({'error': 'Usuario no encontrado'}), 404
 
-    # ── Verificar asignaciones activas ───────────────────────────────
-    equipos_asignados   = EquipoResponsable.query.filter_by(usuario_id=id).count()
-    muebles_asignados   = MobiliarioResponsable.query.filter_by(usuario_id=id).count()
-
-    if equipos_asignados > 0 or muebles_asignados > 0:
-        partes = []
-        if equipos_asignados:
-            partes.append(
-                f'{equipos_asignados} equipo{"s" if equipos_asignados > 1 else ""} de cómputo'
-            )
-        if muebles_asignados:
-            partes.append(
-                f'{muebles_asignados} mueble{"s" if muebles_asignados > 1 else ""}'
-            )
+    # ── Verificar asignaciones activas (EXISTS, sin contar) ──────────
+    if verificar_dependencias(Usuario, id, adicionales=_ASIGNACIONES_RESPONSABLE):
         return jsonify({
             'error': ('No se puede eliminar este responsable porque tiene elementos asignados.')
         }), 409
@@ -262,7 +251,8 @@ def create_acceso():
         }), 409
 
     try:
-        password_hash = bcrypt.hashpw(data['password'].encode('utf-8'), bcrypt.gensalt())
+        with BCRYPT_SEGUNDOS.labels('hashear').time():
+            password_hash = bcrypt.hashpw(data['password'].encode('utf-8'), bcrypt.gensalt())
 
         acceso = Acceso(
             nombre_usuario=data['nombre_usuario'].strip(),
@@ -311,11 +301,6 @@ def create_acceso():
 def update_acceso(id):
     """Actualizar cuenta de acceso y/o sus permisos"""
     user_id = get_jwt_identity()
-    acceso = Acceso.query.get(id)
-
-    if not acceso:
-        return jsonify({'error': 'Acceso no encontrado'}), 404
-
     data = request.get_json()
 
     if not data:
@@ -326,34 +311,36 @@ def update_acceso(id):
     except ValidationError as e:
         return jsonify({'error': e.message, 'campos': e.fields}), 422
 
-    version_cliente = data.get('version')
-    if version_cliente is not None:
-        es_valida, version_actual = verificar_version(Acceso, id, version_cliente)
-        if not es_valida:
+    if 'correo_electronico' in data:
+        existe = Acceso.query.filter(
+            Acceso.correo_electronico == data['correo_electronico'],
+            Acceso.id_acceso != id
+        ).first()
+        if existe:
             return jsonify({
-                'error': 'conflict',
-                'mensaje': 'El registro fue modificado por otro usuario',
-                'version_actual': version_actual,
-                'datos_actuales': acceso.to_dict(include_version=True)
+                'error': 'El correo ya está registrado',
+                'campos': {'correo_electronico': 'Este correo ya existe'}
             }), 409
 
     try:
-        for campo in ['nombre_usuario', 'area_id']:
-            if campo in data:
-                setattr(acceso, campo, data[campo])
-
-        if 'correo_electronico' in data and data['correo_electronico'] != acceso.correo_electronico:
-            if Acceso.query.filter_by(correo_electronico=data['correo_electronico']).first():
-                return jsonify({
-                    'error': 'El correo ya está registrado',
-                    'campos': {'correo_electronico': 'Este correo ya existe'}
-                }), 409
-            acceso.correo_electronico = data['correo_electronico']
+        cambios = {
+            campo: data[campo]
+            for campo in ['nombre_usuario', 'area_id', 'correo_electronico']
+            if campo in data
+        }
 
         if 'password' in data and data['password']:
-            acceso.contrasena_hash = bcrypt.hashpw(
-                data['password'].encode('utf-8'), bcrypt.gensalt()
-            ).decode('utf-8')
+            with BCRYPT_SEGUNDOS.labels('hashear').time():
+                cambios['contrasena_hash'] = bcrypt.hashpw(
+                    data['password'].encode('utf-8'), bcrypt.gensalt()
+                ).decode('utf-8')
+
+        # Compare-and-swap sobre la versión que vio el cliente
+        acceso = actualizar_con_version(Acceso, id, data.get('version'), cambios)
+        if acceso is None:
+            return respuesta_conflicto(
+                Acceso, id, lambda a: a.to_dict(include_version=True), 'Acceso no encontrado'
+            )
 
         if 'permisos' in data:
             permisos_data = data['permisos']
@@ -396,6 +383,14 @@ def update_acceso(id):
         return jsonify({'error': message}), code
 
 
+@usuarios_bp.route('/accesos/<int:id>/dependencias', methods=['GET'])
+@jwt_required()
+@require_permission('acceso', 'puede_leer')
+def dependencias_acceso(id):
+    """Registros que impiden eliminar la cuenta de acceso"""
+    return respuesta_dependencias(Acceso, id, 'Acceso no encontrado')
+
+
 @usuarios_bp.route('/accesos/<int:id>', methods=['DELETE'])
 @jwt_required()
 @require_permission('acceso', 'puede_eliminar')
@@ -411,6 +406,9 @@ def delete_acceso(id, bloqueo):
     if not acceso:
         return jsonify({'error': 'Acceso no encontrado'}), 404
 
+    if verificar_dependencias(Acceso, id):
+        return jsonify({'error': MENSAJES_FK.get('acceso', MENSAJE_FK_GENERICO)}), 409
+
     try:
         db.session.delete(acceso)
         db.session.delete(bloqueo)
@@ -421,4 +419,12 @@ def delete_acceso(id, bloqueo):
     except Exception as e:
         db.session.rollback()
         message, code = handle_db_error(e, tabla='acceso')
-        return jsonify({'error': message}), code
\ No newline at end of file
+        return jsonify({'error': message}), code
+
+# ============================================
+# HELPERS
+# ============================================
+
+# Las asignaciones se borran en cascada en la BD, pero un responsable con
+# bienes asignados no debe poder eliminarse
+_ASIGNACIONES_RESPONSABLE = (EquipoResponsable.usuario_id, MobiliarioResponsable.usuario_id)
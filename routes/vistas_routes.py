@@ -1,10 +1,15 @@
 from flask import Blueprint, request, jsonify
 import json
-from flask_jwt_extended import jwt_required
-from sqlalchemy import String, and_, or_, func, cast, text
+from flask_jwt_extended import get_jwt_identity, jwt_required
+from sqlalchemy import String, and_, or_, func, cast, select, text
 from utils.extesions import db
 from utils.decorators import require_permission
+from utils.serializador_vistas import plan_de
+from utils.paginacion import paginar
+from utils.async_db import liberar_sesion_sincrona, paginar_async, primera
+from utils.resumen import SECCIONES, resumen_seccion
 from models import (
+    Permiso,
     VistaEquiposCompleta,
     VistaMobiliarioCompleta,
     VistaUsuariosCompleta,
@@ -22,14 +27,243 @@ vistas_bp = Blueprint('vistas', __name__)
 @require_permission('computo', 'puede_leer')
 def get_vista_equipos_completa():
     """Obtener vista completa de equipos con toda la información relacionada"""
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 20, type=int)
+
+    plan = plan_de(VistaEquiposCompleta)
+    pagination = paginar(plan.consulta(_query_equipos()), page, per_page)
+    return _respuesta_pagina('equipos', plan, pagination), 200
+
+
+@vistas_bp.route('/equipo-completo/<int:id>', methods=['GET'])
+@jwt_required()
+@require_permission('computo', 'puede_leer')
+def get_equipo_completo(id):
+    """Obtener un equipo por ID con especificaciones"""
+    equipo = plan_de(VistaEquiposCompleta).obtener(id)
+
+    if not equipo:
+        return jsonify({
+            'error': 'Equipo no encontrado'
+        }), 404
+
+    return jsonify(equipo), 200
+
+
+# ============================================
+# VISTA COMPLETA DE MOBILIARIO
+# ============================================
+
+@vistas_bp.route('/mobiliarios-completo/', methods=['GET'])
+@jwt_required()
+@require_permission('mobiliario', 'puede_leer')
+def get_vista_mobiliario_completa():
+    """Obtener vista completa de mobiliario con toda la información relacionada"""
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 20, type=int)
+
+    plan = plan_de(VistaMobiliarioCompleta)
+    pagination = paginar(plan.consulta(_query_mobiliario()), page, per_page)
+    return _respuesta_pagina('mobiliario', plan, pagination), 200
+
+
+@vistas_bp.route('/mobiliario-completo/<int:id>', methods=['GET'])
+@jwt_required()
+@require_permission('mobiliario', 'puede_leer')
+def get_mobiliario_completo(id):
+    """Obtener un mobiliario mediante su ID"""
+    mobiliario = plan_de(VistaMobiliarioCompleta).obtener(id)
+
+    if not mobiliario:
+        return jsonify({
+            'error': 'Mobiliario no encontrado'
+        }), 404
+
+    return jsonify(mobiliario), 200
+
+# ============================================
+# VISTA DE USUARIOS CON CONTEO DE BIENES
+# ============================================
+
+@vistas_bp.route('/responsables-completo/', methods=['GET'])
+@jwt_required()
+@require_permission('responsable', 'puede_leer')
+def get_vista_responsables_completa():
+    """Obtener vista de usuarios responsables con conteo de bienes asignados"""
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 20, type=int)
+
+    plan = plan_de(VistaUsuariosCompleta)
+    pagination = paginar(plan.consulta(_query_responsables()), page, per_page)
+    return _respuesta_pagina('responsables', plan, pagination), 200
+
+@vistas_bp.route('/responsable-completo/<int:id>', methods=['GET'])
+@jwt_required()
+@require_permission('responsable', 'puede_leer')
+def get_usuario_complet(id):
+    """Obtener un usuario mediante su ID"""
+    usuario = plan_de(VistaUsuariosCompleta).obtener(id)
+
+    if not usuario:
+        return jsonify({
+            'error': 'Usuario no encontrado'
+        }), 404
+
+    return jsonify(usuario), 200
+
+
+# ============================================
+# VISTA DE ACCESOS CON RESUMEN DE PERMISOS
+# ============================================
+
+@vistas_bp.route('/accesos-completo/', methods=['GET'])
+@jwt_required()
+@require_permission('acceso', 'puede_leer')
+def get_vista_accesos_completa():
+    """Obtener vista de accesos al sistema con resumen de permisos"""
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 20, type=int)
+
+    plan = plan_de(VistaAccesosCompleta)
+    pagination = paginar(plan.consulta(_query_accesos()), page, per_page)
+    return _respuesta_pagina('accesos', plan, pagination), 200
+
+@vistas_bp.route('/acceso-completo/<int:id>', methods=['GET'])
+@jwt_required()
+@require_permission('acceso', 'puede_leer')
+def get_acceso_completo(id):
+    """Obtener un acceso mediante su ID"""
+    acceso = plan_de(VistaAccesosCompleta).obtener(id)
+
+    if not acceso:
+        return jsonify({
+            'mensaje': 'Acceso no encontrado'
+        }), 404
+
+    return jsonify(acceso), 200
+
+
+# ============================================
+# RESUMEN DEL INVENTARIO (TABLERO)
+# ============================================
+
+@vistas_bp.route('/resumen', methods=['GET'])
+@jwt_required()
+def get_resumen():
+    """
+    Conteos por estado, tipo, sucursal, área y responsable para el tablero.
+    Incluye solo las secciones (equipos, mobiliario) que el usuario puede leer.
+    """
+    user_id = int(get_jwt_identity())
+    modulos = set(db.session.scalars(
+        select(Permiso.modulo).where(Permiso.acceso_id == user_id, Permiso.puede_leer.is_(True))
+    ))
+
+    resumen = {
+        seccion: resumen_seccion(seccion)
+        for seccion, (modulo, *_) in SECCIONES.items()
+        if modulo in modulos
+    }
+
+    if not resumen:
+        return jsonify({'error': 'Sin permisos en este módulo'}), 403
+
+    return jsonify(resumen), 200
+
+
+# ============================================
+# LECTURAS ASYNC (/api/async/vistas, con ASYNC_LECTURAS)
+# ============================================
+
+vistas_async_bp = Blueprint('vistas_async', __name__)
+vistas_async_bp.before_request(liberar_sesion_sincrona)
+
+
+@vistas_async_bp.route('/equipos-completo/', methods=['GET'])
+@jwt_required()
+@require_permission('computo', 'puede_leer')
+async def get_vista_equipos_completa_async():
+    return await _listar_async(VistaEquiposCompleta, _query_equipos, 'equipos')
+
+
+@vistas_async_bp.route('/equipo-completo/<int:id>', methods=['GET'])
+@jwt_required()
+@require_permission('computo', 'puede_leer')
+async def get_equipo_completo_async(id):
+    return await _obtener_async(VistaEquiposCompleta, id, {'error': 'Equipo no encontrado'})
+
+
+@vistas_async_bp.route('/mobiliarios-completo/', methods=['GET'])
+@jwt_required()
+@require_permission('mobiliario', 'puede_leer')
+async def get_vista_mobiliario_completa_async():
+    return await _listar_async(VistaMobiliarioCompleta, _query_mobiliario, 'mobiliario')
+
+
+@vistas_async_bp.route('/mobiliario-completo/<int:id>', methods=['GET'])
+@jwt_required()
+@require_permission('mobiliario', 'puede_leer')
+async def get_mobiliario_completo_async(id):
+    return await _obtener_async(VistaMobiliarioCompleta, id, {'error': 'Mobiliario no encontrado'})
+
+
+@vistas_async_bp.route('/responsables-completo/', methods=['GET'])
+@jwt_required()
+@require_permission('responsable', 'puede_leer')
+async def get_vista_responsables_completa_async():
+    return await _listar_async(VistaUsuariosCompleta, _query_responsables, 'responsables')
+
+
+@vistas_async_bp.route('/responsable-completo/<int:id>', methods=['GET'])
+@jwt_required()
+@require_permission('responsable', 'puede_leer')
+async def get_usuario_completo_async(id):
+    return await _obtener_async(VistaUsuariosCompleta, id, {'error': 'Usuario no encontrado'})
+
+
+@vistas_async_bp.route('/accesos-completo/', methods=['GET'])
+@jwt_required()
+@require_permission('acceso', 'puede_leer')
+async def get_vista_accesos_completa_async():
+    return await _listar_async(VistaAccesosCompleta, _query_accesos, 'accesos')
+
+
+@vistas_async_bp.route('/acceso-completo/<int:id>', methods=['GET'])
+@jwt_required()
+@require_permission('acceso', 'puede_leer')
+async def get_acceso_completo_async(id):
+    return await _obtener_async(VistaAccesosCompleta, id, {'mensaje': 'Acceso no encontrado'})
+
+
+# ============================================
+# HELPER
+# ============================================
+
+def _parse_ids_list(raw_list):
+    """
+    Normaliza una lista de IDs que puede venir como:
+    - Múltiples params: ?usuario_id=1&usuario_id=2
+    - Valores con coma: ?usuario_id=1,2,3
+    - Mezcla de ambos
+    Retorna un set de enteros o None si está vacío.
+    """
+    ids = set()
+    for item in raw_list:
+        for part in str(item).split(','):
+            part = part.strip()
+            if part.isdigit():
+                ids.add(int(part))
+    return ids if ids else None
+
+
+def _query_equipos():
+    """Query de vista_equipos_completa con los filtros de la petición."""
     tipo_activo = request.args.get('tipo_activo_id')
     estado = request.args.get('estado_id')
     responsables_raw = request.args.getlist('usuario_id')
     sort_by = request.args.get('sort_by')
     sort_dir = request.args.get('sort_dir')
     search = request.args.get('search', '')
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 20, type=int)
 
     responsables_ids = _parse_ids_list(responsables_raw)
 
@@ -75,40 +309,11 @@ def get_vista_equipos_completa():
         )
 
     query = query.order_by(VistaEquiposCompleta.id_activo.asc())
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
-
-    return jsonify({
-        'equipos': [equipo.to_dict() for equipo in pagination.items],
-        'total': pagination.total,
-        'pages': pagination.pages,
-        'current_page': page
-    }), 200
+    return query
 
 
-@vistas_bp.route('/equipo-completo/<int:id>', methods=['GET'])
-@jwt_required()
-@require_permission('computo', 'puede_leer')
-def get_equipo_completo(id):
-    """Obtener un equipo por ID con especificaciones"""
-    equipo = VistaEquiposCompleta.query.get(id)
-
-    if not equipo:
-        return jsonify({
-            'error': 'Equipo no encontrado'
-        }), 404
-
-    return jsonify(equipo.to_dict()), 200
-
-
-# ============================================
-# VISTA COMPLETA DE MOBILIARIO
-# ============================================
-
-@vistas_bp.route('/mobiliarios-completo/', methods=['GET'])
-@jwt_required()
-@require_permission('mobiliario', 'puede_leer')
-def get_vista_mobiliario_completa():
-    """Obtener vista completa de mobiliario con toda la información relacionada"""
+def _query_mobiliario():
+    """Query de vista_mobiliario_completa con los filtros de la petición."""
     tipo_mobiliario = request.args.get('tipo_mobiliario_id')
     estado = request.args.get('estado_id')
     area = request.args.get('area')
@@ -116,8 +321,6 @@ def get_vista_mobiliario_completa():
     sort_by = request.args.get('sort_by')
     sort_dir = request.args.get('sort_dir', 'asc')
     search = request.args.get('search', '')
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 20, type=int)
 
     responsables_ids = _parse_ids_list(responsables_raw)
 
@@ -166,45 +369,15 @@ def get_vista_mobiliario_completa():
         )
 
     query = query.order_by(VistaMobiliarioCompleta.id_mueble.asc())
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    return query
 
-    return jsonify({
-        'mobiliario': [m.to_dict() for m in pagination.items],
-        'total': pagination.total,
-        'pages': pagination.pages,
-        'current_page': page
-    }), 200
-
-
-@vistas_bp.route('/mobiliario-completo/<int:id>', methods=['GET'])
-@jwt_required()
-@require_permission('mobiliario', 'puede_leer')
-def get_mobiliario_completo(id):
-    """Obtener un mobiliario mediante su ID"""
-    mobiliario = VistaMobiliarioCompleta.query.get(id)
-
-    if not mobiliario:
-        return jsonify({
-            'error': 'Mobiliario no encontrado'
-        }), 404
 
-    return jsonify(mobiliario.to_dict()), 200
-
-# ============================================
-# VISTA DE USUARIOS CON CONTEO DE BIENES
-# ============================================
-
-@vistas_bp.route('/responsables-completo/', methods=['GET'])
-@jwt_required()
-@require_permission('responsable', 'puede_leer')
-def get_vista_responsables_completa():
-    """Obtener vista de usuarios responsables con conteo de bienes asignados"""
+def _query_responsables():
+    """Query de vista_usuarios_completa con los filtros de la petición."""
     search = request.args.get('search', '').strip()
     sort_by = request.args.get('sort_by')
     sort_dir = request.args.get('sort_dir', 'asc')
     area = request.args.get('area_id')
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 20, type=int)
 
     query = VistaUsuariosCompleta.query
 
@@ -230,46 +403,16 @@ def get_vista_responsables_completa():
                 query = query.order_by(column.asc())
 
     query = query.order_by(VistaUsuariosCompleta.id_usuario.asc())
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
-
-    return jsonify({
-        'responsables': [u.to_dict() for u in pagination.items],
-        'total': pagination.total,
-        'pages': pagination.pages,
-        'current_page': page
-    }), 200
-
-@vistas_bp.route('/responsable-completo/<int:id>', methods=['GET'])
-@jwt_required()
-@require_permission('responsable', 'puede_leer')
-def get_usuario_complet(id):
-    """Obtener un usuario mediante su ID"""
-    usuario = VistaUsuariosCompleta.query.get(id)
-
-    if not usuario:
-        return jsonify({
-            'error': 'Usuario no encontrado'
-        }), 404
+    return query
 
-    return jsonify(usuario.to_dict()), 200
 
-
-# ============================================
-# VISTA DE ACCESOS CON RESUMEN DE PERMISOS
-# ============================================
-
-@vistas_bp.route('/accesos-completo/', methods=['GET'])
-@jwt_required()
-@require_permission('acceso', 'puede_leer')
-def get_vista_accesos_completa():
-    """Obtener vista de accesos al sistema con resumen de permisos"""
+def _query_accesos():
+    """Query de vista_accesos_completa con los filtros de la petición."""
     search = request.args.get('search', '')
     area = request.args.get('area_id')
     sort_by = request.args.get('sort_by')
     sort_dir = request.args.get('sort_dir', 'asc')
     permisos_param = request.args.get('permisos')
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 20, type=int)
 
     query = VistaAccesosCompleta.query
 
@@ -334,46 +477,32 @@ def get_vista_accesos_completa():
         )
 
     query = query.order_by(VistaAccesosCompleta.id_acceso.asc())
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    return query
+
 
-    return jsonify({
-        'accesos': [a.to_dict() for a in pagination.items],
+def _respuesta_pagina(clave: str, plan, pagination) -> dict:
+    return {
+        clave: plan.serializar_todas(pagination.items),
         'total': pagination.total,
         'pages': pagination.pages,
-        'current_page': page
-    }), 200
+        'total_estimado': pagination.total_estimado,
+        'current_page': pagination.page
+    }
 
-@vistas_bp.route('/acceso-completo/<int:id>', methods=['GET'])
-@jwt_required()
-@require_permission('acceso', 'puede_leer')
-def get_acceso_completo(id):
-    """Obtener un acceso mediante su ID"""
-    acceso = VistaAccesosCompleta.query.get(id)
-
-    if not acceso:
-        return jsonify({
-            'mensaje': 'Acceso no encontrado'
-        }), 404
 
-    return jsonify(acceso.to_dict()), 200
+async def _listar_async(modelo, construir_query, clave: str):
+    """Mismo listado que la vista síncrona, leído con asyncpg."""
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 20, type=int)
 
+    plan = plan_de(modelo)
+    pagination = await paginar_async(plan.consulta(construir_query()).statement, page, per_page)
+    return _respuesta_pagina(clave, plan, pagination), 200
 
-# ============================================
-# HELPER
-# ============================================
 
-def _parse_ids_list(raw_list):
-    """
-    Normaliza una lista de IDs que puede venir como:
-    - Múltiples params: ?usuario_id=1&usuario_id=2
-    - Valores con coma: ?usuario_id=1,2,3
-    - Mezcla de ambos
-    Retorna un set de enteros o None si está vacío.
-    """
-    ids = set()
-    for item in raw_list:
-        for part in str(item).split(','):
-            part = part.strip()
-            if part.isdigit():
-                ids.add(int(part))
-    return ids if ids else None
\ No newline at end of file
+async def _obtener_async(modelo, registro_id: int, no_encontrado: dict):
+    plan = plan_de(modelo)
+    fila = await primera(plan.sentencia_obtener(registro_id))
+    if not fila:
+        return jsonify(no_encontrado), 404
+    return jsonify(plan.serializar(fila)), 200
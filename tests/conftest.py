@@ -0,0 +1 @@
+pytest_plugins = ['utils.deteccion_n1']
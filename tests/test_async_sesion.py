@@ -0,0 +1,84 @@
+"""
+Vistas async (/api/async/...): la conexión psycopg2 del pool síncrono
+debe estar devuelta mientras la vista espera a asyncpg.
+
+Necesita PostgreSQL (la BD de benchmarks.generador) y asyncpg; sin
+BENCH_DATABASE_URL se omite.
+"""
+
+import os
+import pytest
+
+BENCH_DATABASE_URL = os.getenv('BENCH_DATABASE_URL')
+
+pytestmark = pytest.mark.skipif(
+    not BENCH_DATABASE_URL, reason='BENCH_DATABASE_URL no definida (BD del generador)'
+)
+
+
+@pytest.fixture(scope='module')
+def app_async():
+    pytest.importorskip('asyncpg')
+    # Config lee el entorno al importarse
+    os.environ['DATABASE_URL'] = BENCH_DATABASE_URL
+    os.environ.setdefault('JWT_SECRET_KEY', 'pruebas-' + 'x' * 32)
+    os.environ.setdefault('SECRET_KEY', 'pruebas')
+    from config import Config
+    from app import create_app
+
+    class ConfigAsync(Config):
+        SQLALCHEMY_DATABASE_URI = BENCH_DATABASE_URL
+        ASYNC_LECTURAS = True
+        METRICAS_HABILITADAS = False
+        PERFILADOR_HABILITADO = False
+
+    app = create_app(ConfigAsync)
+    yield app
+    app.extensions['async_db'].cerrar()
+
+
+@pytest.fixture(scope='module')
+def encabezados(app_async):
+    from flask_jwt_extended import create_access_token
+    from sqlalchemy import select
+    from models import Permiso
+    from utils.extesions import db
+
+    with app_async.app_context():
+        acceso_id = db.session.scalar(
+            select(Permiso.acceso_id).where(Permiso.modulo == 'computo', Permiso.puede_leer.is_(True)).limit(1)
+        )
+        if acceso_id is None:
+            pytest.skip('La BD no tiene accesos con lectura en computo: ejecuta benchmarks.generador')
+        return {'Authorization': f'Bearer {create_access_token(identity=str(acceso_id))}'}
+
+
+@pytest.fixture
+def conexiones_en_espera(app_async, monkeypatch):
+    """Conexiones psycopg2 en uso cada vez que una vista espera a asyncpg."""
+    from utils.extesions import db
+
+    bd_async = app_async.extensions['async_db']
+    ejecutar = bd_async.ejecutar
+    medidas = []
+
+    async def ejecutar_midiendo(fn):
+        medidas.append(db.engine.pool.checkedout())
+        return await ejecutar(fn)
+
+    monkeypatch.setattr(bd_async, 'ejecutar', ejecutar_midiendo)
+    return medidas
+
+
+@pytest.mark.parametrize('ruta', [
+    # Solo @jwt_required: la sesión la libera el before_request del blueprint
+    '/api/async/catalogos/areas-completo',
+    '/api/async/catalogos/estados-completo',
+    # Con require_permission
+    '/api/async/vistas/equipos-completo/',
+])
+def test_vista_async_sin_conexion_sincrona(app_async, encabezados, conexiones_en_espera, ruta):
+    respuesta = app_async.test_client().get(ruta, headers=encabezados)
+
+    assert respuesta.status_code == 200
+    assert conexiones_en_espera and set(conexiones_en_espera) == {0}
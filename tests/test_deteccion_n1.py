@@ -0,0 +1,110 @@
+"""
+utils/deteccion_n1.py: firmas de normalizar() y PresupuestoConsultas
+contra un engine SQLite en memoria (sin la app ni PostgreSQL).
+"""
+
+import pytest
+from sqlalchemy import column, create_engine, select, table, text
+from utils.deteccion_n1 import PresupuestoConsultas, normalizar
+
+
+@pytest.fixture
+def conexion():
+    engine = create_engine('sqlite://')
+    with engine.connect() as conn:
+        conn.execute(text('CREATE TABLE equipos (id INTEGER PRIMARY KEY, nombre TEXT)'))
+        conn.execute(text("INSERT INTO equipos VALUES (1, 'Dell'), (2, 'HP'), (3, 'Lenovo')"))
+        yield conn
+    engine.dispose()
+
+
+# ── normalizar ───────────────────────────────────────────────────────────────
+
+@pytest.mark.parametrize('sql', [
+    'SELECT * FROM equipos WHERE id IN (?)',
+    'SELECT * FROM equipos WHERE id IN (?, ?, ?)',
+    'SELECT * FROM equipos WHERE id IN (%(id_1_1)s, %(id_1_2)s)',
+    'SELECT * FROM equipos WHERE id IN ($1, $2, $3, $4)',
+    'SELECT * FROM equipos WHERE id IN (1, 2)',
+    "SELECT * FROM equipos WHERE id IN ('a', 'b', 'c')",
+])
+def test_normalizar_listas_in(sql):
+    assert normalizar(sql) == 'SELECT * FROM equipos WHERE id IN (...)'
+
+
+@pytest.mark.parametrize('sql', [
+    'SELECT * FROM equipos WHERE id = ?',
+    'SELECT * FROM equipos WHERE id = %s',
+    'SELECT * FROM equipos WHERE id = %(id_1)s',
+    'SELECT * FROM equipos WHERE id = $1',
+])
+def test_normalizar_parametros(sql):
+    assert normalizar(sql) == 'SELECT * FROM equipos WHERE id = ?'
+
+
+def test_normalizar_literales():
+    assert normalizar(
+        "SELECT * FROM equipos WHERE nombre = 'O''Brien' AND id > 42 LIMIT 20"
+    ) == 'SELECT * FROM equipos WHERE nombre = ? AND id > ? LIMIT ?'
+
+
+def test_normalizar_conserva_identificadores_y_une_espacios():
+    assert normalizar(
+        'SELECT id_historial\n  FROM   historial_p2026_01\n WHERE id_historial = %(id_1)s'
+    ) == 'SELECT id_historial FROM historial_p2026_01 WHERE id_historial = ?'
+
+
+# ── PresupuestoConsultas ─────────────────────────────────────────────────────
+
+def test_presupuesto_dentro_del_limite(conexion):
+    with PresupuestoConsultas(maximo=2) as presupuesto:
+        conexion.execute(text('SELECT nombre FROM equipos WHERE id = :id'), {'id': 1})
+        conexion.execute(text('SELECT count(*) FROM equipos'))
+    assert presupuesto.total == 2
+
+
+def test_presupuesto_excedido(conexion):
+    with pytest.raises(AssertionError, match='como máximo 2 sentencias'):
+        with PresupuestoConsultas(maximo=2):
+            conexion.execute(text('SELECT nombre FROM equipos WHERE id = :id'), {'id': 1})
+            conexion.execute(text('SELECT count(*) FROM equipos'))
+            conexion.execute(text('SELECT max(id) FROM equipos'))
+
+
+def test_presupuesto_select_repetido(conexion):
+    # Sin `maximo`: falla solo por repetir la misma firma (umbral 3)
+    with pytest.raises(AssertionError, match='N\\+1') as error:
+        with PresupuestoConsultas():
+            for equipo_id in (1, 2, 3):
+                conexion.execute(text('SELECT nombre FROM equipos WHERE id = :id'), {'id': equipo_id})
+    assert '3× SELECT … FROM equipos WHERE id = ?' in str(error.value)
+
+
+def test_presupuesto_listas_in_de_distinto_largo(conexion):
+    # La misma consulta con IN de 1, 2 y 3 valores expandidos por SQLAlchemy
+    equipos = table('equipos', column('id'), column('nombre'))
+    with pytest.raises(AssertionError, match='N\\+1') as error:
+        with PresupuestoConsultas():
+            for ids in ([1], [1, 2], [1, 2, 3]):
+                conexion.execute(select(equipos.c.nombre).where(equipos.c.id.in_(ids)))
+    assert 'WHERE equipos.id IN (...)' in str(error.value)
+
+
+def test_presupuesto_umbral(conexion):
+    with PresupuestoConsultas(umbral=4):
+        for equipo_id in (1, 2, 3):
+            conexion.execute(text('SELECT nombre FROM equipos WHERE id = :id'), {'id': equipo_id})
+
+
+def test_presupuesto_ignora_escrituras_repetidas(conexion):
+    with PresupuestoConsultas():
+        for equipo_id in (4, 5, 6):
+            conexion.execute(text('INSERT INTO equipos VALUES (:id, :nombre)'),
+                             {'id': equipo_id, 'nombre': 'Acer'})
+
+
+def test_fixture_presupuesto_consultas(conexion, presupuesto_consultas):
+    with pytest.raises(AssertionError, match='N\\+1'):
+        with presupuesto_consultas(10):
+            for equipo_id in (1, 2, 3):
+                conexion.execute(text('SELECT nombre FROM equipos WHERE id = :id'), {'id': equipo_id})
@@ -0,0 +1,125 @@
+"""
+Importación masiva (utils/importacion.py): los IDs de catálogo que vienen
+directamente en la fila se verifican como los nombres, y el error queda
+en el reporte por fila en lugar de un IntegrityError de todo el lote.
+
+Necesita la BD de benchmarks.generador; sin BENCH_DATABASE_URL se omite.
+Ninguna prueba confirma la transacción.
+"""
+
+import json
+import os
+import pytest
+from benchmarks import planes
+
+BENCH_DATABASE_URL = os.getenv('BENCH_DATABASE_URL')
+
+pytestmark = pytest.mark.skipif(
+    not BENCH_DATABASE_URL, reason='BENCH_DATABASE_URL no definida (BD del generador)'
+)
+
+ID_INEXISTENTE = 999999
+
+
+@pytest.fixture(scope='module')
+def app_bd():
+    return planes.crear_app(BENCH_DATABASE_URL)
+
+
+@pytest.fixture(scope='module')
+def catalogos(app_bd):
+    """IDs existentes de estado y tipos, y un acceso con permiso de crear."""
+    from flask_jwt_extended import create_access_token
+    from sqlalchemy import select
+    from models import CatEstado, CatTipoActivo, CatTipoMobiliario, Permiso
+    from utils.extesions import db
+
+    with app_bd.app_context():
+        acceso_id = db.session.scalar(
+            select(Permiso.acceso_id)
+            .where(Permiso.modulo == 'computo', Permiso.puede_crear.is_(True))
+            .limit(1)
+        )
+        if acceso_id is None:
+            pytest.skip('La BD no tiene accesos con permiso de crear: ejecuta benchmarks.generador')
+        return {
+            'estado_id': db.session.scalar(select(CatEstado.id_estado).limit(1)),
+            'tipo_activo_id': db.session.scalar(select(CatTipoActivo.id_tipo_activo).limit(1)),
+            'tipo_mobiliario_id': db.session.scalar(select(CatTipoMobiliario.id_tipo_mobiliario).limit(1)),
+            'encabezados': {
+                'Authorization': f'Bearer {create_access_token(identity=str(acceso_id))}',
+                'Content-Type': 'application/x-ndjson',
+            },
+        }
+
+
+def _ndjson(filas: list[dict]) -> str:
+    return '\n'.join(json.dumps(fila) for fila in filas)
+
+
+def test_equipos_id_de_catalogo_inexistente(app_bd, catalogos):
+    filas = [
+        {'nombre_activo': 'Prueba importación 1', 'tipo_activo_id': catalogos['tipo_activo_id'],
+         'estado_id': catalogos['estado_id']},
+        {'nombre_activo': 'Prueba importación 2', 'tipo_activo_id': catalogos['tipo_activo_id'],
+         'estado_id': ID_INEXISTENTE},
+        {'nombre_activo': 'Prueba importación 3', 'tipo_activo_id': ID_INEXISTENTE,
+         'estado_id': catalogos['estado_id'], 'estado': 'se ignora: manda el ID'},
+    ]
+    respuesta = app_bd.test_client().post(
+        '/api/equipos/import', data=_ndjson(filas), headers=catalogos['encabezados'],
+    )
+
+    assert respuesta.status_code == 422
+    reporte = respuesta.get_json()
+    assert reporte['validas'] == 1
+    assert [(e['fila'], set(e['campos'])) for e in reporte['errores']] == [
+        (2, {'estado_id'}),
+        (3, {'tipo_activo_id'}),
+    ]
+
+
+def _filas_mobiliario(catalogos, *inexistentes: str) -> list[dict]:
+    filas = [
+        {'tipo_mobiliario_id': catalogos['tipo_mobiliario_id'], 'estado_id': catalogos['estado_id'],
+         'marca': f'Prueba importación {i}'}
+        for i in range(1, 4)
+    ]
+    for fila, campo in zip(filas[1:], inexistentes):
+        fila[campo] = ID_INEXISTENTE
+    return filas
+
+
+def test_mobiliario_dry_run_igual_a_importacion_con_errores(app_bd, catalogos):
+    filas = _ndjson(_filas_mobiliario(catalogos, 'tipo_mobiliario_id', 'estado_id'))
+    cliente = app_bd.test_client()
+
+    prueba = cliente.post('/api/mobiliario/import?dry_run=true', data=filas, headers=catalogos['encabezados'])
+    real = cliente.post('/api/mobiliario/import', data=filas, headers=catalogos['encabezados'])
+
+    assert prueba.status_code == real.status_code == 422
+    reporte_prueba, reporte_real = prueba.get_json(), real.get_json()
+    for clave in ('total_filas', 'validas', 'creados', 'errores'):
+        assert reporte_prueba[clave] == reporte_real[clave]
+    assert [(e['fila'], set(e['campos'])) for e in reporte_real['errores']] == [
+        (2, {'tipo_mobiliario_id'}),
+        (3, {'estado_id'}),
+    ]
+
+
+def test_mobiliario_dry_run_igual_a_importacion_valida(app_bd, catalogos):
+    from routes.mobiliario_routes import _IMPORTACION_MOBILIARIO
+    from utils.extesions import db
+    from utils.importacion import importar
+
+    filas = _filas_mobiliario(catalogos)
+    with app_bd.app_context():
+        try:
+            # importar() modifica las filas (nombres → IDs): una copia por corrida
+            prueba = importar(_IMPORTACION_MOBILIARIO, [dict(f) for f in filas], dry_run=True)
+            real = importar(_IMPORTACION_MOBILIARIO, [dict(f) for f in filas])
+        finally:
+            db.session.rollback()
+
+    assert prueba['errores'] == real['errores'] == []
+    assert prueba['validas'] == real['validas'] == real['creados'] == len(filas)
@@ -0,0 +1,39 @@
+"""
+Regresiones de plan de benchmarks/planes.py como pruebas de pytest.
+
+Necesitan una BD PostgreSQL sembrada con benchmarks.generador y con las
+migraciones aplicadas; sin BENCH_DATABASE_URL se omiten:
+
+    BENCH_DATABASE_URL=postgresql://... python -m pytest tests/test_planes.py
+"""
+
+import os
+import pytest
+from benchmarks import planes
+
+BENCH_DATABASE_URL = os.getenv('BENCH_DATABASE_URL')
+
+pytestmark = pytest.mark.skipif(
+    not BENCH_DATABASE_URL, reason='BENCH_DATABASE_URL no definida (BD del generador)'
+)
+
+
+@pytest.fixture(scope='module')
+def app_planes():
+    return planes.crear_app(BENCH_DATABASE_URL)
+
+
+@pytest.fixture(scope='module')
+def casos_planes(app_planes):
+    with app_planes.app_context():
+        return planes.casos(planes._datos_casos())
+
+
+def test_nombres_casos(casos_planes):
+    assert tuple(casos_planes) == planes.NOMBRES_CASOS
+
+
+@pytest.mark.parametrize('nombre', planes.NOMBRES_CASOS)
+def test_plan(app_planes, casos_planes, nombre):
+    plan, fallas = planes.evaluar(app_planes, casos_planes[nombre])
+    assert not fallas, '\n'.join(fallas + planes._arbol(plan))
@@ -0,0 +1,187 @@
+"""
+Actualización masiva de activos (estado, sucursal y responsables)
+Sistema de Inventario IUCA
+
+Aplica el mismo parche a una lista de registros o a los que cumplan un
+filtro, con un número fijo de sentencias sin importar cuántos sean:
+
+    1. Registros bloqueados por otro usuario (una consulta a bloqueos_activos).
+    2. UPDATE ... FROM (VALUES (id, version), ...) para los registros que
+       traen versión: solo se actualizan los que siguen en esa versión.
+    3. UPDATE ... WHERE id IN (...) para los que no traen versión.
+    4. Una consulta para distinguir conflictos de versión de IDs inexistentes.
+    5. sync_responsables_masivo() si el parche incluye responsables_ids.
+
+El cuerpo se valida antes con validate_actualizacion_masiva(). El
+incremento de `version` lo siguen haciendo los triggers de la BD.
+"""
+
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import Integer, column, select, update, values
+from models import BloqueoActivo, CatEstado
+from utils.extesions import db
+from utils.responsables import sync_responsables_masivo, usuarios_existentes
+from utils.validators import ValidationError
+
+ACTUALIZADO = 'actualizado'
+BLOQUEADO = 'bloqueado'
+CONFLICTO_VERSION = 'conflicto_version'
+NO_ENCONTRADO = 'no_encontrado'
+
+
+# ── Preparación ──────────────────────────────────────────────────────────────
+
+def _preparar_cambios(cambios: dict) -> tuple[dict, list | None]:
+    """
+    Verifica contra la BD el estado y los responsables del parche.
+
+    Returns:
+        tuple: (columnas a actualizar, responsables_ids o None).
+    """
+    columnas = {}
+    if 'estado_id' in cambios:
+        estado_id = int(cambios['estado_id'])
+        if db.session.get(CatEstado, estado_id) is None:
+            raise ValidationError('El estado no existe', {'estado_id': 'Estado inválido'})
+        columnas['estado_id'] = estado_id
+
+    if 'sucursal_nombre' in cambios:
+        columnas['sucursal_nombre'] = str(cambios['sucursal_nombre']).strip()
+
+    responsables = None
+    if 'responsables_ids' in cambios:
+        responsables = {int(i) for i in cambios['responsables_ids'] or []}
+        faltantes = responsables - usuarios_existentes(responsables)
+        if faltantes:
+            raise ValidationError(
+                'Hay responsables que no existen',
+                {'responsables_ids': 'IDs inexistentes: ' + ', '.join(map(str, sorted(faltantes)))}
+            )
+
+    if columnas:
+        columnas['fecha_modificacion'] = datetime.now()
+    return columnas, responsables
+
+
+def _resolver_registros(modelo, data: dict) -> dict[int, int | None]:
+    """{ id: versión esperada o None } a partir de `registros` o de `filtro`."""
+    maximo = current_app.config['ACTUALIZACION_MASIVA_MAX']
+
+    if data.get('registros') is not None:
+        objetivo = {}
+        for registro in data['registros']:
+            if isinstance(registro, dict):
+                version = registro.get('version')
+                objetivo[int(registro['id'])] = None if version is None else int(version)
+            else:
+                objetivo[int(registro)] = None
+    else:
+        clave = modelo.__mapper__.primary_key[0]
+        ids = db.session.scalars(
+            select(clave).filter_by(**data['filtro']).order_by(clave).limit(maximo + 1)
+        ).all()
+        objetivo = dict.fromkeys(ids)
+
+    if len(objetivo) > maximo:
+        raise ValidationError(
+            f'Se pueden actualizar como máximo {maximo} registros por petición',
+            {'registros': f'{len(objetivo)} o más registros'}
+        )
+    return objetivo
+
+
+# ── Actualización ────────────────────────────────────────────────────────────
+
+def _ids_bloqueados(tabla: str, ids, usuario_id: int) -> set[int]:
+    """Registros con bloqueo vigente de otro usuario."""
+    return set(db.session.scalars(
+        select(BloqueoActivo.registro_id).where(
+            BloqueoActivo.tabla == tabla,
+            BloqueoActivo.registro_id.in_(ids),
+            BloqueoActivo.expira_en > datetime.now(),
+            BloqueoActivo.usuario_id != usuario_id,
+        )
+    ))
+
+
+def _aplicar(modelo, clave, columnas: dict, condiciones) -> set[int]:
+    """
+    UPDATE con RETURNING de los IDs afectados. Si no hay columnas que
+    cambiar (solo responsables) bloquea las filas con SELECT ... FOR UPDATE.
+    """
+    if columnas:
+        sentencia = update(modelo).where(*condiciones).values(**columnas).returning(clave)
+        return set(db.session.scalars(
+            sentencia, execution_options={'synchronize_session': False}
+        ))
+    return set(db.session.scalars(
+        select(clave).where(*condiciones).with_for_update(of=modelo)
+    ))
+
+
+def actualizar_en_lote(modelo, data: dict, usuario_id: int, responsables: tuple) -> list[dict]:
+    """
+    Aplica data['cambios'] a los registros de data['registros'] (IDs o
+    {id, version}) o a los que cumplan data['filtro'].
+
+    Args:
+        modelo:       EquipoComputo o Mobiliario.
+        data:         Cuerpo ya validado con validate_actualizacion_masiva().
+        usuario_id:   Usuario de la petición (sus propios bloqueos no cuentan).
+        responsables: (modelo_asignacion, campo_entidad).
+
+    Returns:
+        list: [{ id, resultado, version_actual? }] en orden de ID, con
+              resultado ∈ actualizado, bloqueado, conflicto_version, no_encontrado.
+
+    Raises:
+        ValidationError: estado o responsables inexistentes, o demasiados
+                         registros. No llama a commit().
+    """
+    columnas, responsables_ids = _preparar_cambios(data['cambios'])
+    objetivo = _resolver_registros(modelo, data)
+    if not objetivo:
+        return []
+
+    clave = modelo.__mapper__.primary_key[0]
+    bloqueados = _ids_bloqueados(modelo.__tablename__, objetivo, usuario_id)
+    con_version = [(i, v) for i, v in objetivo.items() if i not in bloqueados and v is not None]
+    sin_version = [i for i, v in objetivo.items() if i not in bloqueados and v is None]
+
+    actualizados = set()
+    if con_version:
+        esperadas = values(
+            column('id', Integer), column('version', Integer), name='esperadas'
+        ).data(con_version)
+        actualizados |= _aplicar(modelo, clave, columnas, (
+            clave == esperadas.c.id,
+            modelo.version == esperadas.c.version,
+        ))
+    if sin_version:
+        actualizados |= _aplicar(modelo, clave, columnas, (clave.in_(sin_version),))
+
+    pendientes = set(objetivo) - bloqueados - actualizados
+    versiones = dict(db.session.execute(
+        select(clave, modelo.version).where(clave.in_(pendientes))
+    ).all()) if pendientes else {}
+
+    if responsables_ids is not None and actualizados:
+        modelo_asignacion, campo_entidad = responsables
+        sync_responsables_masivo(modelo_asignacion, actualizados, responsables_ids, campo_entidad)
+
+    resultados = []
+    for id_registro in sorted(objetivo):
+        if id_registro in actualizados:
+            resultados.append({'id': id_registro, 'resultado': ACTUALIZADO})
+        elif id_registro in bloqueados:
+            resultados.append({'id': id_registro, 'resultado': BLOQUEADO})
+        elif id_registro in versiones:
+            resultados.append({
+                'id': id_registro,
+                'resultado': CONFLICTO_VERSION,
+                'version_actual': versiones[id_registro],
+            })
+        else:
+            resultados.append({'id': id_registro, 'resultado': NO_ENCONTRADO})
+    return resultados
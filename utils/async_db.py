@@ -0,0 +1,170 @@
+"""
+Lecturas asíncronas con SQLAlchemy asyncio + asyncpg (opcional)
+Sistema de Inventario IUCA
+
+Con ASYNC_LECTURAS=True la app registra, además de los blueprints
+síncronos, versiones async de los GET más pesados bajo /api/async/...
+(vistas, historial y catálogos). Esas vistas esperan a la BD con asyncpg
+en lugar de ocupar una conexión psycopg2 del pool síncrono.
+
+Flask ejecuta cada vista async en su propio event loop (asgiref), y una
+conexión asyncpg solo puede usarse desde el loop que la creó. Por eso el
+AsyncEngine vive en un loop dedicado en un hilo aparte: las vistas le
+envían corutinas con run_coroutine_threadsafe() y esperan el resultado,
+de modo que el pool de conexiones se comparte entre peticiones.
+
+Requiere las dependencias de requirements-async.txt. Sin ellas el modo
+async no se puede activar, pero el resto de la API funciona igual.
+"""
+
+import asyncio
+import threading
+from flask import current_app, request
+from sqlalchemy import func, select
+from utils.extesions import db
+from utils.paginacion import Pagina
+
+try:
+    import asyncpg  # noqa: F401  (driver de postgresql+asyncpg)
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    ASYNC_DISPONIBLE = True
+except ImportError:
+    ASYNC_DISPONIBLE = False
+
+
+class BaseDatosAsync:
+    """AsyncEngine + sesiones atados a un event loop en un hilo dedicado."""
+
+    def __init__(self, url: str, **opciones):
+        self.loop = asyncio.new_event_loop()
+        self.hilo = threading.Thread(
+            target=self.loop.run_forever, name='async-db', daemon=True
+        )
+        self.hilo.start()
+        self.engine = create_async_engine(url, **opciones)
+        self.sesiones = async_sessionmaker(self.engine, expire_on_commit=False)
+
+    async def ejecutar(self, fn):
+        """
+        Ejecuta `fn(sesion)` (corutina) en el loop de la BD y espera su
+        resultado desde el loop de la petición.
+        """
+        async def _con_sesion():
+            async with self.sesiones() as sesion:
+                return await fn(sesion)
+
+        futuro = asyncio.run_coroutine_threadsafe(_con_sesion(), self.loop)
+        return await asyncio.wrap_future(futuro)
+
+    def cerrar(self) -> None:
+        asyncio.run_coroutine_threadsafe(self.engine.dispose(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+def url_async(url: str) -> str:
+    """postgresql://... → postgresql+asyncpg://..."""
+    esquema, _, resto = url.partition('://')
+    return f"postgresql+asyncpg://{resto}" if esquema.startswith('postgres') else url
+
+
+def init_async_db(app) -> bool:
+    """
+    Crea la BaseDatosAsync si ASYNC_LECTURAS está activo.
+
+    Returns:
+        bool: True si el modo async quedó activo.
+
+    Raises:
+        RuntimeError: ASYNC_LECTURAS activo sin asyncpg instalado.
+    """
+    if not app.config['ASYNC_LECTURAS']:
+        return False
+    if not ASYNC_DISPONIBLE:
+        raise RuntimeError(
+            'ASYNC_LECTURAS requiere asyncpg: pip install -r requirements-async.txt'
+        )
+
+    app.extensions['async_db'] = BaseDatosAsync(
+        app.config['ASYNC_DATABASE_URL'] or url_async(app.config['SQLALCHEMY_DATABASE_URI']),
+        pool_size=app.config['ASYNC_POOL_SIZE'],
+        pool_recycle=3600,
+        pool_pre_ping=True,
+    )
+    return True
+
+
+def liberar_sesion_sincrona() -> None:
+    """
+    before_request de los blueprints async. Corre después de los hooks de
+    la app (set_current_user_for_triggers ya abrió la transacción con
+    SET LOCAL) y devuelve al pool la conexión psycopg2, que si no quedaría
+    retenida, idle in transaction, mientras la vista espera a asyncpg.
+    """
+    db.session.remove()
+
+
+# ── Consultas ────────────────────────────────────────────────────────────────
+
+def _bd() -> BaseDatosAsync:
+    return current_app.extensions['async_db']
+
+
+async def filas(sentencia) -> list:
+    """Todas las filas (tuplas) de una sentencia Core."""
+    async def _consulta(sesion):
+        return (await sesion.execute(sentencia)).all()
+    return await _bd().ejecutar(_consulta)
+
+
+async def primera(sentencia):
+    """Primera fila o None."""
+    async def _consulta(sesion):
+        return (await sesion.execute(sentencia)).first()
+    return await _bd().ejecutar(_consulta)
+
+
+async def escalar(sentencia):
+    async def _consulta(sesion):
+        return await sesion.scalar(sentencia)
+    return await _bd().ejecutar(_consulta)
+
+
+async def serializar_entidades(sentencia, serializar) -> list:
+    """
+    Instancias ORM de la sentencia convertidas con `serializar` dentro del
+    loop de la BD (las relaciones deben venir cargadas, p. ej. lazy='joined').
+    """
+    async def _consulta(sesion):
+        resultado = await sesion.scalars(sentencia)
+        return [serializar(i) for i in resultado.unique()]
+    return await _bd().ejecutar(_consulta)
+
+
+async def paginar_async(sentencia, page: int, per_page: int) -> Pagina:
+    """
+    Versión async de paginar(): la página (con una fila extra) y el total
+    se piden en paralelo por dos conexiones. El total es siempre exacto,
+    salvo con ?count=none.
+    """
+    if page is None or page < 1:
+        page = 1
+    if per_page is None or per_page < 1:
+        per_page = 20
+
+    pagina = filas(sentencia.limit(per_page + 1).offset((page - 1) * per_page))
+    if request.args.get('count') == 'none':
+        resultado, total = await pagina, None
+    else:
+        conteo = escalar(
+            select(func.count()).select_from(sentencia.order_by(None).subquery())
+        )
+        resultado, total = await asyncio.gather(pagina, conteo)
+
+    return Pagina(
+        items=resultado[:per_page],
+        page=page,
+        per_page=per_page,
+        total=total,
+        total_estimado=False,
+        has_next=len(resultado) > per_page,
+    )
@@ -0,0 +1,148 @@
+"""
+Caché en memoria invalidada por escrituras en tablas
+Sistema de Inventario IUCA
+
+Cada tabla tiene un número de generación que se incrementa cuando una
+transacción que la modificó hace commit. Una entrada de caché guarda la
+generación de las tablas de las que depende; si alguna cambió, o si venció
+el TTL, la entrada se descarta.
+
+Límites de la invalidación:
+  - Solo se detectan las escrituras hechas con la Session del ORM (flush de
+    objetos, o insert()/update()/delete() pasados a session.execute()). Un
+    text() o exec_driver_sql() que modifique datos, los triggers fuera de
+    las tablas auditadas, psql o las migraciones no la invalidan: quien
+    escriba así debe llamar a invalidar(...) después del commit, como hacen
+    los comandos de utils/particiones.py.
+  - Es por proceso: invalidar() solo afecta al proceso que la llama. Con
+    varios workers de gunicorn, o si la escritura la hace un comando de
+    Flask CLI, los demás procesos siguen sirviendo la entrada vieja hasta
+    que vence el TTL. Por eso el TTL debe ser corto.
+"""
+
+import threading
+import time
+from collections import defaultdict
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from utils.constants import TABLAS_VISIBLES, VISTAS_DEPENDENCIAS
+
+_generaciones: dict[str, int] = defaultdict(int)
+_lock = threading.Lock()
+
+_FALTA = object()
+_CLAVE_SESION = 'tablas_modificadas'
+
+
+# ── Generaciones por tabla ───────────────────────────────────────────────────
+
+def expandir_tablas(tablas) -> frozenset:
+    """Sustituye cada vista por las tablas base de las que lee."""
+    resultado = set()
+    for tabla in tablas:
+        resultado.update(VISTAS_DEPENDENCIAS.get(tabla, (tabla,)))
+    return frozenset(resultado)
+
+
+def invalidar(*tablas) -> None:
+    """
+    Marca como modificadas las tablas indicadas. Las escrituras en tablas
+    auditadas también invalidan 'historial', que llenan los triggers.
+    """
+    with _lock:
+        for tabla in tablas:
+            _generaciones[tabla] += 1
+        if TABLAS_VISIBLES.intersection(tablas):
+            _generaciones['historial'] += 1
+
+
+def _snapshot(tablas: frozenset) -> tuple:
+    return tuple(_generaciones[t] for t in sorted(tablas))
+
+
+# ── Caché ────────────────────────────────────────────────────────────────────
+
+class CacheTablas:
+    """
+    Diccionario con TTL cuyas entradas dependen de un conjunto de tablas.
+
+    Uso:
+        cache = CacheTablas(max_entradas=512)
+        valor = cache.obtener(clave, tablas)
+        if valor is CacheTablas.FALTA:
+            valor = calcular()
+            cache.guardar(clave, tablas, valor, ttl=30)
+    """
+
+    FALTA = _FALTA
+
+    def __init__(self, max_entradas: int = 1024):
+        self.max_entradas = max_entradas
+        self._entradas: dict = {}
+
+    def obtener(self, clave, tablas: frozenset):
+        entrada = self._entradas.get(clave)
+        if entrada is None:
+            return _FALTA
+        expira, generacion, valor = entrada
+        if expira < time.monotonic() or generacion != _snapshot(tablas):
+            self._entradas.pop(clave, None)
+            return _FALTA
+        return valor
+
+    def guardar(self, clave, tablas: frozenset, valor, ttl: float) -> None:
+        with _lock:
+            if len(self._entradas) >= self.max_entradas:
+                # Descartar la entrada más antigua (orden de inserción)
+                self._entradas.pop(next(iter(self._entradas)), None)
+            self._entradas[clave] = (time.monotonic() + ttl, _snapshot(tablas), valor)
+
+    def limpiar(self) -> None:
+        self._entradas.clear()
+
+
+# ── Listeners de sesión ──────────────────────────────────────────────────────
+
+def _registrar_tablas(session, tablas) -> None:
+    session.info.setdefault(_CLAVE_SESION, set()).update(tablas)
+
+
+def _after_flush(session, flush_context):
+    _registrar_tablas(session, {
+        obj.__table__.name
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        if hasattr(obj, '__table__')
+    })
+
+
+def _do_orm_execute(orm_execute_state):
+    # UPDATE / DELETE / INSERT emitidos con session.execute() o Query.delete()
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        tabla = getattr(orm_execute_state.statement, 'table', None)
+        if tabla is not None:
+            _registrar_tablas(orm_execute_state.session, {tabla.name})
+
+
+def _after_commit(session):
+    tablas = session.info.pop(_CLAVE_SESION, None)
+    if tablas:
+        invalidar(*tablas)
+
+
+def _after_rollback(session):
+    session.info.pop(_CLAVE_SESION, None)
+
+
+def registrar_invalidacion() -> None:
+    """
+    Conecta los eventos de sesión que alimentan las generaciones.
+    Idempotente: se puede llamar en cada create_app().
+    """
+    for nombre, fn in (
+        ('after_flush', _after_flush),
+        ('do_orm_execute', _do_orm_execute),
+        ('after_commit', _after_commit),
+        ('after_rollback', _after_rollback),
+    ):
+        if not event.contains(Session, nombre, fn):
+            event.listen(Session, nombre, fn)
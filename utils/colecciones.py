@@ -0,0 +1,124 @@
+"""
+Sincronización de colecciones hijas (especificaciones, responsables)
+Sistema de Inventario IUCA
+
+sincronizar_coleccion() deja las filas hijas de un registro padre iguales
+a una lista nueva, con un número fijo de sentencias sin importar cuántas
+filas haya:
+
+    1. SELECT de las filas actuales (id, clave, orden).
+    2. DELETE ... WHERE id IN (...) de las que ya no están.
+    3. UPDATE ... FROM (VALUES (id, orden), ...) de las que cambiaron de posición.
+    4. INSERT multi-fila de las nuevas.
+
+Los pasos 2 a 4 se omiten si no hay nada que hacer. Las sentencias corren
+en la transacción del endpoint, así que los triggers de historial las
+registran con el usuario de la petición.
+"""
+
+from sqlalchemy import Integer, column, delete, insert, select, update, values
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from utils.extesions import db
+
+
+def sincronizar_coleccion(
+    modelo,
+    campo_padre: str,
+    padre_id: int,
+    nuevos: list[dict],
+    clave: tuple[str, ...],
+    campo_orden: str = None,
+    ignorar_conflictos: bool = False,
+) -> dict:
+    """
+    Sincroniza las filas de `modelo` cuyo `campo_padre` es `padre_id`.
+
+    Args:
+        modelo:             Modelo hijo (EspecificacionEquipo, EquipoResponsable, ...).
+        campo_padre:        FK hacia el padre (ej: 'equipo_id').
+        padre_id:           ID del registro padre.
+        nuevos:             Filas deseadas, en orden, como dicts de columnas
+                            (sin campo_padre ni campo_orden).
+        clave:              Campos que identifican una fila dentro del padre;
+                            dos filas con la misma clave son la misma.
+        campo_orden:        Columna de posición (1..n) a mantener, o None.
+        ignorar_conflictos: INSERT ... ON CONFLICT DO NOTHING sobre
+                            (campo_padre, *clave); para tablas con UNIQUE
+                            que otra petición puede llenar en paralelo.
+
+    Returns:
+        dict: { eliminados, reordenados, insertados }.
+
+    No llama a db.session.commit().
+    """
+    pk = modelo.__mapper__.primary_key[0]
+    columna_padre = getattr(modelo, campo_padre)
+    columnas_clave = [getattr(modelo, campo) for campo in clave]
+    columna_orden = getattr(modelo, campo_orden) if campo_orden else None
+
+    # Filas deseadas por clave, con su posición (la primera aparición gana)
+    deseadas = {}
+    for fila in nuevos:
+        deseadas.setdefault(tuple(fila[campo] for campo in clave), (len(deseadas) + 1, fila))
+
+    # 1. Estado actual
+    seleccion = [pk, *columnas_clave] + ([columna_orden] if columna_orden is not None else [])
+    actuales = {}
+    eliminar = []
+    for fila in db.session.execute(select(*seleccion).where(columna_padre == padre_id)):
+        llave = tuple(fila[1:1 + len(clave)])
+        if llave in deseadas and llave not in actuales:
+            actuales[llave] = (fila[0], fila[-1] if columna_orden is not None else None)
+        else:
+            eliminar.append(fila[0])
+
+    # 2. Eliminar las que sobran
+    if eliminar:
+        db.session.execute(
+            delete(modelo).where(pk.in_(eliminar)),
+            execution_options={'synchronize_session': False},
+        )
+
+    # 3. Reordenar las que se conservan
+    reordenar = []
+    if columna_orden is not None:
+        reordenar = [
+            (id_fila, deseadas[llave][0])
+            for llave, (id_fila, orden_actual) in actuales.items()
+            if orden_actual != deseadas[llave][0]
+        ]
+    if reordenar:
+        posiciones = values(
+            column('id', Integer), column('orden', Integer), name='posiciones'
+        ).data(reordenar)
+        db.session.execute(
+            update(modelo)
+            .where(pk == posiciones.c.id)
+            .values({campo_orden: posiciones.c.orden}),
+            execution_options={'synchronize_session': False},
+        )
+
+    # 4. Insertar las nuevas
+    insertar = [
+        {
+            **fila,
+            campo_padre: padre_id,
+            **({campo_orden: orden} if campo_orden else {}),
+        }
+        for llave, (orden, fila) in deseadas.items()
+        if llave not in actuales
+    ]
+    if insertar:
+        if ignorar_conflictos:
+            sentencia = pg_insert(modelo).values(insertar).on_conflict_do_nothing(
+                index_elements=[campo_padre, *clave]
+            )
+        else:
+            sentencia = insert(modelo).values(insertar)
+        db.session.execute(sentencia)
+
+    return {
+        'eliminados': len(eliminar),
+        'reordenados': len(reordenar),
+        'insertados': len(insertar),
+    }
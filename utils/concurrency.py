@@ -3,11 +3,16 @@ Utilidades para manejo de concurrencia y bloqueos optimistas
 Sistema de Inventario IUCA
 """
 
+import logging
 from datetime import datetime, timedelta
-from flask import request
+from flask import jsonify, request
+from sqlalchemy import select, update
 from sqlalchemy.exc import IntegrityError
 from models import BloqueoActivo
 from utils.extesions import db
+from utils.metricas import BLOQUEOS
+
+logger = logging.getLogger(__name__)
 
 
 def get_client_ip():
@@ -33,7 +38,7 @@ def limpiar_bloqueos_expirados():
         db.session.commit()
     except Exception as e:
         db.session.rollback()
-        print(f"Error limpiando bloqueos: {e}")
+        logger.exception("Error limpiando bloqueos expirados")
 
 
 def obtener_bloqueo(tabla, registro_id):
@@ -77,6 +82,7 @@ def crear_bloqueo(tabla, registro_id, usuario_id, nombre_usuario,
                 and bloqueo_existente.tipo_bloqueo == tipo_bloqueo:
             bloqueo_existente.expira_en = datetime.now() + timedelta(minutes=duracion_minutos)
             db.session.commit()
+            BLOQUEOS.labels(tabla, tipo_bloqueo, 'renovado').inc()
             return True, bloqueo_existente.to_dict()
 
         # Mismo usuario, tipo distinto → actualizar tipo y renovar
@@ -85,9 +91,11 @@ def crear_bloqueo(tabla, registro_id, usuario_id, nombre_usuario,
             bloqueo_existente.tipo_bloqueo = tipo_bloqueo
             bloqueo_existente.expira_en = datetime.now() + timedelta(minutes=duracion_minutos)
             db.session.commit()
+            BLOQUEOS.labels(tabla, tipo_bloqueo, 'renovado').inc()
             return True, bloqueo_existente.to_dict()
 
         # Otro usuario → bloqueo activo
+        BLOQUEOS.labels(tabla, tipo_bloqueo, 'conflicto').inc()
         accion = 'editando' if bloqueo_existente.tipo_bloqueo == 'edicion' else 'eliminando'
         return False, {
             'error': 'locked_by_other',
@@ -107,6 +115,7 @@ def crear_bloqueo(tabla, registro_id, usuario_id, nombre_usuario,
         )
         db.session.add(nuevo_bloqueo)
         db.session.commit()
+        BLOQUEOS.labels(tabla, tipo_bloqueo, 'adquirido').inc()
         return True, nuevo_bloqueo.to_dict()
 
     except IntegrityError:
@@ -118,8 +127,10 @@ def crear_bloqueo(tabla, registro_id, usuario_id, nombre_usuario,
         ).first()
 
         if bloqueo_existente and bloqueo_existente.usuario_id == usuario_id:
+            BLOQUEOS.labels(tabla, tipo_bloqueo, 'adquirido').inc()
             return True, bloqueo_existente.to_dict()
 
+        BLOQUEOS.labels(tabla, tipo_bloqueo, 'conflicto').inc()
         accion = 'editando' if bloqueo_existente.tipo_bloqueo == 'edicion' else 'eliminando'
         return False, {
             'error': 'locked_by_other',
@@ -149,7 +160,7 @@ def liberar_bloqueo(tabla, registro_id, usuario_id):
 
     except Exception as e:
         db.session.rollback()
-        print(f"Error liberando bloqueo: {e}")
+        logger.exception("Error liberando bloqueo de %s #%s", tabla, registro_id)
         return False
 
 
@@ -161,20 +172,59 @@ def liberar_todos_bloqueos_usuario(usuario_id):
         return True
     except Exception as e:
         db.session.rollback()
-        print(f"Error liberando bloqueos del usuario: {e}")
+        logger.exception("Error liberando bloqueos del usuario %s", usuario_id)
         return False
 
 
-def verificar_version(modelo, registro_id, version_esperada):
+def actualizar_con_version(modelo, registro_id, version_esperada, cambios: dict):
     """
-    Verifica que la versión del registro coincida con la esperada.
-    Retorna (es_valida: bool, version_actual: int).
+    Actualiza un registro solo si sigue en la versión que vio el cliente,
+    en una sola sentencia (compare-and-swap):
+
+        UPDATE tabla SET ... WHERE pk = :id AND version = :v RETURNING *
+
+    Sin version_esperada se actualiza sin comparar. Sin cambios de columnas
+    (p. ej. solo responsables o permisos) la fila se bloquea con
+    SELECT ... FOR UPDATE bajo la misma condición. El incremento de
+    `version` lo hace el trigger de la tabla.
+
+    Returns:
+        La instancia actualizada (ya en la sesión), o None si ninguna fila
+        cumplió la condición: el registro no existe o cambió de versión.
+        Ver respuesta_conflicto().
     """
-    registro = modelo.query.get(registro_id)
-    if not registro:
-        return False, None
-    version_actual = getattr(registro, 'version')
-    return version_actual == version_esperada, version_actual
+    clave = modelo.__mapper__.primary_key[0]
+    condiciones = [clave == registro_id]
+    if version_esperada is not None:
+        condiciones.append(modelo.version == version_esperada)
+
+    if cambios:
+        sentencia = update(modelo).where(*condiciones).values(**cambios).returning(modelo)
+    else:
+        sentencia = select(modelo).where(*condiciones).with_for_update(of=modelo)
+
+    return db.session.scalars(
+        sentencia.execution_options(populate_existing=True)
+    ).first()
+
+
+def respuesta_conflicto(modelo, registro_id, serializar, mensaje_no_encontrado):
+    """
+    Respuesta para cuando actualizar_con_version() no actualizó nada:
+    404 si el registro no existe, o el 409 'conflict' con la versión y
+    los datos actuales (serializar(registro)).
+    """
+    db.session.rollback()
+    registro = db.session.get(modelo, registro_id)
+    if registro is None:
+        return jsonify({'error': mensaje_no_encontrado}), 404
+
+    return jsonify({
+        'error': 'conflict',
+        'mensaje': 'El registro fue modificado por otro usuario',
+        'version_actual': registro.version,
+        'datos_actuales': serializar(registro)
+    }), 409
 
 
 def marcar_en_edicion(modelo, registro_id, usuario_id):
@@ -189,7 +239,7 @@ def marcar_en_edicion(modelo, registro_id, usuario_id):
         return False
     except Exception as e:
         db.session.rollback()
-        print(f"Error marcando en edición: {e}")
+        logger.exception("Error marcando en edición %s #%s", modelo.__tablename__, registro_id)
         return False
 
 
@@ -205,5 +255,5 @@ def limpiar_marca_edicion(modelo, registro_id):
         return False
     except Exception as e:
         db.session.rollback()
-        print(f"Error limpiando marca de edición: {e}")
+        logger.exception("Error limpiando marca de edición %s #%s", modelo.__tablename__, registro_id)
         return False
\ No newline at end of file
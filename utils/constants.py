@@ -51,6 +51,24 @@ CAMPOS_IGNORADOS = {
 }
 
 
+# ── Vistas: tablas base de las que lee cada vista ────────────────────────────
+
+# Se usa para invalidar cachés (conteos, resúmenes) cuando cambia una tabla base
+VISTAS_DEPENDENCIAS: dict[str, tuple[str, ...]] = {
+    'vista_equipos_completa': (
+        'equipos_computo', 'cat_tipos_activo', 'cat_estados',
+        'especificaciones_equipo', 'equipos_responsables', 'usuario',
+    ),
+    'vista_mobiliario_completa': (
+        'mobiliario', 'cat_tipos_mobiliario', 'cat_estados',
+        'mobiliario_responsables', 'usuario',
+    ),
+    'vista_usuarios_completa':  ('usuario', 'cat_areas'),
+    'vista_accesos_completa':   ('acceso', 'permisos', 'cat_areas'),
+    'vista_historial_completa': ('historial', 'acceso'),
+}
+
+
 # ── Historial: aliases de búsqueda ───────────────────────────────────────────
 
 # Términos que el usuario puede escribir → nombre real de la tabla en BD
@@ -127,6 +145,8 @@ CAMPOS_LEGIBLES: dict[str, str] = {
 
 # ── Validators: mensajes de error por FK ─────────────────────────────────────
 
+MENSAJE_FK_GENERICO = 'Este registro está relacionado con otros datos y no puede eliminarse.'
+
 MENSAJES_FK: dict[str, str] = {
     'usuario':
         'No se puede eliminar este responsable porque tiene equipos o mobiliario asignado.',
@@ -197,4 +217,16 @@ OPERACION_MOVIMIENTO: dict[str, str] = {
     'creacion':    'INSERT',
     'edicion':     'UPDATE',
     'eliminacion': 'DELETE'
-}
\ No newline at end of file
+}
+
+
+# ── Actualización masiva de activos ──────────────────────────────────────────
+
+# Campos que PATCH /bulk puede modificar
+CAMPOS_ACTUALIZACION_MASIVA = ('estado_id', 'sucursal_nombre', 'responsables_ids')
+
+# Columnas admitidas en el "filtro" de PATCH /bulk por tabla
+FILTROS_ACTUALIZACION_MASIVA: dict[str, tuple[str, ...]] = {
+    'equipos_computo': ('estado_id', 'sucursal_nombre', 'tipo_activo_id'),
+    'mobiliario':      ('estado_id', 'sucursal_nombre', 'tipo_mobiliario_id'),
+}
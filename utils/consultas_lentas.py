@@ -0,0 +1,139 @@
+"""
+Registro de consultas lentas con plan EXPLAIN
+Sistema de Inventario IUCA
+
+Con CONSULTAS_LENTAS_UMBRAL_MS > 0, toda sentencia que tarde más que el
+umbral se guarda en un buffer circular del proceso (las últimas
+CONSULTAS_LENTAS_MAX) con:
+
+    sql, parámetros (los textos se ocultan), duración, endpoint, usuario
+    y el plan de EXPLAIN (FORMAT JSON), sin ANALYZE: no se vuelve a ejecutar.
+
+El EXPLAIN corre en la misma conexión dentro de un SAVEPOINT, con un
+cursor DBAPI directo (no dispara estos listeners ni los de
+instrumentación); si falla, la transacción de la petición sigue intacta.
+
+GET /api/health/consultas-lentas expone el buffer.
+"""
+
+from collections import deque
+from datetime import datetime
+from time import perf_counter
+from flask import has_request_context, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_EXPLICABLES = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE')
+
+_ajustes = {'umbral': 0.0, 'explain': True}
+_registro = deque(maxlen=100)
+
+
+# ── Listeners ────────────────────────────────────────────────────────────────
+
+def _antes_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    context._lenta_inicio = perf_counter()
+
+
+def _despues_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    inicio = getattr(context, '_lenta_inicio', None)
+    if inicio is None:
+        return
+    duracion = perf_counter() - inicio
+    if duracion < _ajustes['umbral']:
+        return
+
+    plan = None
+    if _ajustes['explain'] and not executemany \
+            and statement.lstrip().upper().startswith(_EXPLICABLES):
+        plan = _explicar(conn, statement, parameters)
+
+    _registro.append({
+        'fecha': datetime.now().isoformat(),
+        'duracion_ms': round(duracion * 1000, 1),
+        'sql': statement,
+        'parametros': _ocultar(parameters, executemany),
+        'endpoint': request.endpoint if has_request_context() else None,
+        'ruta': request.path if has_request_context() else None,
+        'usuario_id': _usuario_actual(),
+        'plan': plan,
+    })
+
+
+def _explicar(conn, statement, parameters):
+    """Plan JSON de la sentencia, o {'error': ...} si no se pudo obtener."""
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute('SAVEPOINT consulta_lenta')
+        try:
+            cursor.execute('EXPLAIN (ANALYZE off, FORMAT JSON) ' + statement, parameters)
+            plan = cursor.fetchone()[0]
+            cursor.execute('RELEASE SAVEPOINT consulta_lenta')
+            return plan
+        except Exception as e:
+            cursor.execute('ROLLBACK TO SAVEPOINT consulta_lenta')
+            return {'error': str(e).splitlines()[0]}
+    except Exception as e:
+        return {'error': str(e).splitlines()[0]}
+    finally:
+        cursor.close()
+
+
+def _ocultar(parameters, executemany):
+    """Conserva números, fechas y nulos; los textos se reducen a su longitud."""
+    def valor(v):
+        if v is None or isinstance(v, (bool, int, float, datetime)):
+            return v if not isinstance(v, datetime) else v.isoformat()
+        if isinstance(v, (str, bytes)):
+            return f'<texto:{len(v)}>'
+        if isinstance(v, (list, tuple)):
+            return [valor(x) for x in v[:20]]
+        return f'<{type(v).__name__}>'
+
+    if executemany:
+        return {'filas': len(parameters)}
+    if isinstance(parameters, dict):
+        return {k: valor(v) for k, v in parameters.items()}
+    return valor(parameters or ())
+
+
+def _usuario_actual():
+    if not has_request_context():
+        return None
+    try:
+        identidad = get_jwt_identity()
+        return int(identidad) if identidad else None
+    except Exception:
+        return None
+
+
+# ── API del módulo ───────────────────────────────────────────────────────────
+
+def registrar_consultas_lentas(app) -> None:
+    """Activa el registro si CONSULTAS_LENTAS_UMBRAL_MS > 0."""
+    global _registro
+    umbral_ms = app.config['CONSULTAS_LENTAS_UMBRAL_MS']
+    if umbral_ms <= 0:
+        return
+
+    _ajustes['umbral'] = umbral_ms / 1000
+    _ajustes['explain'] = app.config['CONSULTAS_LENTAS_EXPLAIN']
+    _registro = deque(_registro, maxlen=app.config['CONSULTAS_LENTAS_MAX'])
+
+    if not event.contains(Engine, 'before_cursor_execute', _antes_de_ejecutar):
+        event.listen(Engine, 'before_cursor_execute', _antes_de_ejecutar)
+        event.listen(Engine, 'after_cursor_execute', _despues_de_ejecutar)
+
+
+def consultas_lentas(limite: int = None) -> list[dict]:
+    """Registros del buffer, del más reciente al más antiguo."""
+    registros = list(_registro)[::-1]
+    return registros[:limite] if limite else registros
+
+
+def limpiar_consultas_lentas() -> int:
+    """Vacía el buffer; devuelve cuántos registros tenía."""
+    total = len(_registro)
+    _registro.clear()
+    return total
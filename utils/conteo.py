@@ -0,0 +1,91 @@
+"""
+Estrategias de conteo para endpoints paginados
+Sistema de Inventario IUCA
+
+Cada página de un listado necesita un total. Un COUNT(*) sobre la vista
+filtrada en cada cambio de página es caro en tablas grandes (historial),
+así que el total se obtiene con una de estas estrategias, elegida con el
+parámetro ?count=:
+
+    exact     COUNT(*) cacheado por firma de filtros (TTL corto, se invalida
+              cuando se escribe en las tablas de las que lee la consulta).
+    estimate  Filas estimadas por el planner (EXPLAIN), sin recorrer la tabla.
+    none      Sin total; el cliente navega con has_next.
+    auto      (por defecto) estimate si la consulta no tiene filtros y el
+              planner estima más de CONTEO_UMBRAL_ESTIMADO filas; si no, exact.
+"""
+
+from flask import current_app
+from sqlalchemy.sql.util import find_tables
+from utils.cache_tablas import CacheTablas, expandir_tablas
+from utils.extesions import db
+
+MODOS_CONTEO = ('auto', 'exact', 'estimate', 'none')
+
+_cache_conteos = CacheTablas(max_entradas=2048)
+
+
+def contar(query, modo: str = 'auto') -> tuple[int | None, bool]:
+    """
+    Calcula el total de filas de un Query según la estrategia indicada.
+
+    Returns:
+        tuple: (total, es_estimado). total es None con modo 'none'.
+    """
+    if modo not in MODOS_CONTEO:
+        modo = 'auto'
+
+    if modo == 'none':
+        return None, False
+
+    statement = query.order_by(None).statement
+    compilado = statement.compile(
+        dialect=db.session.get_bind().dialect,
+        compile_kwargs={'render_postcompile': True},
+    )
+
+    if modo == 'estimate':
+        return _estimar(compilado), True
+
+    if modo == 'auto' and statement.whereclause is None:
+        estimado = _estimar(compilado)
+        if estimado >= current_app.config.get('CONTEO_UMBRAL_ESTIMADO', 100_000):
+            return estimado, True
+
+    return _contar_exacto(query, statement, compilado), False
+
+
+def _estimar(compilado) -> int:
+    """Filas estimadas por el planner para la consulta, sin ejecutarla."""
+    plan = db.session.connection().exec_driver_sql(
+        'EXPLAIN (FORMAT JSON) ' + compilado.string,
+        compilado.params,
+    ).scalar()
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def _contar_exacto(query, statement, compilado) -> int:
+    tablas = expandir_tablas(_nombres_tablas(statement))
+    firma = (
+        compilado.string,
+        tuple(sorted((k, repr(v)) for k, v in compilado.params.items())),
+    )
+
+    total = _cache_conteos.obtener(firma, tablas)
+    if total is CacheTablas.FALTA:
+        total = query.order_by(None).count()
+        _cache_conteos.guardar(
+            firma, tablas, total,
+            ttl=current_app.config.get('CONTEO_CACHE_TTL', 30),
+        )
+    return total
+
+
+def _nombres_tablas(statement) -> set[str]:
+    """Tablas y vistas que lee la consulta, incluidas subconsultas y alias."""
+    nombres = set()
+    for tabla in find_tables(statement, check_columns=True):
+        tabla = getattr(tabla, 'element', tabla)  # alias → tabla original
+        if hasattr(tabla, 'name'):
+            nombres.add(tabla.name)
+    return nombres
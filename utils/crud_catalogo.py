@@ -1,12 +1,18 @@
 # utils/crud_catalogo.py
 
+import logging
 from flask import request, jsonify
 from flask_jwt_extended import get_jwt_identity
 from utils.extesions import db
-from utils.concurrency import liberar_bloqueo, verificar_version
+from utils.concurrency import actualizar_con_version, liberar_bloqueo, respuesta_conflicto
+from utils.dependencias import respuesta_dependencias, verificar_dependencias
 from utils.validators import ValidationError, handle_db_error
-from sqlalchemy import String, cast
-from utils.constants import CATALOGO_CAMPO_NOMBRE, CATALOGO_CAMPOS_EDITABLES
+from utils.paginacion import paginar
+from utils.async_db import serializar_entidades
+from sqlalchemy import String, cast, select
+from utils.constants import CATALOGO_CAMPO_NOMBRE, CATALOGO_CAMPOS_EDITABLES, MENSAJE_FK_GENERICO, MENSAJES_FK
+
+logger = logging.getLogger(__name__)
 
 def crud_catalogo(modelo, validador, nombre: str, tabla: str,
                   campo_busqueda: str,
@@ -14,7 +20,7 @@ def crud_catalogo(modelo, validador, nombre: str, tabla: str,
                   campo_id: str,
                   campo_orden):
     """
-    Genera las 5 funciones CRUD para un catálogo genérico.
+    Genera las 7 funciones CRUD para un catálogo genérico.
 
     Args:
         modelo:     Clase SQLAlchemy (ej: CatArea)
@@ -23,9 +29,8 @@ def crud_catalogo(modelo, validador, nombre: str, tabla: str,
         tabla:      Nombre de la tabla en BD para bloqueos (ej: 'cat_areas')
 
     Uso:
-        get_one, create, update, delete, get_completo = crud_catalogo(
-            CatArea, validate_area, 'Área', 'cat_areas'
-        )
+        (get_completo, get_paginado, get_one, create, update, delete,
+         dependencias) = crud_catalogo(CatArea, validate_area, 'Área', 'cat_areas', ...)
     """
 
 
@@ -61,14 +66,13 @@ def crud_catalogo(modelo, validador, nombre: str, tabla: str,
             estado_bool = estado.lower() == "true"
             query = query.filter_by(activo = estado_bool)
 
-        paginated = query.order_by(campo_orden.asc()).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
+        paginated = paginar(query.order_by(campo_orden.asc()), page, per_page)
 
         return jsonify({
             clave_respuesta: [i.to_dict() for i in paginated.items],
             'total':         paginated.total,
             'pages':         paginated.pages,
+            'total_estimado': paginated.total_estimado,
             'current_page':  paginated.page,
         }), 200
 
@@ -134,10 +138,6 @@ def crud_catalogo(modelo, validador, nombre: str, tabla: str,
 
     def update(id):
         user_id = get_jwt_identity()
-        item = modelo.query.get(id)
-        if not item:
-            return jsonify({'error': f'{nombre} no encontrado/a'}), 404
-
         data = request.get_json()
         if not data:
             return jsonify({'error': 'No se recibieron datos'}), 400
@@ -147,20 +147,13 @@ def crud_catalogo(modelo, validador, nombre: str, tabla: str,
         except ValidationError as e:
             return jsonify({'error': e.message, 'campos': e.fields}), 422
 
-        version_cliente = data.get('version')
-        if version_cliente is not None:
-            es_valida, version_actual = verificar_version(modelo, id, version_cliente)
-            if not es_valida:
-                return jsonify({
-                    'error': 'conflict',
-                    'mensaje': 'El registro fue modificado por otro usuario',
-                    'version_actual': version_actual,
-                    'datos_actuales': item.to_dict(include_version=True)
-                }), 409
-
         try:
-            for campo, valor in _build_fields(modelo, data).items():
-                setattr(item, campo, valor)
+            # Compare-and-swap sobre la versión que vio el cliente
+            item = actualizar_con_version(modelo, id, data.get('version'), _build_fields(modelo, data))
+            if item is None:
+                return respuesta_conflicto(
+                    modelo, id, lambda i: i.to_dict(include_version=True), f'{nombre} no encontrado/a'
+                )
 
             db.session.commit()
             liberar_bloqueo(tabla, id, int(user_id))
@@ -176,6 +169,12 @@ def crud_catalogo(modelo, validador, nombre: str, tabla: str,
             return jsonify({'error': message}), code
 
 
+    # ── DEPENDENCIAS ──────────────────────────────────────────────────────
+
+    def dependencias(id):
+        return respuesta_dependencias(modelo, id, f'{nombre} no encontrado/a')
+
+
     # ── DELETE ────────────────────────────────────────────────────────────
 
     def delete(id, bloqueo):
@@ -183,6 +182,9 @@ def crud_catalogo(modelo, validador, nombre: str, tabla: str,
         if not item:
             return jsonify({'error': f'{nombre} no encontrado/a'}), 404
 
+        if verificar_dependencias(modelo, id):
+            return jsonify({'error': MENSAJES_FK.get(tabla, MENSAJE_FK_GENERICO)}), 409
+
         try:
             db.session.delete(item)
             db.session.delete(bloqueo)
@@ -191,13 +193,27 @@ def crud_catalogo(modelo, validador, nombre: str, tabla: str,
 
         except Exception as e:
             db.session.rollback()
-            print(f"TIPO: {type(e)}")
-            print(f"PGCODE: {getattr(getattr(e, 'orig', None), 'pgcode', 'SIN PGCODE')}")
-            print(f"STR: {str(e)[:200]}")
+            logger.warning(
+                'Error eliminando %s #%s', tabla, id,
+                extra={'pgcode': getattr(getattr(e, 'orig', None), 'pgcode', None)},
+                exc_info=True,
+            )
             message, code = handle_db_error(e, tabla=tabla)
             return jsonify({'error': message}), code
 
-    return get_completo,get_paginado,  get_one, create, update, delete
+    return get_completo,get_paginado,  get_one, create, update, delete, dependencias
+
+
+# ── Lecturas async ────────────────────────────────────────────────────────────
+
+async def get_completo_async(modelo, campo_busqueda: str):
+    """get_completo() leído con asyncpg (blueprint /api/async/catalogos)."""
+    sentencia = (
+        select(modelo)
+        .where(modelo.activo.is_(True))
+        .order_by(getattr(modelo, campo_busqueda))
+    )
+    return jsonify(await serializar_entidades(sentencia, lambda i: i.to_dict())), 200
 
 
 # ── Helpers internos ──────────────────────────────────────────────────────────
@@ -1,7 +1,9 @@
+import inspect
 from functools import wraps
-from flask import jsonify
+from flask import current_app, jsonify
 from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
 from models import Acceso, Permiso
+from utils.extesions import db
 
 def require_permission(modulo, permiso_tipo):
     """
@@ -10,6 +12,12 @@ def require_permission(modulo, permiso_tipo):
 
     Los permisos se consultan directamente por acceso_id + modulo,
     sin pasar por roles intermedios.
+
+    En vistas async (lectura con asyncpg) la sesión síncrona se cierra
+    tras verificar el permiso, para no retener una conexión psycopg2
+    del pool mientras la vista espera a la BD. Las vistas async que no
+    usan este decorador quedan cubiertas por liberar_sesion_sincrona
+    (before_request de los blueprints async).
     """
     def decorator(fn):
         @wraps(fn)
@@ -35,6 +43,10 @@ def require_permission(modulo, permiso_tipo):
             if not getattr(permiso, permiso_tipo, False):
                 return jsonify({'error': f'Sin permiso para {permiso_tipo.replace("puede_", "")}'}), 403
 
-            return fn(*args, **kwargs)
+            if inspect.iscoroutinefunction(fn):
+                db.session.remove()
+
+            # ensure_sync: permite decorar también vistas async
+            return current_app.ensure_sync(fn)(*args, **kwargs)
         return wrapper
     return decorator
\ No newline at end of file
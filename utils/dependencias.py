@@ -0,0 +1,121 @@
+"""
+Verificación de dependencias antes de eliminar
+Sistema de Inventario IUCA
+
+referencias_de() recorre los metadatos de los modelos y arma la lista de
+FK que apuntan a una tabla. verificar_dependencias() responde "¿este
+registro está referenciado?" con un solo SELECT de varios EXISTS, que se
+detienen en la primera fila encontrada en lugar de contar todas.
+
+No se consideran bloqueantes las FK que la BD resuelve sola (ON DELETE
+CASCADE / SET NULL) ni las colecciones que el ORM borra en cascada
+(ej: Acceso.permisos). Una regla de negocio puede volver bloqueante una FK
+en cascada pasándola en `adicionales` (ej: los responsables asignados).
+"""
+
+from functools import lru_cache
+from flask import jsonify
+from sqlalchemy import exists, select
+from utils.extesions import db
+
+_ACCIONES_AUTOMATICAS = ('CASCADE', 'SET NULL')
+
+
+@lru_cache(maxsize=None)
+def referencias_de(modelo) -> tuple:
+    """
+    FK que impiden borrar una fila de `modelo`.
+
+    Returns:
+        tuple: ((columna_fk, columna_referenciada), ...) ordenadas por tabla.
+    """
+    tabla = modelo.__table__
+
+    # Hijos que el ORM elimina junto con el padre
+    en_cascada = {
+        remota
+        for relacion in modelo.__mapper__.relationships
+        if relacion.cascade.delete
+        for _, remota in relacion.local_remote_pairs
+    }
+
+    referencias = []
+    for mapper in db.Model.registry.mappers:
+        for fk in mapper.local_table.foreign_keys:
+            if fk.column.table is not tabla:
+                continue
+            if (fk.ondelete or '').upper() in _ACCIONES_AUTOMATICAS or fk.parent in en_cascada:
+                continue
+            referencias.append((fk.parent, fk.column))
+
+    referencias.sort(key=lambda r: (r[0].table.name, r[0].name))
+    return tuple(referencias)
+
+
+def verificar_dependencias(modelo, registro_id, adicionales=()) -> list[dict]:
+    """
+    Tablas que referencian al registro.
+
+    Args:
+        modelo:       Modelo del registro a eliminar.
+        registro_id:  Clave primaria del registro.
+        adicionales:  Columnas FK que también bloquean aunque estén en
+                      cascada (ej: EquipoResponsable.usuario_id).
+
+    Returns:
+        list: [{ tabla, campo }] de cada referencia existente; vacía si
+              el registro puede eliminarse. Cuesta una consulta (o
+              ninguna si nada apunta a la tabla).
+    """
+    clave = modelo.__mapper__.primary_key[0]
+    sondas = list(referencias_de(modelo))
+    sondas += [(columna.property.columns[0], clave) for columna in adicionales]
+    if not sondas:
+        return []
+
+    # Las FK pueden apuntar a una columna única que no sea la PK
+    referidas = list({referida for _, referida in sondas if referida is not clave})
+    valores = {clave: registro_id}
+    if referidas:
+        fila = db.session.execute(
+            select(*referidas).where(clave == registro_id)
+        ).first()
+        if fila is None:
+            return []
+        valores.update(zip(referidas, fila))
+
+    consulta = select(*(
+        _sonda(modelo, clave, registro_id, fk, valores[referida]).label(f'r{i}')
+        for i, (fk, referida) in enumerate(sondas)
+    ))
+    resultado = db.session.execute(consulta).one()
+
+    return [
+        {'tabla': fk.table.name, 'campo': fk.name}
+        for (fk, _), existe in zip(sondas, resultado)
+        if existe
+    ]
+
+
+def respuesta_dependencias(modelo, registro_id, mensaje_no_encontrado: str, adicionales=()):
+    """
+    Respuesta de GET .../<id>/dependencias: 404 si el registro no existe;
+    si no, { id, eliminable, dependencias }.
+    """
+    if db.session.get(modelo, registro_id) is None:
+        return jsonify({'error': mensaje_no_encontrado}), 404
+
+    referencias = verificar_dependencias(modelo, registro_id, adicionales)
+    return jsonify({
+        'id': registro_id,
+        'eliminable': not referencias,
+        'dependencias': referencias,
+    }), 200
+
+
+def _sonda(modelo, clave, registro_id, fk, valor):
+    """EXISTS de la FK; en autorreferencias no cuenta la propia fila."""
+    condicion = exists().where(fk == valor)
+    if fk.table is modelo.__table__:
+        condicion = condicion.where(clave != registro_id)
+    return condicion
@@ -0,0 +1,189 @@
+"""
+Detector de consultas N+1
+Sistema de Inventario IUCA
+
+Agrupa las sentencias ejecutadas por SQL normalizado (parámetros, literales
+y listas IN reemplazados) y marca las que se repiten DETECCION_N1_UMBRAL
+veces o más: el patrón de `Modelo.query.get()` por fila, de las relaciones
+lazy de to_dict() (responsables, estado, editor...) y de _obtener_valor_legible.
+Por cada grupo se anota el primer marco del código de la app que lanzó la
+sentencia (ej. models/__init__.py:251 EquipoResponsable.to_dict).
+
+Con DETECCION_N1=True (por defecto igual que FLASK_DEBUG) cada petición con
+sentencias repetidas escribe un warning en el logger de la app.
+
+En pruebas, PresupuestoConsultas falla si un bloque supera un número de
+sentencias o repite alguna. Cuenta lo que pase por cualquier Engine del
+proceso, así que sirve igual con el test client de la app que con un
+engine suelto. Con pytest instalado se expone como fixture (ver
+tests/test_deteccion_n1.py):
+
+    # tests/conftest.py
+    pytest_plugins = ['utils.deteccion_n1']
+
+    def test_listado_equipos(presupuesto_consultas):
+        client = create_app().test_client()
+        with presupuesto_consultas(4):
+            client.get('/api/vistas/equipos-completo/', headers=...)
+"""
+
+import os
+import re
+import sys
+import threading
+from collections import defaultdict
+from flask import g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+try:
+    import pytest
+except ImportError:  # pytest solo se instala para pruebas
+    pytest = None
+
+_RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+_ESTE_ARCHIVO = os.path.abspath(__file__)
+
+_PARAMETROS = re.compile(r"%\(\w+\)s|%s|\?|\$\d+|'(?:[^']|'')*'|\b\d+\b")
+_LISTAS = re.compile(r'\bIN \((?:\?, )*\?\)', re.IGNORECASE)
+_ESPACIOS = re.compile(r'\s+')
+_COLUMNAS = re.compile(r'^SELECT .+? FROM ', re.IGNORECASE)
+
+_ajustes = {'umbral': 3}
+_activos = threading.local()  # PresupuestoConsultas abiertos en el hilo
+
+
+def normalizar(sql: str) -> str:
+    """SQL sin valores: dos sentencias iguales salvo parámetros dan la misma firma."""
+    sql = _PARAMETROS.sub('?', sql)
+    sql = _LISTAS.sub('IN (...)', sql)
+    return _ESPACIOS.sub(' ', sql).strip()
+
+
+def _origen() -> str | None:
+    """Primer marco (desde la sentencia hacia afuera) que pertenece a la app."""
+    marco = sys._getframe(2)
+    while marco is not None:
+        archivo = marco.f_code.co_filename
+        if archivo.startswith(_RAIZ) and archivo != _ESTE_ARCHIVO \
+                and f'{os.sep}site-packages{os.sep}' not in archivo:
+            nombre = getattr(marco.f_code, 'co_qualname', marco.f_code.co_name)
+            return f'{archivo[len(_RAIZ):]}:{marco.f_lineno} {nombre}'
+        marco = marco.f_back
+    return None
+
+
+class RegistroConsultas:
+    """Sentencias agrupadas por firma: { firma: { conteo, origenes } }."""
+
+    def __init__(self):
+        self.total = 0
+        self.grupos = defaultdict(lambda: {'conteo': 0, 'origenes': set()})
+
+    def anotar(self, sql: str, origen: str | None) -> None:
+        self.total += 1
+        grupo = self.grupos[normalizar(sql)]
+        grupo['conteo'] += 1
+        if origen and len(grupo['origenes']) < 5:
+            grupo['origenes'].add(origen)
+
+    def repetidas(self, umbral: int = None) -> list[dict]:
+        """SELECT repetidos `umbral` veces o más, del más repetido al menos."""
+        umbral = umbral or _ajustes['umbral']
+        return sorted(
+            (
+                {'sql': firma, 'conteo': grupo['conteo'], 'origenes': sorted(grupo['origenes'])}
+                for firma, grupo in self.grupos.items()
+                if grupo['conteo'] >= umbral and firma.upper().startswith(('SELECT', 'WITH'))
+            ),
+            key=lambda r: -r['conteo'],
+        )
+
+    def reporte(self, umbral: int = None) -> str:
+        lineas = [f'{self.total} sentencias']
+        for r in self.repetidas(umbral):
+            # Sin la lista de columnas, para que se vea el WHERE
+            lineas.append(f"  {r['conteo']}× {_COLUMNAS.sub('SELECT … FROM ', r['sql'])[:300]}")
+            lineas += [f'      desde {o}' for o in r['origenes']]
+        return '\n'.join(lineas)
+
+
+class PresupuestoConsultas(RegistroConsultas):
+    """
+    Context manager para pruebas: falla (AssertionError) si el bloque
+    ejecuta más de `maximo` sentencias o repite un SELECT `umbral` veces.
+    """
+
+    def __init__(self, maximo: int = None, umbral: int = None):
+        super().__init__()
+        self.maximo = maximo
+        self.umbral = umbral
+
+    def __enter__(self):
+        _conectar()
+        if not hasattr(_activos, 'pila'):
+            _activos.pila = []
+        _activos.pila.append(self)
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        _activos.pila.remove(self)
+        if tipo is not None:
+            return False
+        if self.maximo is not None and self.total > self.maximo:
+            raise AssertionError(
+                f'Se esperaban como máximo {self.maximo} sentencias\n{self.reporte(self.umbral)}'
+            )
+        if self.repetidas(self.umbral):
+            raise AssertionError(f'Consultas N+1 detectadas\n{self.reporte(self.umbral)}')
+        return False
+
+
+# ── Listener ─────────────────────────────────────────────────────────────────
+
+def _antes_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    en_peticion = has_app_context() and 'deteccion_n1' in g
+    presupuestos = getattr(_activos, 'pila', None)
+    if not en_peticion and not presupuestos:
+        return
+
+    origen = _origen()
+    if en_peticion:
+        g.deteccion_n1.anotar(statement, origen)
+    for presupuesto in presupuestos or ():
+        presupuesto.anotar(statement, origen)
+
+
+def _conectar() -> None:
+    if not event.contains(Engine, 'before_cursor_execute', _antes_de_ejecutar):
+        event.listen(Engine, 'before_cursor_execute', _antes_de_ejecutar)
+
+
+def registrar_deteccion_n1(app) -> None:
+    """Activa el aviso por petición si DETECCION_N1 está activo."""
+    if not app.config['DETECCION_N1']:
+        return
+
+    _ajustes['umbral'] = app.config['DETECCION_N1_UMBRAL']
+    _conectar()
+
+    @app.before_request
+    def iniciar_registro_n1():
+        g.deteccion_n1 = RegistroConsultas()
+
+    @app.after_request
+    def avisar_n1(response):
+        registro = g.pop('deteccion_n1', None)
+        if registro is not None and registro.repetidas():
+            app.logger.warning(
+                'Posible N+1 en %s %s (%s)\n%s',
+                request.method, request.path, request.endpoint, registro.reporte(),
+            )
+        return response
+
+
+if pytest is not None:
+    @pytest.fixture
+    def presupuesto_consultas():
+        """Fábrica de PresupuestoConsultas: `with presupuesto_consultas(maximo): ...`"""
+        return PresupuestoConsultas
@@ -0,0 +1,115 @@
+"""
+Resolución por lotes de etiquetas legibles para el historial
+Sistema de Inventario IUCA
+
+VistaHistorialCompleta.to_dict_detallado() resuelve cada FK de `cambios`
+(estado_id, area_id, ...) con un Query.get() por valor. Para exportar
+millones de movimientos, ResolvedorEtiquetas junta los IDs de un lote de
+filas, los resuelve con una consulta IN por catálogo y los memoriza
+durante toda la exportación.
+"""
+
+from sqlalchemy import select
+from models import Acceso, CatArea, CatEstado, CatTipoActivo, CatTipoMobiliario
+from utils.constants import CAMPOS_LEGIBLES
+from utils.extesions import db
+
+# campo de `cambios` → (columna id, columna etiqueta)
+_CATALOGOS_POR_CAMPO = {
+    'estado_id':          (CatEstado.id_estado, CatEstado.nombre_estado),
+    'tipo_activo_id':     (CatTipoActivo.id_tipo_activo, CatTipoActivo.nombre_tipo),
+    'tipo_mobiliario_id': (CatTipoMobiliario.id_tipo_mobiliario, CatTipoMobiliario.nombre_tipo),
+    'area_id':            (CatArea.id_area, CatArea.nombre_area),
+    'creado_por':         (Acceso.id_acceso, Acceso.nombre_usuario),
+    'modificado_por':     (Acceso.id_acceso, Acceso.nombre_usuario),
+}
+
+
+def _como_id(valor):
+    try:
+        return int(valor)
+    except (ValueError, TypeError):
+        return None
+
+
+class ResolvedorEtiquetas:
+    """
+    Caché de etiquetas por catálogo, llenada por lotes.
+
+    Uso:
+        resolvedor = ResolvedorEtiquetas()
+        for lote in lotes:
+            resolvedor.precargar(fila.cambios for fila in lote)
+            for fila in lote:
+                detalle = resolvedor.formatear(fila.cambios)
+    """
+
+    def __init__(self):
+        # columna id → { id: etiqueta | None }
+        self._cache = {}
+
+    def precargar(self, lista_cambios) -> None:
+        """Resuelve con una consulta por catálogo los IDs aún no vistos."""
+        for columna_id, ids, sentencia in self.consultas_pendientes(lista_cambios):
+            self.registrar(columna_id, ids, db.session.execute(sentencia).all())
+
+    def consultas_pendientes(self, lista_cambios) -> list[tuple]:
+        """
+        Consultas que faltan para formatear `lista_cambios`, sin ejecutarlas:
+        [(columna id, ids, SELECT id, etiqueta)]. Las vistas async las
+        ejecutan en paralelo y pasan el resultado a registrar().
+        """
+        pendientes = {}
+        for cambios in lista_cambios:
+            for campo, valores in (cambios or {}).items():
+                catalogo = _CATALOGOS_POR_CAMPO.get(campo)
+                if catalogo is None or not isinstance(valores, dict):
+                    continue
+                conocidos = self._cache.setdefault(catalogo[0], {})
+                for clave in ('old', 'new'):
+                    id_valor = _como_id(valores.get(clave))
+                    if id_valor is not None and id_valor not in conocidos:
+                        pendientes.setdefault(catalogo, set()).add(id_valor)
+
+        return [
+            (columna_id, ids, select(columna_id, columna_etiqueta).where(columna_id.in_(ids)))
+            for (columna_id, columna_etiqueta), ids in pendientes.items()
+        ]
+
+    def registrar(self, columna_id, ids, filas) -> None:
+        """Guarda las etiquetas de `filas` (id, etiqueta); los IDs sin fila quedan en None."""
+        encontrados = dict(filas)
+        conocidos = self._cache.setdefault(columna_id, {})
+        for id_valor in ids:
+            conocidos[id_valor] = encontrados.get(id_valor)
+
+    def valor_legible(self, campo, valor):
+        """Misma regla que VistaHistorialCompleta._obtener_valor_legible()."""
+        if valor is None:
+            return None
+        catalogo = _CATALOGOS_POR_CAMPO.get(campo)
+        if catalogo is None:
+            return valor
+        id_valor = _como_id(valor)
+        if id_valor is None:
+            return valor
+        etiqueta = self._cache.get(catalogo[0], {}).get(id_valor)
+        return etiqueta if etiqueta is not None else valor
+
+    def formatear(self, cambios) -> list[dict]:
+        """Equivalente a VistaHistorialCompleta._formatear_cambios()."""
+        if not cambios:
+            return []
+        cambios_formateados = []
+        for campo, valores in cambios.items():
+            detalle = {
+                'campo': campo,
+                'campo_legible': CAMPOS_LEGIBLES.get(campo, campo.replace('_', ' ').title())
+            }
+            if isinstance(valores, dict):
+                if 'old' in valores:
+                    detalle['valor_anterior'] = self.valor_legible(campo, valores['old'])
+                if 'new' in valores:
+                    detalle['valor_nuevo'] = self.valor_legible(campo, valores['new'])
+            cambios_formateados.append(detalle)
+        return cambios_formateados
@@ -3,12 +3,15 @@ Utilidad para establecer el usuario actual en los triggers de historial
 Sistema de Inventario IUCA
 """
 
+import logging
 from functools import wraps
 from flask import g
 from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
 from utils.extesions import db
 from sqlalchemy import text
 
+logger = logging.getLogger(__name__)
+
 def set_current_user_for_triggers():
     try:
         verify_jwt_in_request(optional=True)
@@ -24,5 +27,5 @@ def set_current_user_for_triggers():
         )
 
     except Exception as e:
-        print("Error setting trigger user:", e)
+        logger.warning("No se pudo asignar el usuario de los triggers: %s", e)
         db.session.rollback()
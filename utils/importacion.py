@@ -0,0 +1,334 @@
+"""
+Importación masiva de activos desde CSV o JSON lines
+Sistema de Inventario IUCA
+
+Flujo de importar():
+    1. Resolver nombres de catálogo a IDs (tipo_activo → tipo_activo_id)
+       con mapas nombre → id cacheados por proceso; los IDs que vienen
+       directamente en la fila se verifican contra los mismos mapas.
+    2. Validar cada fila con el validador del módulo (validate_equipo, ...).
+    3. Verificar la clave única (numero_serie) con una sola consulta IN,
+       y los responsables de todas las filas con otra.
+    4. Si ninguna fila tiene errores, insertar los activos con un INSERT
+       por lotes (executemany con RETURNING) y después sus especificaciones
+       y responsables, todo en la transacción del endpoint.
+
+Si alguna fila falla no se escribe nada y se devuelve el reporte por fila.
+Con dry_run=True se ejecutan los pasos 1 a 3 y solo se devuelve el reporte.
+
+Formato CSV: una fila de encabezados con los nombres de campo del
+endpoint de creación. En CSV, `responsables_ids` se separa con ';' y
+`especificaciones` se escribe como "Nombre: valor; Nombre: valor".
+"""
+
+import csv
+import io
+import json
+from flask import current_app, request
+from sqlalchemy import func, insert, select
+from utils.cache_tablas import CacheTablas
+from utils.extesions import db
+from utils.responsables import usuarios_existentes
+from utils.validators import ValidationError
+
+TIPOS_CSV = ('text/csv', 'application/csv', 'application/vnd.ms-excel')
+
+_cache_catalogos = CacheTablas(max_entradas=32)
+
+
+# ── Lectura del archivo ──────────────────────────────────────────────────────
+
+def leer_filas() -> list[dict]:
+    """
+    Lee las filas de la petición: archivo 'archivo' (multipart) o cuerpo
+    crudo. CSV si el tipo o la extensión lo indican; si no, JSON lines.
+
+    Raises:
+        ValidationError: archivo vacío, mal formado o con demasiadas filas.
+    """
+    archivo = request.files.get('archivo')
+    if archivo:
+        contenido = archivo.read()
+        es_csv = archivo.filename.lower().endswith('.csv') or archivo.mimetype in TIPOS_CSV
+    else:
+        contenido = request.get_data()
+        es_csv = request.mimetype in TIPOS_CSV
+
+    try:
+        texto = contenido.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        raise ValidationError('El archivo debe estar codificado en UTF-8')
+
+    filas = _leer_csv(texto) if es_csv else _leer_ndjson(texto)
+
+    if not filas:
+        raise ValidationError('El archivo no contiene filas')
+
+    maximo = current_app.config['IMPORTACION_MAX_FILAS']
+    if len(filas) > maximo:
+        raise ValidationError(
+            f'El archivo supera el máximo de {maximo} filas',
+            {'archivo': f'{len(filas)} filas recibidas'}
+        )
+    return filas
+
+
+def _leer_csv(texto: str) -> list[dict]:
+    filas = []
+    for fila in csv.DictReader(io.StringIO(texto)):
+        data = {
+            (campo or '').strip(): valor.strip()
+            for campo, valor in fila.items()
+            if campo and isinstance(valor, str) and valor.strip()
+        }
+        if 'responsables_ids' in data:
+            data['responsables_ids'] = [
+                i.strip() for i in data['responsables_ids'].replace(',', ';').split(';') if i.strip()
+            ]
+        if 'especificaciones' in data:
+            data['especificaciones'] = [
+                {
+                    'nombre_especificacion': nombre.strip(),
+                    'valor_especificacion': valor.strip(),
+                }
+                for nombre, _, valor in (
+                    par.partition(':') for par in data['especificaciones'].split(';') if par.strip()
+                )
+            ]
+        filas.append(data)
+    return filas
+
+
+def _leer_ndjson(texto: str) -> list[dict]:
+    filas = []
+    for numero, linea in enumerate(texto.splitlines(), start=1):
+        if not linea.strip():
+            continue
+        try:
+            data = json.loads(linea)
+        except ValueError:
+            raise ValidationError(
+                'El archivo no es JSON lines válido',
+                {'archivo': f'Línea {numero}: JSON inválido'}
+            )
+        if not isinstance(data, dict):
+            raise ValidationError(
+                'Cada línea debe ser un objeto JSON',
+                {'archivo': f'Línea {numero}: se esperaba un objeto'}
+            )
+        filas.append(data)
+    return filas
+
+
+# ── Catálogos ────────────────────────────────────────────────────────────────
+
+def mapa_catalogo(columna_id, columna_nombre) -> dict[str, int]:
+    """{ nombre en minúsculas: id } del catálogo, cacheado hasta que cambie."""
+    tabla = columna_id.table.name
+    tablas = frozenset({tabla})
+
+    mapa = _cache_catalogos.obtener(tabla, tablas)
+    if mapa is CacheTablas.FALTA:
+        mapa = dict(db.session.execute(
+            select(func.lower(columna_nombre), columna_id)
+        ).all())
+        _cache_catalogos.guardar(
+            tabla, tablas, mapa,
+            ttl=current_app.config['IMPORTACION_CACHE_CATALOGOS_TTL'],
+        )
+    return mapa
+
+
+# ── Esquema por módulo ───────────────────────────────────────────────────────
+
+class EsquemaImportacion:
+    """
+    Describe cómo importar un tipo de activo.
+
+    Args:
+        modelo:           Modelo destino (EquipoComputo, Mobiliario).
+        validador:        validate_equipo / validate_mobiliario.
+        construir:        fn(data) → dict de columnas del activo.
+        catalogos:        { campo_nombre: (campo_id, columna_id, columna_nombre) }
+        clave_unica:      Campo que no puede repetirse (ej: 'numero_serie').
+        responsables:     (modelo_asignacion, campo_entidad) o None.
+        especificaciones: (modelo_especificacion, campo_entidad) o None.
+    """
+
+    def __init__(self, modelo, validador, construir, catalogos=None,
+                 clave_unica=None, responsables=None, especificaciones=None):
+        self.modelo = modelo
+        self.validador = validador
+        self.construir = construir
+        self.catalogos = catalogos or {}
+        self.clave_unica = clave_unica
+        self.responsables = responsables
+        self.especificaciones = especificaciones
+        self.clave_primaria = modelo.__mapper__.primary_key[0]
+
+
+# ── Pipeline ─────────────────────────────────────────────────────────────────
+
+def _error(errores: list, fila: int, mensaje: str, campos: dict = None) -> None:
+    errores.append({'fila': fila, 'error': mensaje, 'campos': campos or {}})
+
+
+def _resolver_catalogos(esquema, data: dict, mapas: dict, ids_catalogo: dict) -> dict:
+    """
+    Sustituye nombres de catálogo por su ID y verifica que los IDs dados
+    directamente existan; devuelve errores por campo.
+    """
+    campos = {}
+    for campo_nombre, (campo_id, _, _) in esquema.catalogos.items():
+        nombre = data.pop(campo_nombre, None)
+        if data.get(campo_id):
+            try:
+                id_dado = int(data[campo_id])
+            except (TypeError, ValueError):
+                continue  # el validador reporta el tipo
+            if id_dado not in ids_catalogo[campo_nombre]:
+                campos[campo_id] = f'El ID {id_dado} no existe en el catálogo'
+            continue
+        if nombre is None:
+            continue
+        id_catalogo = mapas[campo_nombre].get(str(nombre).strip().lower())
+        if id_catalogo is None:
+            campos[campo_nombre] = f'"{nombre}" no existe en el catálogo'
+        else:
+            data[campo_id] = id_catalogo
+    return campos
+
+
+def importar(esquema: EsquemaImportacion, filas: list[dict], dry_run: bool = False) -> dict:
+    """
+    Valida e inserta las filas según el esquema. Las filas se numeran desde
+    1 en el orden del archivo.
+
+    Returns:
+        dict: { total_filas, validas, creados, ids, dry_run,
+                errores: [{fila, error, campos}] }.
+              Si errores no está vacío o dry_run es True no se escribió nada.
+    """
+    errores = []
+    validas = []  # (número de fila, data, columnas)
+
+    mapas = {
+        campo: mapa_catalogo(columna_id, columna_nombre)
+        for campo, (_, columna_id, columna_nombre) in esquema.catalogos.items()
+    }
+    ids_catalogo = {campo: set(mapa.values()) for campo, mapa in mapas.items()}
+
+    for numero, data in enumerate(filas, start=1):
+        campos = _resolver_catalogos(esquema, data, mapas, ids_catalogo)
+        if campos:
+            _error(errores, numero, 'Hay valores de catálogo desconocidos', campos)
+            continue
+        try:
+            esquema.validador(data, is_update=False)
+        except ValidationError as e:
+            _error(errores, numero, e.message, e.fields)
+            continue
+        try:
+            columnas = esquema.construir(data)
+        except (TypeError, ValueError):
+            _error(errores, numero, 'Hay datos inválidos en la fila')
+            continue
+        validas.append((numero, data, columnas))
+
+    if esquema.clave_unica:
+        _verificar_clave_unica(esquema, validas, errores)
+
+    if esquema.responsables:
+        _verificar_responsables(validas, errores)
+
+    errores.sort(key=lambda e: e['fila'])
+    reporte = {
+        'total_filas': len(filas),
+        'validas': len(filas) - len({e['fila'] for e in errores}),
+        'creados': 0,
+        'ids': [],
+        'dry_run': dry_run,
+        'errores': errores,
+    }
+    if errores or dry_run:
+        return reporte
+
+    reporte['ids'] = _insertar(esquema, validas)
+    reporte['creados'] = len(reporte['ids'])
+    return reporte
+
+
+def _verificar_clave_unica(esquema, validas, errores) -> None:
+    campo = esquema.clave_unica
+    columna = getattr(esquema.modelo, campo)
+
+    vistas = {}
+    for numero, data, _ in validas:
+        valor = str(data.get(campo) or '').strip()
+        if not valor:
+            continue
+        if valor in vistas:
+            _error(errores, numero, f'Valor repetido en el archivo (fila {vistas[valor]})',
+                   {campo: 'Duplicado en el archivo'})
+        else:
+            vistas[valor] = numero
+
+    if not vistas:
+        return
+    existentes = set(db.session.scalars(select(columna).where(columna.in_(vistas))))
+    for valor in existentes:
+        _error(errores, vistas[valor], 'El valor ya está registrado',
+               {campo: 'Este valor ya existe'})
+
+
+def _verificar_responsables(validas, errores) -> None:
+    por_fila = {}
+    for numero, data, _ in validas:
+        try:
+            por_fila[numero] = {int(i) for i in data.get('responsables_ids') or []}
+        except (TypeError, ValueError):
+            _error(errores, numero, 'Responsables inválidos',
+                   {'responsables_ids': 'Deben ser IDs numéricos'})
+
+    existentes = usuarios_existentes(set().union(*por_fila.values()))
+    for numero, ids in por_fila.items():
+        faltantes = ids - existentes
+        if faltantes:
+            _error(errores, numero, 'Hay responsables que no existen',
+                   {'responsables_ids': 'IDs inexistentes: ' + ', '.join(map(str, sorted(faltantes)))})
+
+
+def _insertar(esquema, validas) -> list[int]:
+    """Inserta activos e hijos por lotes; devuelve los IDs en el orden del archivo."""
+    filas = [data for _, data, _ in validas]
+    ids = list(db.session.scalars(
+        insert(esquema.modelo).returning(esquema.clave_primaria, sort_by_parameter_order=True),
+        [columnas for _, _, columnas in validas],
+    ))
+
+    if esquema.especificaciones:
+        modelo_spec, campo_entidad = esquema.especificaciones
+        especificaciones = [
+            {
+                campo_entidad: id_activo,
+                'nombre_especificacion': str(spec['nombre_especificacion']).strip(),
+                'valor_especificacion': str(spec['valor_especificacion']).strip(),
+                'orden': orden,
+            }
+            for id_activo, data in zip(ids, filas)
+            for orden, spec in enumerate(data.get('especificaciones') or [], start=1)
+        ]
+        if especificaciones:
+            db.session.execute(insert(modelo_spec), especificaciones)
+
+    if esquema.responsables:
+        modelo_asignacion, campo_entidad = esquema.responsables
+        asignaciones = [
+            {campo_entidad: id_activo, 'usuario_id': usuario_id}
+            for id_activo, data in zip(ids, filas)
+            for usuario_id in sorted({int(i) for i in data.get('responsables_ids') or []})
+        ]
+        if asignaciones:
+            db.session.execute(insert(modelo_asignacion), asignaciones)
+
+    return ids
@@ -0,0 +1,78 @@
+"""
+Instrumentación por petición: consultas SQL y tiempos
+Sistema de Inventario IUCA
+
+Con INSTRUMENTACION_SQL=True cada respuesta lleva el header
+
+    Server-Timing: db;dur=12.4, db-count;desc="7", app;dur=35.0
+
+(tiempo en BD, número de sentencias y tiempo total de la petición, en ms)
+y se escribe un registro por petición en el logger de la app con los
+valores como campos (una línea JSON con LOGS_FORMATO=json). Los
+navegadores muestran Server-Timing en la pestaña de red.
+
+Los contadores viven en flask.g, así que solo cuentan las sentencias
+ejecutadas en el hilo de la petición (no las del loop de utils/async_db).
+Con la opción desactivada no se registra ningún listener.
+"""
+
+from time import perf_counter
+from flask import g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+def _antes_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    if has_app_context() and 'instrumentacion' in g:
+        context._instrumentacion_inicio = perf_counter()
+
+
+def _despues_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    inicio = getattr(context, '_instrumentacion_inicio', None)
+    if inicio is None or not has_app_context() or 'instrumentacion' not in g:
+        return
+    medicion = g.instrumentacion
+    medicion['consultas'] += 1
+    medicion['db'] += perf_counter() - inicio
+
+
+def medicion_actual() -> dict | None:
+    """{ consultas, db (s), inicio } de la petición en curso, o None si está desactivada."""
+    return g.get('instrumentacion') if has_app_context() else None
+
+
+def registrar_instrumentacion(app) -> None:
+    """Conecta los listeners de SQLAlchemy y los hooks de petición si está activa."""
+    if not app.config['INSTRUMENTACION_SQL']:
+        return
+
+    if not event.contains(Engine, 'before_cursor_execute', _antes_de_ejecutar):
+        event.listen(Engine, 'before_cursor_execute', _antes_de_ejecutar)
+        event.listen(Engine, 'after_cursor_execute', _despues_de_ejecutar)
+
+    @app.before_request
+    def iniciar_medicion():
+        g.instrumentacion = {'consultas': 0, 'db': 0.0, 'inicio': perf_counter()}
+
+    @app.after_request
+    def emitir_medicion(response):
+        medicion = medicion_actual()
+        if medicion is None:
+            return response
+
+        db_ms = medicion['db'] * 1000
+        app_ms = (perf_counter() - medicion['inicio']) * 1000
+        response.headers['Server-Timing'] = (
+            f'db;dur={db_ms:.1f}, db-count;desc="{medicion["consultas"]}", app;dur={app_ms:.1f}'
+        )
+        app.logger.info('peticion', extra={
+            'evento': 'peticion',
+            'metodo': request.method,
+            'ruta': request.path,
+            'endpoint': request.endpoint,
+            'estado': response.status_code,
+            'consultas': medicion['consultas'],
+            'db_ms': round(db_ms, 1),
+            'app_ms': round(app_ms, 1),
+        })
+        return response
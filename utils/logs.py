@@ -0,0 +1,165 @@
+"""
+Logging estructurado con id de petición
+Sistema de Inventario IUCA
+
+Todos los loggers (app, utils.*, routes.*, sqlalchemy, werkzeug) escriben
+en un QueueHandler del logger raíz: la petición solo encola el registro y
+un hilo (QueueListener) le da formato y lo escribe en stderr. Así un
+stdout/stderr lento no frena a los workers.
+
+Formato según LOGS_FORMATO:
+
+    json    una línea JSON por registro (fecha, nivel, logger, mensaje,
+            request_id, campos de `extra` y traza de la excepción)
+    texto   línea legible para desarrollo, con los `extra` como clave=valor
+
+Cada petición recibe un id: el header `X-Request-ID` del balanceador si
+es válido, o uno nuevo. Se guarda en g.request_id, se agrega a todos los
+registros emitidos durante la petición y vuelve en la respuesta.
+
+Niveles: LOGS_NIVEL para el raíz y LOGS_NIVELES para módulos concretos,
+ej. `utils.concurrency=DEBUG,sqlalchemy.engine=INFO`.
+
+El hilo del listener no sobrevive a un fork: con gunicorn, crear la app
+en cada worker (sin preload_app), que es lo que hace gunicorn.conf.py.
+"""
+
+import atexit
+import json
+import logging
+import queue
+import re
+import sys
+import uuid
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from flask import g, has_request_context, request
+from flask.logging import default_handler
+
+HEADER_REQUEST_ID = 'X-Request-ID'
+_REQUEST_ID_VALIDO = re.compile(r'^[A-Za-z0-9._:-]{1,64}$')
+
+# Atributos propios de LogRecord; lo demás viene de `extra`
+_ATRIBUTOS_BASE = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'request_id'}
+
+_estado = {'listener': None, 'handler': None}
+
+
+def _extras(record: logging.LogRecord) -> dict:
+    return {k: v for k, v in vars(record).items() if k not in _ATRIBUTOS_BASE}
+
+
+class FormatoJSON(logging.Formatter):
+    """Una línea JSON por registro."""
+
+    def format(self, record):
+        datos = {
+            'fecha': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'mensaje': record.getMessage(),
+            'request_id': getattr(record, 'request_id', None),
+            **_extras(record),
+        }
+        if record.exc_text:
+            datos['excepcion'] = record.exc_text
+        return json.dumps(datos, ensure_ascii=False, default=str)
+
+
+class FormatoTexto(logging.Formatter):
+    """Formato legible; los campos de `extra` van al final como clave=valor."""
+
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)-7s [%(request_id)s] %(name)s: %(message)s')
+
+    def format(self, record):
+        if not hasattr(record, 'request_id'):
+            record.request_id = '-'
+        linea = super().format(record)
+        extras = _extras(record)
+        if extras:
+            linea += ' ' + ' '.join(f'{k}={v}' for k, v in extras.items())
+        return linea
+
+
+class FiltroPeticion(logging.Filter):
+    """Agrega request_id al registro; corre en el hilo que emite, donde existe `g`."""
+
+    def filter(self, record):
+        if has_request_context():
+            record.request_id = g.get('request_id')
+        return True
+
+
+class ManejadorCola(QueueHandler):
+    """
+    QueueHandler que deja el mensaje ya interpolado y la traza como texto,
+    sin dársela formateada al mensaje: el formato final lo pone el listener.
+    """
+
+    def prepare(self, record):
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _aplicar_niveles(nivel: str, por_modulo: str) -> None:
+    logging.getLogger().setLevel(nivel.upper())
+    for par in filter(None, (p.strip() for p in por_modulo.split(','))):
+        modulo, _, nivel_modulo = par.partition('=')
+        if not nivel_modulo:
+            raise ValueError(f'LOGS_NIVELES: se esperaba modulo=NIVEL, no "{par}"')
+        logging.getLogger(modulo.strip()).setLevel(nivel_modulo.strip().upper())
+
+
+def _detener_listener() -> None:
+    if _estado['listener'] is not None:
+        _estado['listener'].stop()
+        _estado['listener'] = None
+
+
+# ── API del módulo ───────────────────────────────────────────────────────────
+
+def configurar_logs(app) -> None:
+    """Instala el handler en cola, los niveles y el id por petición."""
+    raiz = logging.getLogger()
+
+    # create_app puede llamarse varias veces (pruebas, CLI): se reemplaza
+    # el handler anterior en lugar de acumularlos
+    _detener_listener()
+    if _estado['handler'] is not None:
+        raiz.removeHandler(_estado['handler'])
+
+    destino = logging.StreamHandler(sys.stderr)
+    destino.setFormatter(FormatoJSON() if app.config['LOGS_FORMATO'] == 'json' else FormatoTexto())
+
+    cola = queue.SimpleQueue()
+    handler = ManejadorCola(cola)
+    handler.addFilter(FiltroPeticion())
+    raiz.addHandler(handler)
+    _estado['handler'] = handler
+
+    _estado['listener'] = QueueListener(cola, destino, respect_handler_level=True)
+    _estado['listener'].start()
+
+    _aplicar_niveles(app.config['LOGS_NIVEL'], app.config['LOGS_NIVELES'])
+    # app.logger propaga al raíz; sin esto Flask escribiría directo en stderr
+    app.logger.removeHandler(default_handler)
+
+    @app.before_request
+    def asignar_request_id():
+        entrante = request.headers.get(HEADER_REQUEST_ID, '')
+        g.request_id = entrante if _REQUEST_ID_VALIDO.match(entrante) else uuid.uuid4().hex
+
+    @app.after_request
+    def devolver_request_id(response):
+        if 'request_id' in g:
+            response.headers[HEADER_REQUEST_ID] = g.request_id
+        return response
+
+
+atexit.register(_detener_listener)
@@ -0,0 +1,122 @@
+"""
+Métricas en formato Prometheus
+Sistema de Inventario IUCA
+
+Con METRICAS_HABILITADAS=True, GET /api/health/metrics expone en formato
+de texto de Prometheus:
+
+    iuca_http_peticion_segundos      histograma por blueprint/endpoint/método
+    iuca_http_respuestas_total       respuestas por blueprint/endpoint/estado
+    iuca_db_pool_conexiones          conexiones del pool (en_uso / overflow / tamano)
+    iuca_bloqueos_total              crear_bloqueo() por tabla/tipo/resultado
+    iuca_login_total                 intentos de login por resultado
+    iuca_bcrypt_segundos             duración de bcrypt (verificar / hashear)
+
+Multiproceso (gunicorn): si PROMETHEUS_MULTIPROC_DIR está definida antes
+de arrancar, cada worker escribe sus valores en ese directorio y el
+endpoint los agrega con MultiProcessCollector, sin importar qué worker
+atienda el scrape. gunicorn.conf.py limpia el directorio al arrancar y
+marca los workers que terminan. Sin la variable se usa el registro del
+proceso (servidor de desarrollo).
+
+Vienen desactivadas. Al habilitarlas es obligatorio METRICAS_TOKEN: el
+endpoint exige `Authorization: Bearer <token>` (el scraper no maneja JWT
+de usuario), porque expone endpoints, fallos de login y estado del pool.
+
+Los gauges del pool se toman al hacer el scrape y al cerrar el contexto
+de cada petición, ya devuelta su conexión; en after_request la conexión
+de la propia petición todavía contaría como en uso.
+"""
+
+import os
+from time import perf_counter
+from flask import g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram,
+    REGISTRY, generate_latest, multiprocess,
+)
+from utils.extesions import db
+
+_BUCKETS_HTTP = (.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10)
+_BUCKETS_BCRYPT = (.05, .1, .2, .3, .5, .75, 1, 2)
+
+PETICION_SEGUNDOS = Histogram(
+    'iuca_http_peticion_segundos', 'Duración de las peticiones HTTP',
+    ('blueprint', 'endpoint', 'metodo'), buckets=_BUCKETS_HTTP,
+)
+RESPUESTAS = Counter(
+    'iuca_http_respuestas_total', 'Respuestas HTTP por código de estado',
+    ('blueprint', 'endpoint', 'estado'),
+)
+POOL_CONEXIONES = Gauge(
+    'iuca_db_pool_conexiones', 'Conexiones del pool de SQLAlchemy',
+    ('estado',), multiprocess_mode='livesum',
+)
+BLOQUEOS = Counter(
+    'iuca_bloqueos_total', 'Solicitudes de bloqueo por resultado',
+    ('tabla', 'tipo', 'resultado'),
+)
+LOGINS = Counter(
+    'iuca_login_total', 'Intentos de inicio de sesión por resultado',
+    ('endpoint', 'resultado'),
+)
+BCRYPT_SEGUNDOS = Histogram(
+    'iuca_bcrypt_segundos', 'Duración de las operaciones de bcrypt',
+    ('operacion',), buckets=_BUCKETS_BCRYPT,
+)
+
+
+def actualizar_pool() -> None:
+    """Copia el estado del pool del engine a los gauges del proceso."""
+    pool = db.engine.pool
+    if not hasattr(pool, 'checkedout'):  # pools sin contadores (sqlite en pruebas)
+        return
+    POOL_CONEXIONES.labels('en_uso').set(pool.checkedout())
+    POOL_CONEXIONES.labels('overflow').set(max(pool.overflow(), 0))
+    POOL_CONEXIONES.labels('tamano').set(pool.size())
+
+
+def exposicion() -> tuple[bytes, str]:
+    """Cuerpo y Content-Type de la respuesta del endpoint de métricas."""
+    actualizar_pool()
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registro = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registro)
+    else:
+        registro = REGISTRY
+    return generate_latest(registro), CONTENT_TYPE_LATEST
+
+
+def registrar_metricas(app) -> None:
+    """Conecta los hooks de petición si METRICAS_HABILITADAS está activo."""
+    if not app.config['METRICAS_HABILITADAS']:
+        return
+    if not app.config['METRICAS_TOKEN']:
+        raise ValueError('METRICAS_HABILITADAS=True requiere METRICAS_TOKEN')
+
+    @app.before_request
+    def iniciar_metricas():
+        g.metricas_inicio = perf_counter()
+
+    @app.after_request
+    def registrar_peticion(response):
+        inicio = g.pop('metricas_inicio', None)
+        if inicio is None:
+            return response
+
+        # Rutas inexistentes van juntas para no crear una serie por URL
+        blueprint = request.blueprint or ''
+        endpoint = request.endpoint or 'sin_ruta'
+        PETICION_SEGUNDOS.labels(blueprint, endpoint, request.method).observe(
+            perf_counter() - inicio
+        )
+        RESPUESTAS.labels(blueprint, endpoint, str(response.status_code)).inc()
+        return response
+
+    @app.teardown_appcontext
+    def muestrear_pool(_exc):
+        # Los teardown corren en orden inverso al registro, así que el de
+        # Flask-SQLAlchemy (que devuelve la conexión) vendría después:
+        # se cierra la sesión aquí (remove() es idempotente) antes de medir
+        db.session.remove()
+        actualizar_pool()
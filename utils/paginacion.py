@@ -0,0 +1,161 @@
+"""
+Paginación de listados con estrategia de conteo configurable
+Sistema de Inventario IUCA
+
+paginar() sustituye a Query.paginate(): trae una fila extra para saber
+si hay página siguiente sin depender del total, y delega el total a
+utils.conteo.contar() según el parámetro ?count= de la petición.
+
+paginar_por_cursor() es la alternativa keyset para tablas que solo
+crecen (historial): en lugar de OFFSET filtra a partir de la última
+fila vista, codificada en un cursor opaco.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from math import ceil
+from flask import request
+from sqlalchemy import tuple_
+from utils.conteo import contar
+
+
+class Pagina:
+    """Resultado de paginar(); expone los mismos atributos que Pagination."""
+
+    __slots__ = ('items', 'page', 'per_page', 'total', 'total_estimado', 'has_next')
+
+    def __init__(self, items, page, per_page, total, total_estimado, has_next):
+        self.items = items
+        self.page = page
+        self.per_page = per_page
+        self.total = total
+        self.total_estimado = total_estimado
+        self.has_next = has_next
+
+    @property
+    def pages(self):
+        if self.total is None:
+            return None
+        return ceil(self.total / self.per_page) if self.total else 0
+
+    @property
+    def has_prev(self) -> bool:
+        return self.page > 1
+
+
+def paginar(query, page: int, per_page: int) -> Pagina:
+    """
+    Pagina un Query con OFFSET y obtiene el total con la estrategia
+    pedida en ?count= (auto, exact, estimate, none).
+
+    Igual que paginate(error_out=False), corrige page y per_page inválidos.
+    """
+    if page is None or page < 1:
+        page = 1
+    if per_page is None or per_page < 1:
+        per_page = 20
+
+    filas = query.limit(per_page + 1).offset((page - 1) * per_page).all()
+    total, estimado = contar(query, request.args.get('count', 'auto'))
+
+    return Pagina(
+        items=filas[:per_page],
+        page=page,
+        per_page=per_page,
+        total=total,
+        total_estimado=estimado,
+        has_next=len(filas) > per_page,
+    )
+
+
+# ── Paginación por cursor (keyset) ───────────────────────────────────────────
+
+class PaginaCursor:
+    """Resultado de paginar_por_cursor()."""
+
+    __slots__ = ('items', 'per_page', 'next_cursor')
+
+    def __init__(self, items, per_page, next_cursor):
+        self.items = items
+        self.per_page = per_page
+        self.next_cursor = next_cursor
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+
+def codificar_cursor(valores) -> str:
+    """Serializa los valores de la clave de orden en un token opaco (base64url)."""
+    crudo = json.dumps([
+        v.isoformat() if isinstance(v, datetime) else v
+        for v in valores
+    ], separators=(',', ':'))
+    return base64.urlsafe_b64encode(crudo.encode()).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor: str, columnas) -> tuple:
+    """
+    Inverso de codificar_cursor(); convierte cada valor al tipo Python de
+    su columna. Lanza ValueError si el token no es válido.
+    """
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        if not isinstance(valores, list) or len(valores) != len(columnas):
+            raise ValueError
+        return tuple(
+            datetime.fromisoformat(v) if columna.type.python_type is datetime
+            else columna.type.python_type(v)
+            for columna, v in zip(columnas, valores)
+        )
+    except (ValueError, TypeError, binascii.Error, NotImplementedError):
+        raise ValueError('Cursor inválido')
+
+
+def paginar_por_cursor(query, columnas, cursor: str, per_page: int) -> PaginaCursor:
+    """
+    Pagina un Query en orden descendente por `columnas` (la última debe ser
+    única, p. ej. la PK) usando comparación de tuplas en lugar de OFFSET:
+    el costo por página no crece con la profundidad.
+
+    cursor vacío → primera página. Lanza ValueError si el cursor es inválido.
+    """
+    filas = filtrar_por_cursor(query, columnas, cursor, per_page).all()
+    return pagina_por_cursor(filas, columnas, per_page)
+
+
+def _per_page_cursor(per_page) -> int:
+    return per_page if per_page is not None and per_page >= 1 else 20
+
+
+def filtrar_por_cursor(query, columnas, cursor: str, per_page: int):
+    """
+    Primera mitad de paginar_por_cursor(): el Query filtrado, ordenado y
+    limitado a per_page + 1 filas, sin ejecutar (lo usan las vistas async).
+    """
+    per_page = _per_page_cursor(per_page)
+
+    if cursor:
+        valores = decodificar_cursor(cursor, columnas)
+        query = query.filter(tuple_(*columnas) < tuple_(*valores))
+
+    return (
+        query.order_by(None)
+        .order_by(*(columna.desc() for columna in columnas))
+        .limit(per_page + 1)
+    )
+
+
+def pagina_por_cursor(filas, columnas, per_page: int) -> PaginaCursor:
+    """Segunda mitad de paginar_por_cursor(): arma la página y el siguiente cursor."""
+    per_page = _per_page_cursor(per_page)
+
+    siguiente = None
+    if len(filas) > per_page:
+        ultima = filas[per_page - 1]
+        siguiente = codificar_cursor([getattr(ultima, c.key) for c in columnas])
+
+    return PaginaCursor(filas[:per_page], per_page, siguiente)
@@ -0,0 +1,232 @@
+"""
+Mantenimiento de las particiones mensuales de historial
+Sistema de Inventario IUCA
+
+historial está particionada por RANGE (fecha) con una partición por mes
+(historial_pAAAA_MM) y una DEFAULT de respaldo; ver
+migrations/002_historial_particionado.sql.
+
+Comandos (Flask CLI):
+    flask --app app historial particiones
+    flask --app app historial crear-particiones [--meses 3]
+    flask --app app historial archivar [--retener-meses 24] [--dry-run]
+    flask --app app historial borrar-legacy [--dry-run]
+"""
+
+import re
+from datetime import date
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import text
+from utils.cache_tablas import invalidar
+from utils.extesions import db
+
+TABLA = 'historial'
+PARTICION_DEFAULT = 'historial_default'
+# Copia de la tabla sin particionar que deja la migración 002
+LEGACY = 'historial_archivo.historial_legacy'
+
+_RE_LIMITES = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+# ── Helpers de fechas ────────────────────────────────────────────────────────
+
+def _sumar_meses(fecha: date, meses: int) -> date:
+    total = fecha.year * 12 + (fecha.month - 1) + meses
+    return date(total // 12, total % 12 + 1, 1)
+
+
+def nombre_particion(mes: date) -> str:
+    return f'{TABLA}_p{mes:%Y_%m}'
+
+
+# ── Consultas ────────────────────────────────────────────────────────────────
+
+def listar_particiones() -> list[dict]:
+    """Particiones mensuales actuales, ordenadas por fecha de inicio."""
+    filas = db.session.execute(text("""
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = CAST(:tabla AS regclass)
+    """), {'tabla': TABLA}).all()
+
+    particiones = []
+    for nombre, limites in filas:
+        match = _RE_LIMITES.search(limites or '')
+        if not match:
+            continue  # DEFAULT
+        particiones.append({
+            'nombre': nombre,
+            'desde': date.fromisoformat(match.group(1)[:10]),
+            'hasta': date.fromisoformat(match.group(2)[:10]),
+        })
+    return sorted(particiones, key=lambda p: p['desde'])
+
+
+def crear_particiones(meses_adelante: int = 3) -> list[str]:
+    """
+    Crea las particiones del mes actual y de los `meses_adelante` siguientes
+    que aún no existan. Si la partición DEFAULT ya recibió filas de ese mes,
+    se mueven a la nueva partición antes de adjuntarla.
+
+    Returns:
+        list: nombres de las particiones creadas.
+    """
+    existentes = {p['desde'] for p in listar_particiones()}
+    inicio = date.today().replace(day=1)
+    creadas = []
+
+    for i in range(meses_adelante + 1):
+        desde = _sumar_meses(inicio, i)
+        if desde in existentes:
+            continue
+        hasta = _sumar_meses(desde, 1)
+        nombre = nombre_particion(desde)
+        rango = {'desde': desde, 'hasta': hasta}
+
+        db.session.execute(text(
+            f'CREATE TABLE "{nombre}" (LIKE {TABLA} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+        ))
+        db.session.execute(text(f"""
+            WITH movidas AS (
+                DELETE FROM {PARTICION_DEFAULT}
+                WHERE fecha >= :desde AND fecha < :hasta
+                RETURNING *
+            )
+            INSERT INTO "{nombre}" SELECT * FROM movidas
+        """), rango)
+        db.session.execute(text(
+            f"ALTER TABLE {TABLA} ATTACH PARTITION \"{nombre}\" "
+            f"FOR VALUES FROM ('{desde.isoformat()}') TO ('{hasta.isoformat()}')"
+        ))
+        creadas.append(nombre)
+
+    db.session.commit()
+    if creadas:
+        invalidar(TABLA)
+    return creadas
+
+
+def archivar_particiones(retener_meses: int, esquema: str, dry_run: bool = False) -> list[str]:
+    """
+    Desprende de historial las particiones que terminan antes del inicio de
+    la ventana de retención y las mueve al esquema de archivo. Los datos se
+    conservan, pero dejan de aparecer en vista_historial_completa.
+
+    Returns:
+        list: nombres de las particiones archivadas (o que se archivarían).
+    """
+    limite = _sumar_meses(date.today().replace(day=1), -retener_meses)
+    antiguas = [p['nombre'] for p in listar_particiones() if p['hasta'] <= limite]
+
+    if dry_run or not antiguas:
+        return antiguas
+
+    db.session.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{esquema}"'))
+    for nombre in antiguas:
+        db.session.execute(text(f'ALTER TABLE {TABLA} DETACH PARTITION "{nombre}"'))
+        db.session.execute(text(f'ALTER TABLE "{nombre}" SET SCHEMA "{esquema}"'))
+    db.session.commit()
+    # text() no pasa por los listeners de utils/cache_tablas.py
+    invalidar(TABLA)
+    return antiguas
+
+
+def borrar_legacy(esquema: str, dry_run: bool = False) -> dict:
+    """
+    Borra la copia historial_legacy de la migración 002 si cada una de sus
+    filas está en historial o en una partición archivada en `esquema`.
+
+    Returns:
+        dict: { existe, filas, faltantes, borrada }. Con faltantes > 0 no
+              se borra nada.
+    """
+    if db.session.scalar(text('SELECT to_regclass(:tabla)'), {'tabla': LEGACY}) is None:
+        return {'existe': False, 'filas': 0, 'faltantes': 0, 'borrada': False}
+
+    archivadas = db.session.scalars(text("""
+        SELECT tablename FROM pg_tables
+        WHERE schemaname = :esquema AND tablename ~ '^historial_p[0-9]{4}_[0-9]{2}$'
+    """), {'esquema': esquema}).all()
+    origenes = ' UNION ALL '.join(
+        [f'SELECT id_historial, fecha FROM {TABLA}']
+        + [f'SELECT id_historial, fecha FROM "{esquema}"."{nombre}"' for nombre in archivadas]
+    )
+
+    filas = db.session.scalar(text(f'SELECT count(*) FROM {LEGACY}'))
+    faltantes = db.session.scalar(text(f"""
+        SELECT count(*) FROM {LEGACY} l
+        WHERE NOT EXISTS (
+            SELECT 1 FROM ({origenes}) h
+            WHERE h.id_historial = l.id_historial AND h.fecha = l.fecha
+        )
+    """))
+
+    borrada = not dry_run and faltantes == 0
+    if borrada:
+        db.session.execute(text(f'DROP TABLE {LEGACY}'))
+        db.session.commit()
+    return {'existe': True, 'filas': filas, 'faltantes': faltantes, 'borrada': borrada}
+
+
+# ── Comandos CLI ─────────────────────────────────────────────────────────────
+
+historial_cli = AppGroup('historial', help='Mantenimiento de particiones de historial.')
+
+
+@historial_cli.command('particiones')
+def cmd_listar():
+    """Lista las particiones mensuales de historial."""
+    for p in listar_particiones():
+        click.echo(f"{p['nombre']}\t{p['desde']} → {p['hasta']}")
+
+
+@historial_cli.command('crear-particiones')
+@click.option('--meses', type=int, default=None,
+              help='Meses a crear por adelantado (default: HISTORIAL_MESES_ADELANTE).')
+def cmd_crear(meses):
+    """Crea las particiones del mes actual y de los meses siguientes."""
+    if meses is None:
+        meses = current_app.config['HISTORIAL_MESES_ADELANTE']
+    creadas = crear_particiones(meses)
+    click.echo('\n'.join(creadas) if creadas else 'Sin particiones nuevas.')
+
+
+@historial_cli.command('archivar')
+@click.option('--retener-meses', type=int, default=None,
+              help='Meses que permanecen en historial (default: HISTORIAL_RETENCION_MESES).')
+@click.option('--dry-run', is_flag=True, help='Solo muestra qué particiones se archivarían.')
+def cmd_archivar(retener_meses, dry_run):
+    """Mueve las particiones fuera de la retención al esquema de archivo."""
+    if retener_meses is None:
+        retener_meses = current_app.config['HISTORIAL_RETENCION_MESES']
+    esquema = current_app.config['HISTORIAL_ESQUEMA_ARCHIVO']
+    archivadas = archivar_particiones(retener_meses, esquema, dry_run=dry_run)
+
+    if not archivadas:
+        click.echo('Sin particiones para archivar.')
+        return
+    prefijo = '[dry-run] ' if dry_run else ''
+    for nombre in archivadas:
+        click.echo(f'{prefijo}{nombre} → {esquema}')
+
+
+@historial_cli.command('borrar-legacy')
+@click.option('--dry-run', is_flag=True, help='Solo verifica, no borra.')
+def cmd_borrar_legacy(dry_run):
+    """Borra historial_legacy (migración 002) si ya no tiene filas propias."""
+    resultado = borrar_legacy(current_app.config['HISTORIAL_ESQUEMA_ARCHIVO'], dry_run=dry_run)
+
+    if not resultado['existe']:
+        click.echo(f'{LEGACY} no existe.')
+        return
+    if resultado['faltantes']:
+        raise click.ClickException(
+            f"{resultado['faltantes']} de {resultado['filas']} filas de {LEGACY} no están en "
+            f"{TABLA} ni en las particiones archivadas; no se borra."
+        )
+    prefijo = '[dry-run] ' if dry_run else ''
+    accion = 'se puede borrar' if dry_run else 'borrada'
+    click.echo(f"{prefijo}{LEGACY} ({resultado['filas']} filas, todas copiadas) {accion}.")
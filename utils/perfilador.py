@@ -0,0 +1,240 @@
+"""
+Perfilado bajo demanda de una petición (solo administradores)
+Sistema de Inventario IUCA
+
+Una petición con `?perfilar=1` o el header `X-Perfilar: 1`, hecha por un
+acceso con permiso de lectura en el módulo `acceso`, se ejecuta con un
+muestreador: un hilo que cada PERFILADOR_INTERVALO_MS toma la pila del
+hilo de la petición (sys._current_frames). Sin el flag, o sin permiso,
+la petición sigue igual y el único costo es leer el flag. Desactivado por
+defecto: se activa con PERFILADOR_HABILITADO=True.
+
+El perfil se guarda en un buffer por proceso (PERFILADOR_MAX) y la
+respuesta lleva `X-Perfil-Id`; GET /api/health/perfiles/<id> lo devuelve
+en formato speedscope (https://www.speedscope.app). Con `perfilar=descargar`
+la respuesta de la petición se reemplaza directamente por ese archivo.
+
+Cada perfil incluye un resumen del tiempo por categoría, según el primer
+marco reconocible desde la hoja de cada muestra:
+
+    sql             esperando a la BD (do_execute / executemany)
+    orm             SQLAlchemy: armado de consultas, hidratación, lazy loads
+    serializacion   to_dict(), serializador_vistas y jsonify
+    otro            el resto (Flask, validaciones, código de la ruta)
+
+El GIL limita la resolución en código puro Python a ~5 ms (el intervalo de
+cambio de hilo); las esperas de E/S (BD) se muestrean sin ese límite.
+"""
+
+import itertools
+import json
+import sys
+import threading
+from collections import Counter, deque
+from datetime import datetime
+from time import perf_counter
+from flask import Response, g, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+
+_FUNCIONES_SQL = {'do_execute', 'do_executemany', 'do_execute_no_params'}
+_FUNCIONES_SERIALIZACION = {'to_dict', 'to_dict_detallado', 'jsonify', 'dumps'}
+
+_ajustes = {'intervalo': 0.005}
+_perfiles = deque(maxlen=20)
+_ids = itertools.count(1)
+# Un perfil a la vez: dos muestreadores se estorbarían por el GIL
+_en_curso = threading.Lock()
+
+
+class Muestreador(threading.Thread):
+    """Toma la pila de un hilo cada `intervalo` segundos hasta detener()."""
+
+    def __init__(self, hilo_id: int, intervalo: float):
+        super().__init__(name='perfilador', daemon=True)
+        self.hilo_id = hilo_id
+        self.intervalo = intervalo
+        self.marcos = []    # [{ name, file, line }] compartidos entre muestras
+        self.indices = {}
+        self.muestras = []  # índices de marcos, raíz → hoja
+        self.pesos = []     # ms desde la muestra anterior
+        self._detener = threading.Event()
+
+    def run(self):
+        anterior = perf_counter()
+        while not self._detener.wait(self.intervalo):
+            marco = sys._current_frames().get(self.hilo_id)
+            ahora = perf_counter()
+            if marco is None:
+                continue
+            self.muestras.append(self._pila(marco))
+            self.pesos.append((ahora - anterior) * 1000)
+            anterior = ahora
+
+    def detener(self) -> None:
+        self._detener.set()
+        self.join()
+
+    def _pila(self, marco) -> list[int]:
+        pila = []
+        while marco is not None:
+            codigo = marco.f_code
+            nombre = getattr(codigo, 'co_qualname', codigo.co_name)
+            clave = (nombre, codigo.co_filename, codigo.co_firstlineno)
+            indice = self.indices.get(clave)
+            if indice is None:
+                indice = self.indices[clave] = len(self.marcos)
+                self.marcos.append({
+                    'name': nombre,
+                    'file': codigo.co_filename,
+                    'line': codigo.co_firstlineno,
+                })
+            pila.append(indice)
+            marco = marco.f_back
+        pila.reverse()
+        return pila
+
+
+def _categoria(marcos: list[dict], pila: list[int]) -> str:
+    for indice in reversed(pila):
+        marco = marcos[indice]
+        funcion = marco['name'].rsplit('.', 1)[-1]
+        if funcion in _FUNCIONES_SQL:
+            return 'sql'
+        if 'sqlalchemy' in marco['file']:
+            return 'orm'
+        if funcion in _FUNCIONES_SERIALIZACION or marco['file'].endswith('serializador_vistas.py'):
+            return 'serializacion'
+    return 'otro'
+
+
+def _speedscope(muestreador: Muestreador, nombre: str) -> dict:
+    return {
+        '$schema': 'https://www.speedscope.app/file-format-schema.json',
+        'name': nombre,
+        'exporter': 'iuca-perfilador',
+        'activeProfileIndex': 0,
+        'shared': {'frames': muestreador.marcos},
+        'profiles': [{
+            'type': 'sampled',
+            'name': nombre,
+            'unit': 'milliseconds',
+            'startValue': 0,
+            'endValue': round(sum(muestreador.pesos), 3),
+            'samples': muestreador.muestras,
+            'weights': [round(p, 3) for p in muestreador.pesos],
+        }],
+    }
+
+
+def _puede_perfilar() -> int | None:
+    """ID del acceso si tiene permiso de lectura en `acceso`; si no, None."""
+    # app importa este módulo; models importa app (db): import diferido
+    from models import Permiso
+
+    try:
+        verify_jwt_in_request(optional=True)
+        identidad = get_jwt_identity()
+    except Exception:
+        return None
+    if not identidad:
+        return None
+    permiso = Permiso.query.filter_by(acceso_id=int(identidad), modulo='acceso').first()
+    return int(identidad) if permiso and permiso.puede_leer else None
+
+
+# ── API del módulo ───────────────────────────────────────────────────────────
+
+def registrar_perfilador(app) -> None:
+    """Conecta los hooks de petición si PERFILADOR_HABILITADO está activo."""
+    global _perfiles
+    if not app.config['PERFILADOR_HABILITADO']:
+        return
+
+    _ajustes['intervalo'] = app.config['PERFILADOR_INTERVALO_MS'] / 1000
+    _perfiles = deque(_perfiles, maxlen=app.config['PERFILADOR_MAX'])
+
+    @app.before_request
+    def iniciar_perfil():
+        modo = request.args.get('perfilar') or request.headers.get('X-Perfilar')
+        if not modo:
+            return
+        usuario_id = _puede_perfilar()
+        if usuario_id is None or not _en_curso.acquire(blocking=False):
+            return
+
+        muestreador = Muestreador(threading.get_ident(), _ajustes['intervalo'])
+        g.perfil = {
+            'muestreador': muestreador,
+            'modo': modo,
+            'usuario_id': usuario_id,
+            'inicio': perf_counter(),
+        }
+        muestreador.start()
+
+    @app.after_request
+    def terminar_perfil(response):
+        perfil = g.pop('perfil', None)
+        if perfil is None:
+            return response
+
+        muestreador = perfil['muestreador']
+        muestreador.detener()
+        _en_curso.release()
+        duracion = (perf_counter() - perfil['inicio']) * 1000
+
+        tiempos = Counter()
+        for pila, peso in zip(muestreador.muestras, muestreador.pesos):
+            tiempos[_categoria(muestreador.marcos, pila)] += peso
+
+        nombre = f'{request.method} {request.full_path.rstrip("?")}'
+        registro = {
+            'id': next(_ids),
+            'fecha': datetime.now().isoformat(),
+            'peticion': nombre,
+            'endpoint': request.endpoint,
+            'estado': response.status_code,
+            'usuario_id': perfil['usuario_id'],
+            'duracion_ms': round(duracion, 1),
+            'muestras': len(muestreador.muestras),
+            'resumen_ms': {c: round(t, 1) for c, t in tiempos.most_common()},
+            'speedscope': _speedscope(muestreador, nombre),
+        }
+        _perfiles.append(registro)
+
+        if perfil['modo'] == 'descargar':
+            response = Response(
+                json.dumps(registro['speedscope']),
+                mimetype='application/json',
+                headers={
+                    'Content-Disposition':
+                        f'attachment; filename=perfil-{registro["id"]}.speedscope.json',
+                },
+            )
+        response.headers['X-Perfil-Id'] = str(registro['id'])
+        return response
+
+    @app.teardown_request
+    def liberar_perfil(_exc):
+        # Si la petición terminó sin pasar por after_request
+        perfil = g.pop('perfil', None)
+        if perfil is not None:
+            perfil['muestreador'].detener()
+            _en_curso.release()
+
+
+def perfiles() -> list[dict]:
+    """Perfiles guardados sin el árbol, del más reciente al más antiguo."""
+    return [
+        {k: v for k, v in p.items() if k != 'speedscope'}
+        for p in reversed(_perfiles)
+    ]
+
+
+def perfil(perfil_id: int) -> dict | None:
+    return next((p for p in _perfiles if p['id'] == perfil_id), None)
+
+
+def limpiar_perfiles() -> int:
+    total = len(_perfiles)
+    _perfiles.clear()
+    return total
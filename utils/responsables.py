@@ -7,12 +7,32 @@ los que ya no corresponden e insertando solo los que faltan.
 Funciona con cualquier modelo de asignación (EquipoResponsable,
 MobiliarioResponsable) gracias a los parámetros campo_entidad
 y campo_usuario.
+
+La sincronización es por conjuntos: sin importar cuántos responsables
+cambien, cuesta una consulta IN para validar usuarios más las sentencias
+fijas de utils.colecciones.sincronizar_coleccion() (DELETE por IDs e
+INSERT ... ON CONFLICT DO NOTHING). Las sentencias corren en la misma
+transacción que el endpoint, así que los triggers de historial registran
+cada fila con el usuario de la petición.
 """
 
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from models import Usuario
+from utils.colecciones import sincronizar_coleccion
 from utils.extesions import db
 
 
+def usuarios_existentes(ids) -> set[int]:
+    """IDs de `ids` que existen en usuario (una sola consulta)."""
+    ids = {int(i) for i in ids}
+    if not ids:
+        return set()
+    return set(db.session.scalars(
+        select(Usuario.id_usuario).where(Usuario.id_usuario.in_(ids))
+    ))
+
+
 def sync_responsables(
     modelo_asignacion,
     entidad_id: int,
@@ -37,28 +57,53 @@ def sync_responsables(
                            en el modelo de asignación. Por defecto
                            'usuario_id'.
 
+    Los IDs que no corresponden a un usuario existente se ignoran.
     La función no llama a db.session.commit(); el commit lo realiza
     el endpoint para mantener la operación dentro de la misma transacción.
     """
-    nuevos = set(int(i) for i in nuevos_ids)
+    validos = usuarios_existentes(nuevos_ids)
+    sincronizar_coleccion(
+        modelo_asignacion, campo_entidad, entidad_id,
+        [{campo_usuario: usuario_id} for usuario_id in sorted(validos)],
+        clave=(campo_usuario,),
+        ignorar_conflictos=True,
+    )
+
+
+def sync_responsables_masivo(
+    modelo_asignacion,
+    entidades_ids,
+    nuevos_ids,
+    campo_entidad: str,
+    campo_usuario: str = 'usuario_id',
+) -> None:
+    """
+    Deja exactamente `nuevos_ids` como responsables de cada activo de
+    `entidades_ids` con tres sentencias: validación IN, un DELETE de las
+    asignaciones que sobran y un INSERT ... ON CONFLICT DO NOTHING.
+    """
+    entidades = {int(i) for i in entidades_ids}
+    if not entidades:
+        return
 
-    actuales = modelo_asignacion.query.filter_by(
-        **{campo_entidad: entidad_id}
-    ).all()
-    actuales_ids = {getattr(r, campo_usuario) for r in actuales}
+    validos = usuarios_existentes(nuevos_ids)
+    columna_entidad = getattr(modelo_asignacion, campo_entidad)
+    columna_usuario = getattr(modelo_asignacion, campo_usuario)
 
     # Eliminar asignaciones que ya no están en la lista nueva
-    ids_a_eliminar = actuales_ids - nuevos
-    for registro in actuales:
-        if getattr(registro, campo_usuario) in ids_a_eliminar:
-            db.session.delete(registro)
+    eliminar = delete(modelo_asignacion).where(columna_entidad.in_(entidades))
+    if validos:
+        eliminar = eliminar.where(columna_usuario.not_in(validos))
+    db.session.execute(eliminar, execution_options={'synchronize_session': False})
 
-    # Insertar solo las asignaciones que aún no existen
-    ids_a_agregar = nuevos - actuales_ids
-    for usuario_id in ids_a_agregar:
-        if Usuario.query.get(usuario_id):
-            db.session.add(
-                modelo_asignacion(
-                    **{campo_entidad: entidad_id, campo_usuario: usuario_id}
-                )
-            )
\ No newline at end of file
+    # Insertar las faltantes; las que ya existen chocan con el UNIQUE y se omiten
+    if validos:
+        db.session.execute(
+            pg_insert(modelo_asignacion)
+            .values([
+                {campo_entidad: entidad, campo_usuario: usuario}
+                for entidad in sorted(entidades)
+                for usuario in sorted(validos)
+            ])
+            .on_conflict_do_nothing(index_elements=[campo_entidad, campo_usuario])
+        )
@@ -0,0 +1,133 @@
+"""
+Agregados del tablero de inventario
+Sistema de Inventario IUCA
+
+Conteos de activos por estado, tipo, sucursal, área y responsable,
+calculados con GROUP BY sobre las tablas base (no sobre las vistas, que
+arman JSON de responsables por fila). Cada sección se guarda en una
+CacheTablas que se invalida cuando se escribe en cualquiera de sus tablas.
+"""
+
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import distinct, func, select
+from models import (
+    CatArea,
+    CatEstado,
+    CatTipoActivo,
+    CatTipoMobiliario,
+    EquipoComputo,
+    EquipoResponsable,
+    Mobiliario,
+    MobiliarioResponsable,
+    Usuario,
+)
+from utils.cache_tablas import CacheTablas
+from utils.extesions import db
+
+# sección → (módulo de permisos, modelo, columna FK de tipo, modelo de tipo, asignación, FK de asignación)
+SECCIONES = {
+    'equipos': (
+        'computo', EquipoComputo, EquipoComputo.tipo_activo_id,
+        CatTipoActivo, EquipoResponsable, EquipoResponsable.equipo_id,
+    ),
+    'mobiliario': (
+        'mobiliario', Mobiliario, Mobiliario.tipo_mobiliario_id,
+        CatTipoMobiliario, MobiliarioResponsable, MobiliarioResponsable.mueble_id,
+    ),
+}
+
+_cache_resumen = CacheTablas(max_entradas=8)
+
+
+def resumen_seccion(seccion: str) -> dict:
+    """Agregados de una sección ('equipos' o 'mobiliario'), cacheados."""
+    _, modelo, _, modelo_tipo, modelo_asignacion, _ = SECCIONES[seccion]
+    tablas = frozenset({
+        modelo.__tablename__, modelo_tipo.__tablename__, modelo_asignacion.__tablename__,
+        CatEstado.__tablename__, Usuario.__tablename__, CatArea.__tablename__,
+    })
+
+    resumen = _cache_resumen.obtener(seccion, tablas)
+    if resumen is CacheTablas.FALTA:
+        resumen = _calcular(seccion)
+        _cache_resumen.guardar(
+            seccion, tablas, resumen,
+            ttl=current_app.config['RESUMEN_CACHE_TTL'],
+        )
+    return resumen
+
+
+def _filas(sentencia, *claves) -> list[dict]:
+    return [dict(zip(claves, fila)) for fila in db.session.execute(sentencia)]
+
+
+def _calcular(seccion: str) -> dict:
+    _, modelo, columna_tipo, modelo_tipo, modelo_asignacion, columna_entidad = SECCIONES[seccion]
+    clave = modelo.__mapper__.primary_key[0]
+    tipo_id = modelo_tipo.__mapper__.primary_key[0]
+    total = func.count(clave).label('total')
+
+    por_estado = _filas(
+        select(CatEstado.id_estado, CatEstado.nombre_estado, CatEstado.color_hex, total)
+        .select_from(modelo)
+        .outerjoin(CatEstado, modelo.estado_id == CatEstado.id_estado)
+        .group_by(CatEstado.id_estado, CatEstado.nombre_estado, CatEstado.color_hex)
+        .order_by(total.desc()),
+        'id_estado', 'estado', 'color', 'total',
+    )
+
+    por_tipo = _filas(
+        select(tipo_id, modelo_tipo.nombre_tipo, total)
+        .select_from(modelo)
+        .outerjoin(modelo_tipo, columna_tipo == tipo_id)
+        .group_by(tipo_id, modelo_tipo.nombre_tipo)
+        .order_by(total.desc()),
+        'id_tipo', 'tipo', 'total',
+    )
+
+    por_sucursal = _filas(
+        select(modelo.sucursal_nombre, total)
+        .group_by(modelo.sucursal_nombre)
+        .order_by(total.desc()),
+        'sucursal', 'total',
+    )
+
+    # Un activo con varios responsables cuenta una vez por responsable / área
+    asignados = func.count(distinct(columna_entidad)).label('total')
+
+    por_responsable = _filas(
+        select(Usuario.id_usuario, Usuario.nombre_usuario, asignados)
+        .select_from(modelo_asignacion)
+        .join(Usuario, modelo_asignacion.usuario_id == Usuario.id_usuario)
+        .group_by(Usuario.id_usuario, Usuario.nombre_usuario)
+        .order_by(asignados.desc()),
+        'id_usuario', 'responsable', 'total',
+    )
+
+    por_area = _filas(
+        select(CatArea.id_area, CatArea.nombre_area, asignados)
+        .select_from(modelo_asignacion)
+        .join(Usuario, modelo_asignacion.usuario_id == Usuario.id_usuario)
+        .outerjoin(CatArea, Usuario.area_id == CatArea.id_area)
+        .group_by(CatArea.id_area, CatArea.nombre_area)
+        .order_by(asignados.desc()),
+        'id_area', 'area', 'total',
+    )
+
+    sin_responsable = db.session.scalar(
+        select(func.count(clave)).where(
+            ~select(columna_entidad).where(columna_entidad == clave).exists()
+        )
+    )
+
+    return {
+        'total': sum(fila['total'] for fila in por_estado),
+        'sin_responsable': sin_responsable,
+        'por_estado': por_estado,
+        'por_tipo': por_tipo,
+        'por_sucursal': por_sucursal,
+        'por_area': por_area,
+        'por_responsable': por_responsable,
+        'calculado_en': datetime.now().isoformat(),
+    }
@@ -0,0 +1,156 @@
+"""
+Comprobaciones de readiness para el balanceador
+Sistema de Inventario IUCA
+
+GET /api/health/ sigue siendo la prueba de vida (no toca la BD).
+GET /api/health/ready responde 503 si la instancia no debería recibir
+tráfico:
+
+    pool       conexiones en uso / (pool_size + max_overflow) ≥ SALUD_POOL_MAX_USO.
+               Se evalúa antes de pedir una conexión, así que un pool
+               agotado responde al instante en lugar de esperar pool_timeout.
+    db         SELECT 1 con statement_timeout = SALUD_TIMEOUT_MS, en una
+               conexión propia (sin pool) con connect_timeout: un primario
+               inalcanzable no hace esperar a la sonda pool_timeout.
+    replica    con SALUD_REPLICA_URL, segundos desde la última transacción
+               aplicada en la réplica ≥ SALUD_REPLICA_MAX_RETRASO.
+    bloqueos   antigüedad del bloqueo vigente más viejo de bloqueos_activos
+               ≥ SALUD_BLOQUEO_MAX_SEGUNDOS (0 = solo se reporta: un bloqueo
+               olvidado no es culpa de la instancia).
+
+La respuesta no requiere autenticación: los errores se devuelven con un
+mensaje fijo y el detalle (host, puerto, mensaje del driver) va al log.
+"""
+
+import logging
+from datetime import datetime
+from time import perf_counter
+from sqlalchemy import create_engine, func, make_url, select, text
+from sqlalchemy.pool import NullPool
+from models import BloqueoActivo
+from utils.extesions import db
+
+logger = logging.getLogger(__name__)
+
+_CONSULTA_RETRASO = text(
+    "SELECT CASE WHEN pg_is_in_recovery() "
+    "THEN COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+    "ELSE 0 END"
+)
+
+
+def estado_pool(config) -> dict:
+    pool = db.engine.pool
+    if not hasattr(pool, 'checkedout'):  # pools sin contadores (sqlite en pruebas)
+        return {'ok': True}
+
+    # max_overflow no tiene accesor público; -1 significa sin límite
+    capacidad = pool.size() + max(getattr(pool, '_max_overflow', 0), 0)
+    en_uso = pool.checkedout()
+    uso = en_uso / capacidad if capacidad else 0.0
+    return {
+        'ok': uso < config['SALUD_POOL_MAX_USO'],
+        'en_uso': en_uso,
+        'capacidad': capacidad,
+        'uso': round(uso, 2),
+    }
+
+
+def _engine_sonda(app, clave: str, url):
+    """
+    Engine sin pool para las sondas, cacheado en app.extensions[clave]:
+    una prueba por petición no justifica conexiones abiertas, y conectar
+    y consultar quedan acotados por SALUD_TIMEOUT_MS.
+    """
+    engine = app.extensions.get(clave)
+    if engine is None:
+        url = make_url(url)
+        timeout_ms = app.config['SALUD_TIMEOUT_MS']
+        connect_args = {}
+        if url.get_backend_name() == 'postgresql':
+            connect_args = {
+                # libpq solo acepta segundos enteros
+                'connect_timeout': max(timeout_ms // 1000, 1),
+                'options': f'-c statement_timeout={timeout_ms}',
+            }
+        engine = app.extensions[clave] = create_engine(
+            url, poolclass=NullPool, connect_args=connect_args,
+        )
+    return engine
+
+
+def estado_bd(app) -> tuple[dict, dict]:
+    """SELECT 1 y antigüedad de bloqueos en una sola conexión con tiempo límite."""
+    engine = _engine_sonda(app, 'salud_bd', db.engine.url)
+    inicio = perf_counter()
+    try:
+        with engine.connect() as conn:
+            conn.execute(text('SELECT 1'))
+            latencia = perf_counter() - inicio
+
+            activos, mas_antiguo = conn.execute(
+                select(func.count(), func.min(BloqueoActivo.fecha_bloqueo))
+                .where(BloqueoActivo.expira_en > datetime.now())
+            ).one()
+            conn.rollback()
+    except Exception:
+        logger.warning('Readiness: la BD no respondió', exc_info=True)
+        return (
+            {'ok': False, 'error': 'la BD no respondió'},
+            {'ok': False, 'error': 'sin conexión a la BD'},
+        )
+
+    antiguedad = (datetime.now() - mas_antiguo).total_seconds() if mas_antiguo else 0
+    limite = app.config['SALUD_BLOQUEO_MAX_SEGUNDOS']
+    return (
+        {'ok': True, 'latencia_ms': round(latencia * 1000, 1)},
+        {
+            'ok': not limite or antiguedad < limite,
+            'activos': activos,
+            'mas_antiguo_s': round(antiguedad),
+        },
+    )
+
+
+def estado_replica(app) -> dict:
+    url = app.config['SALUD_REPLICA_URL']
+    if not url:
+        return {'ok': True, 'configurada': False}
+
+    engine = _engine_sonda(app, 'salud_replica', url)
+    try:
+        with engine.connect() as conn:
+            retraso = float(conn.execute(_CONSULTA_RETRASO).scalar())
+    except Exception:
+        logger.warning('Readiness: la réplica no respondió', exc_info=True)
+        return {'ok': False, 'configurada': True, 'error': 'la réplica no respondió'}
+
+    return {
+        'ok': retraso < app.config['SALUD_REPLICA_MAX_RETRASO'],
+        'configurada': True,
+        'retraso_s': round(retraso, 1),
+    }
+
+
+def comprobar(app) -> tuple[bool, dict]:
+    """
+    Ejecuta todas las comprobaciones.
+
+    Returns:
+        tuple: (lista: bool, { pool, db, replica, bloqueos })
+    """
+    config = app.config
+    pool = estado_pool(config)
+    if pool['ok']:
+        bd, bloqueos = estado_bd(app)
+    else:
+        motivo = {'ok': False, 'error': 'pool de conexiones saturado'}
+        bd, bloqueos = motivo, motivo
+
+    comprobaciones = {
+        'pool': pool,
+        'db': bd,
+        'replica': estado_replica(app),
+        'bloqueos': bloqueos,
+    }
+    return all(c['ok'] for c in comprobaciones.values()), comprobaciones
@@ -0,0 +1,106 @@
+"""
+Serialización ligera para las vistas de solo lectura
+Sistema de Inventario IUCA
+
+Las clases Vista*Completa nunca se modifican desde la API, así que no
+necesitan pasar por el identity map del ORM. Este módulo selecciona las
+columnas de la vista como tuplas y las convierte a dict con un plan de
+campos precompilado por vista (una sola vez por proceso).
+
+Uso en una ruta:
+    plan = plan_de(VistaEquiposCompleta)
+    pagination = paginar(plan.consulta(query), page, per_page)
+    equipos = plan.serializar_todas(pagination.items)
+"""
+
+from functools import lru_cache
+from sqlalchemy import DateTime, select
+from utils.extesions import db
+
+
+# ── Convertidores ────────────────────────────────────────────────────────────
+
+def _fecha_iso(valor):
+    return valor.isoformat() if valor else None
+
+
+def _lista(valor):
+    return valor or []
+
+
+def _derivar_responsables(data: dict) -> None:
+    """Campos calculados a partir del JSON de responsables de la vista."""
+    responsables = data['responsables']
+    # Compatibilidad: primer responsable como string
+    data['responsable'] = responsables[0]['nombre_usuario'] if responsables else None
+    data['responsables_ids'] = [r['id_usuario'] for r in responsables]
+
+
+# Ajustes por vista que no se deducen del tipo de columna:
+# { __tablename__: ({ columna: convertidor }, (derivado, ...)) }
+_AJUSTES_POR_VISTA = {
+    'vista_equipos_completa':    ({'responsables': _lista}, (_derivar_responsables,)),
+    'vista_mobiliario_completa': ({'responsables': _lista}, (_derivar_responsables,)),
+}
+
+
+# ── Plan por vista ───────────────────────────────────────────────────────────
+
+class PlanVista:
+    """
+    Plan de serialización de una vista: columnas a seleccionar, en orden,
+    con su convertidor (o None si el valor se copia tal cual) y los campos
+    derivados que se calculan sobre el dict ya armado.
+
+    Produce exactamente el mismo dict que Vista*.to_dict().
+    """
+
+    __slots__ = ('modelo', 'columnas', 'campos', 'derivados', 'clave_primaria')
+
+    def __init__(self, modelo):
+        convertidores, derivados = _AJUSTES_POR_VISTA.get(modelo.__tablename__, ({}, ()))
+
+        self.modelo = modelo
+        self.columnas = tuple(modelo.__table__.columns)
+        self.clave_primaria = modelo.__mapper__.primary_key[0]
+        self.derivados = derivados
+        self.campos = tuple(
+            (
+                columna.key,
+                convertidores.get(
+                    columna.key,
+                    _fecha_iso if isinstance(columna.type, DateTime) else None
+                ),
+            )
+            for columna in self.columnas
+        )
+
+    def consulta(self, query):
+        """Convierte un Query de la vista en uno que devuelve tuplas."""
+        return query.with_entities(*self.columnas)
+
+    def serializar(self, fila) -> dict:
+        data = {
+            clave: convertidor(valor) if convertidor else valor
+            for (clave, convertidor), valor in zip(self.campos, fila)
+        }
+        for derivado in self.derivados:
+            derivado(data)
+        return data
+
+    def serializar_todas(self, filas) -> list[dict]:
+        return [self.serializar(fila) for fila in filas]
+
+    def sentencia_obtener(self, registro_id):
+        return select(*self.columnas).where(self.clave_primaria == registro_id)
+
+    def obtener(self, registro_id):
+        """Equivalente a Vista.query.get(id).to_dict(); None si no existe."""
+        fila = db.session.execute(self.sentencia_obtener(registro_id)).first()
+        return self.serializar(fila) if fila else None
+
+
+@lru_cache(maxsize=None)
+def plan_de(modelo) -> PlanVista:
+    """Devuelve (y memoriza) el plan de serialización de una vista."""
+    return PlanVista(modelo)
@@ -15,7 +15,7 @@ Uso en una ruta:
 """
 
 import re
-from utils.constants import MENSAJES_FK
+from utils.constants import MENSAJE_FK_GENERICO, MENSAJES_FK, CAMPOS_ACTUALIZACION_MASIVA
 
 class ValidationError(Exception):
     """Error de validación con mensaje legible y campos afectados."""
@@ -317,6 +317,113 @@ def validate_tipo(data: dict, is_update: bool = False) -> dict:
 
     return data
 
+
+def validate_actualizacion_masiva(data: dict, campos_filtro: tuple) -> dict:
+    """
+    Valida el cuerpo de PATCH /bulk:
+        { "registros": [id | {"id", "version"}] | "filtro": {...},
+          "cambios": { estado_id?, sucursal_nombre?, responsables_ids? } }
+    """
+    registros, filtro = data.get('registros'), data.get('filtro')
+    if (registros is None) == (filtro is None):
+        raise ValidationError(
+            'Indica "registros" o "filtro", pero no ambos',
+            {'registros': 'Requerido si no hay filtro'}
+        )
+
+    if registros is not None:
+        if not isinstance(registros, list) or not registros:
+            raise ValidationError('La lista de registros está vacía', {'registros': 'Requerido'})
+        for registro in registros:
+            if isinstance(registro, dict):
+                _positive_int(registro.get('id'), 'registros', 'ID')
+                if registro.get('version') is not None:
+                    _positive_int(registro['version'], 'registros', 'Versión')
+            else:
+                _positive_int(registro, 'registros', 'ID')
+    else:
+        if not isinstance(filtro, dict) or not filtro:
+            raise ValidationError('El filtro está vacío', {'filtro': 'Requerido'})
+        no_permitidos = set(filtro) - set(campos_filtro)
+        if no_permitidos:
+            raise ValidationError(
+                'Hay campos de filtro no permitidos',
+                {campo: 'No permitido' for campo in sorted(no_permitidos)}
+            )
+        # Los valores van directo a filter_by(): se normalizan aquí
+        for campo, valor in filtro.items():
+            if campo.endswith('_id'):
+                filtro[campo] = _positive_int(valor, campo, campo)
+            else:
+                if not isinstance(valor, str) or not valor.strip():
+                    raise ValidationError(
+                        f'El filtro "{campo}" debe ser texto',
+                        {campo: 'Debe ser texto'}
+                    )
+                filtro[campo] = _max_len(valor.strip(), 50, campo, campo)
+
+    cambios = data.get('cambios')
+    if not isinstance(cambios, dict) or not cambios:
+        raise ValidationError('No se indicaron cambios', {'cambios': 'Requerido'})
+
+    no_permitidos = set(cambios) - set(CAMPOS_ACTUALIZACION_MASIVA)
+    if no_permitidos:
+        raise ValidationError(
+            'Hay campos que no se pueden actualizar en lote',
+            {campo: 'No permitido' for campo in sorted(no_permitidos)}
+        )
+
+    if 'estado_id' in cambios:
+        _positive_int(cambios['estado_id'], 'estado_id', 'Estado')
+
+    if 'sucursal_nombre' in cambios:
+        _require(cambios, 'sucursal_nombre', 'Sucursal')
+        _max_len(str(cambios['sucursal_nombre']).strip(), 50, 'sucursal_nombre', 'Sucursal')
+
+    if 'responsables_ids' in cambios:
+        responsables = cambios['responsables_ids'] or []
+        if not isinstance(responsables, list):
+            raise ValidationError('Los responsables deben ser una lista', {'responsables_ids': 'Formato inválido'})
+        for usuario_id in responsables:
+            _positive_int(usuario_id, 'responsables_ids', 'Responsable')
+
+    return data
+
+
+def validate_lookup(data: dict, maximo: int) -> dict:
+    """
+    Valida el cuerpo de POST /lookup:
+        { "numeros_serie": [...], "sucursal_nombre": "..." (opcional) }
+    Deja numeros_serie sin vacíos ni duplicados (en orden de escaneo) y
+    sucursal_nombre recortada, o None si no se indicó.
+    """
+    series = data.get('numeros_serie')
+    if not isinstance(series, list) or not series:
+        raise ValidationError('La lista de números de serie está vacía', {'numeros_serie': 'Requerido'})
+
+    if len(series) > maximo:
+        raise ValidationError(
+            f'Se pueden consultar como máximo {maximo} números de serie por petición',
+            {'numeros_serie': f'{len(series)} recibidos'}
+        )
+
+    data['numeros_serie'] = list(dict.fromkeys(
+        str(s).strip() for s in series if s is not None and str(s).strip()
+    ))
+
+    sucursal = data.get('sucursal_nombre')
+    if sucursal is not None:
+        if not isinstance(sucursal, str):
+            raise ValidationError(
+                'La sucursal debe ser texto',
+                {'sucursal_nombre': 'Debe ser texto'}
+            )
+        sucursal = _max_len(sucursal.strip(), 50, 'sucursal_nombre', 'Sucursal')
+    data['sucursal_nombre'] = sucursal or None
+
+    return data
+
+
 # ── Error handler de SQLAlchemy ──────────────────────────────────────────────
 
 def handle_db_error(e: Exception, tabla: str = None) -> tuple:
@@ -352,7 +459,7 @@ def handle_db_error(e: Exception, tabla: str = None) -> tuple:
         return 'Hay campos obligatorios sin completar', 422
 
     if error_code in ('23503', '23001'):
-        mensaje = MENSAJES_FK.get(tabla, 'Este registro está relacionado con otros datos y no puede eliminarse.')
+        mensaje = MENSAJES_FK.get(tabla, MENSAJE_FK_GENERICO)
         return mensaje, 409
 
     if error_code == '23514':